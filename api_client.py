@@ -1,13 +1,21 @@
 """Financial Modeling Prep API client for fetching stock gainers."""
 
+import csv
+import io
 import logging
-import time
-from typing import List, Dict, Any, Optional, Callable
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional, Callable, Tuple
 import re
 import requests
 from requests.exceptions import RequestException, Timeout, ConnectionError
-from perplexity_client import PerplexityClient
-from polygon_client import PolygonClient
+from consensus_engine import ConsensusHistory
+from http_cache import ResponseCache
+from provider_session import ProviderSession
+from symbol_store import SymbolAttributeStore
+from ratings_store import RatingsStore
+from stock_record import StockRecord, gain_percentage, parse_number
 
 
 logger = logging.getLogger(__name__)
@@ -17,8 +25,43 @@ class FMPAPIClient:
     """Client for interacting with Financial Modeling Prep API."""
     
     BASE_URL = "https://financialmodelingprep.com/api/v3"
+    V4_BASE_URL = "https://financialmodelingprep.com/api/v4"
     GAINERS_ENDPOINT = "/stock_market/gainers"
     PROFILE_ENDPOINT = "/profile"
+    QUOTES_ENDPOINT = "/quotes"
+    # v4 bulk end-of-day prices of every symbol for one date (CSV)
+    EOD_ENDPOINT = "/batch-request-end-of-day-prices"
+    # Exchanges whose full quote lists a market scan pulls (one request each)
+    SCAN_EXCHANGES = ('NASDAQ', 'NYSE', 'AMEX')
+    # Maximum number of comma-separated symbols per bulk profile request
+    PROFILE_BATCH_SIZE = 50
+    # URL path fragments mapped to response cache endpoint classes
+    CACHE_CLASSES = [
+        (GAINERS_ENDPOINT, 'gainers'),
+        (QUOTES_ENDPOINT + '/', 'gainers'),
+        (EOD_ENDPOINT, 'eod'),
+        (PROFILE_ENDPOINT + '/', 'profile'),
+        ('/ratios/', 'statement'),
+        ('/income-statement/', 'statement'),
+        ('/balance-sheet-statement/', 'statement'),
+        ('/price-target', 'price_target'),
+    ]
+    
+    # Annual statements requested when picking the one public at a past date
+    STATEMENT_HISTORY_LIMIT = 5
+    # Days after a fiscal period ends before its data is assumed public, for
+    # rows without a filing date (e.g. ratios)
+    FILING_LAG_DAYS = 90
+    
+    # Per-field Perplexity batches used for fields a company dossier lacks: a
+    # batch is re-run for a company when any of the fields it answers is missing
+    DOSSIER_FALLBACKS = [
+        (('description', 'competitive_score', 'competitive_reasoning',
+          'market_growth_score', 'market_growth_reasoning'), 'get_descriptions_batch'),
+        (('ps_ratio',), 'get_ps_ratios_batch'),
+        (('earnings_guidance',), 'get_earnings_guidance_batch'),
+        (('analyst_price_targets',), 'get_analyst_price_targets_batch'),
+    ]
     
     def _parse_company_analysis(self, full_response: str) -> Dict[str, Any]:
         """Parse the structured company analysis response.
@@ -108,26 +151,95 @@ class FMPAPIClient:
         
         return result
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, max_workers: int = 8,
+                 cache: Optional[ResponseCache] = None,
+                 perplexity_concurrency: int = 4, use_dossier: bool = True,
+                 technical_batch_size: int = 10,
+                 symbol_store: Optional[SymbolAttributeStore] = None,
+                 perplexity_stream: bool = False, perplexity_stream_deadline: float = 300,
+                 polygon_max_workers: int = 8,
+                 ratings_store: Optional[RatingsStore] = None,
+                 base_url: Optional[str] = None,
+                 perplexity_base_url: Optional[str] = None,
+                 polygon_base_url: Optional[str] = None):
         """Initialize the API client with an API key.
         
         Args:
             api_key: Financial Modeling Prep API key
+            max_workers: Maximum concurrent FMP requests when enriching stocks
+            cache: Optional response cache shared with the Perplexity client
+            perplexity_concurrency: Maximum concurrent Perplexity requests, shared by
+                                    every batch this client runs (even from different threads)
+            use_dossier: Fetch the short Perplexity fields with one combined
+                         request per company instead of one request per field
+            technical_batch_size: Companies per technical-nature classification
+                                  request (1 asks about each company separately)
+            symbol_store: Optional store of per-symbol decisions such as is_technical
+            perplexity_stream: Stream investment evaluations, keeping partial text
+                               when a response runs past the deadline
+            perplexity_stream_deadline: Maximum seconds per streamed evaluation
+            polygon_max_workers: Maximum concurrent tickers when fetching Polygon data
+            ratings_store: Optional local store of Polygon analyst ratings
+            base_url: FMP server root (e.g. a local stand-in server); the v3 and
+                      v4 API paths are appended to it
+            perplexity_base_url: Perplexity API base URL override
+            polygon_base_url: Polygon API base URL override
         """
         self.api_key = api_key
-        self.session = requests.Session()
+        self.max_workers = max(1, max_workers)
+        self.perplexity_concurrency = max(1, perplexity_concurrency)
+        # One bound for all Perplexity batches, however many stages run them at once
+        self.perplexity_slots = threading.BoundedSemaphore(self.perplexity_concurrency)
+        self.use_dossier = use_dossier
+        self.technical_batch_size = max(1, technical_batch_size)
+        self.symbol_store = symbol_store
+        self.perplexity_stream = perplexity_stream
+        self.perplexity_stream_deadline = perplexity_stream_deadline
+        self.polygon_max_workers = max(1, polygon_max_workers)
+        self.ratings_store = ratings_store
+        self.perplexity_base_url = perplexity_base_url
+        self.polygon_base_url = polygon_base_url
+        if base_url:
+            root = base_url.rstrip('/')
+            self.BASE_URL = f"{root}/api/v3"
+            self.V4_BASE_URL = f"{root}/api/v4"
+        self.cache = cache
+        # Size the connection pool so concurrent workers can reuse connections
+        self.session = ProviderSession(
+            'fmp',
+            cache=cache,
+            classify=self._classify_url,
+            pool_maxsize=self.max_workers
+        )
         self.session.headers.update({
             'User-Agent': 'StockAlertsBot/1.0'
         })
     
-    def get_daily_gainers(self) -> List[Dict[str, Any]]:
+    def _classify_url(self, url: str) -> Optional[str]:
+        """Map an FMP URL to its response cache endpoint class.
+        
+        Args:
+            url: Request URL
+        
+        Returns:
+            Endpoint class name or None if the response should not be cached
+        """
+        path = url.split('?', 1)[0]
+        for fragment, endpoint_class in self.CACHE_CLASSES:
+            if fragment in path:
+                return endpoint_class
+        return None
+    
+    def get_daily_gainers(self) -> List[StockRecord]:
         """Fetch daily stock gainers from the API.
         
         Note: This endpoint returns only the top 50 gainers. Stocks with gains
-        below the top 50 threshold will not be included, even if they gained 10%+.
+        below the top 50 threshold will not be included, even if they gained 10%+;
+        use scan_market_gainers for complete coverage.
         
         Returns:
-            List of stock dictionaries containing gainer information
+            List of stock records containing gainer information (price and gain
+            fields normalized to floats)
             
         Raises:
             RequestException: If the API request fails
@@ -148,7 +260,7 @@ class FMPAPIClient:
                 raise RequestException(f"API error: {error_msg}")
             
             logger.info(f"Successfully fetched {len(data)} gainers from FMP API (top 50 only)")
-            return data
+            return StockRecord.from_rows(data)
             
         except Timeout:
             logger.error("API request timed out")
@@ -171,6 +283,219 @@ class FMPAPIClient:
             logger.error(f"Unexpected error fetching gainers: {e}")
             raise RequestException(f"Unexpected error: {e}")
     
+    def get_exchange_quotes(self, exchange: str) -> List[Dict[str, Any]]:
+        """Fetch quotes for every symbol listed on an exchange in one bulk request.
+        
+        Args:
+            exchange: Exchange short name (e.g. 'NASDAQ')
+        
+        Returns:
+            List of FMP quote dictionaries
+        
+        Raises:
+            RequestException: If the request fails or returns an API error
+        """
+        url = f"{self.BASE_URL}{self.QUOTES_ENDPOINT}/{exchange.lower()}"
+        params = {'apikey': self.api_key}
+        
+        response = self.session.get(url, params=params, timeout=60)
+        response.raise_for_status()
+        data = response.json()
+        
+        if isinstance(data, dict) and 'Error Message' in data:
+            raise RequestException(f"API error: {data['Error Message']}")
+        if not isinstance(data, list):
+            raise RequestException(f"Unexpected quotes response: {str(data)[:200]}")
+        
+        logger.debug(f"Fetched {len(data)} quotes for {exchange}")
+        return data
+    
+    def scan_market_gainers(self, min_gain: float = 10.0,
+                            min_market_cap: float = 300_000_000,
+                            exchanges: Optional[List[str]] = None) -> List[StockRecord]:
+        """Find every gainer on whole exchanges instead of the top 50 list.
+        
+        Pulls the full quote list of each exchange (one request per exchange,
+        fetched concurrently), computes the daily change from price and previous
+        close, and applies the gain and market cap thresholds as NumPy masks
+        over all symbols at once (see screening.ScreeningTable). Only the
+        survivors become stock records.
+        
+        Args:
+            min_gain: Minimum gain percentage
+            min_market_cap: Minimum market cap in dollars (from the quote)
+            exchanges: Exchanges to scan (default: SCAN_EXCHANGES)
+        
+        Returns:
+            Stock records that passed both thresholds, biggest gain first
+        
+        Raises:
+            RequestException: If no exchange could be fetched
+        """
+        # NumPy loads on first use rather than when the CLI starts
+        import numpy as np
+        from screening import ScreeningTable
+        
+        exchanges = list(exchanges or self.SCAN_EXCHANGES)
+        with ThreadPoolExecutor(max_workers=min(len(exchanges), self.max_workers)) as executor:
+            futures = {exchange: executor.submit(self.get_exchange_quotes, exchange) for exchange in exchanges}
+        
+        quotes = []
+        for exchange, future in futures.items():
+            try:
+                quotes.extend(future.result())
+            except Exception as e:
+                logger.warning(f"Error fetching {exchange} quotes, skipping exchange: {e}")
+        if not quotes:
+            raise RequestException(f"Full-market scan returned no quotes for {', '.join(exchanges)}")
+        
+        def column(field: str):
+            # Missing or unparseable values become NaN, which fails every threshold
+            return np.array([parse_number(quote.get(field)) for quote in quotes], dtype=float)
+        
+        price = column('price')
+        previous_close = column('previousClose')
+        market_cap = column('marketCap')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Fall back to the reported change where the previous close is missing
+            gain = np.where(previous_close > 0,
+                            (price - previous_close) / previous_close * 100,
+                            column('changesPercentage'))
+        
+        table = ScreeningTable(columns={'gain': gain, 'market_cap': market_cap})
+        survivors = table.select('gain >= min_gain and market_cap >= min_market_cap',
+                                 min_gain=min_gain, min_market_cap=min_market_cap)
+        survivors = survivors[np.argsort(-gain[survivors], kind='stable')]
+        
+        stocks = []
+        seen = set()
+        for index in survivors.tolist():
+            quote = quotes[index]
+            symbol = quote.get('symbol')
+            if not symbol or symbol in seen:
+                continue
+            seen.add(symbol)
+            stocks.append(StockRecord(
+                symbol=symbol,
+                name=quote.get('name') or symbol,
+                price=quote.get('price'),
+                change=quote.get('change'),
+                changesPercentage=round(float(gain[index]), 4),
+                exchange=quote.get('exchange'),
+                mktCap=float(market_cap[index]),
+            ))
+        
+        logger.info(f"Full-market scan: {len(quotes)} quotes on {', '.join(exchanges)}, "
+                    f"{len(stocks)} with gains >= {min_gain}% and market cap >= ${min_market_cap:,.0f}")
+        return stocks
+    
+    def get_eod_prices(self, day: date) -> List[Dict[str, Any]]:
+        """Fetch the end-of-day prices of every symbol for one date in a single request.
+        
+        Args:
+            day: Trading date
+        
+        Returns:
+            List of rows with symbol, date, open, low, high, close, adjClose and
+            volume (empty for weekends, market holidays and dates not yet published)
+        
+        Raises:
+            RequestException: If the request fails or returns an API error
+        """
+        url = f"{self.V4_BASE_URL}{self.EOD_ENDPOINT}"
+        params = {'date': day.isoformat(), 'apikey': self.api_key}
+        
+        response = self.session.get(url, params=params, timeout=120)
+        response.raise_for_status()
+        
+        text = response.text.lstrip()
+        if text.startswith('{'):
+            try:
+                error = response.json()
+            except ValueError:
+                error = {}
+            message = error.get('Error Message') or error.get('error') or text[:200]
+            raise RequestException(f"API error: {message}")
+        if text.startswith('['):
+            return response.json()
+        return list(csv.DictReader(io.StringIO(text)))
+    
+    def get_historical_gainers(self, day: date, min_gain: float = 10.0) -> List[StockRecord]:
+        """Reconstruct a past day's gainers from bulk end-of-day prices.
+        
+        The day's closes are compared with the previous trading day's (both
+        split-adjusted), and the gain threshold is applied as a NumPy mask over
+        every symbol. Survivors get their profile's industry and sector and a
+        market cap at the day's close (the profile's current share count times
+        that close), so the usual market cap and industry filters can follow.
+        Symbols without a current profile, often delisted or acquired since,
+        are kept with mktCap None rather than dropped.
+        
+        Args:
+            day: Trading date to reconstruct
+            min_gain: Minimum gain percentage
+        
+        Returns:
+            Stock records that gained at least min_gain, biggest gain first
+        
+        Raises:
+            ValueError: If there are no prices for the day (the market was
+                        closed, or the data isn't published yet) or for any of
+                        the seven days before it
+        """
+        import numpy as np
+        from screening import ScreeningTable
+        
+        rows = self.get_eod_prices(day)
+        if not rows:
+            raise ValueError(f"No end-of-day prices for {day} (market closed or data not published yet)")
+        
+        # Walk back over weekends and holidays to the previous trading day
+        previous_rows = []
+        for days_back in range(1, 8):
+            previous_rows = self.get_eod_prices(day - timedelta(days=days_back))
+            if previous_rows:
+                break
+        if not previous_rows:
+            # Without previous closes every gain would be unknown and the day would look empty
+            raise ValueError(f"No end-of-day prices in the week before {day} to compute gains from")
+        
+        def close(row: Dict[str, Any]) -> Optional[float]:
+            return parse_number(row.get('adjClose')) or parse_number(row.get('close'))
+        
+        previous_close = {row.get('symbol'): close(row) for row in previous_rows}
+        closes = np.array([close(row) for row in rows], dtype=float)
+        previous = np.array([previous_close.get(row.get('symbol')) for row in rows], dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gain = np.where(previous > 0, (closes - previous) / previous * 100, np.nan)
+        
+        survivors = ScreeningTable(columns={'gain': gain}).select('gain >= min_gain', min_gain=min_gain)
+        survivors = survivors[np.argsort(-gain[survivors], kind='stable')]
+        
+        stocks = []
+        for index in survivors.tolist():
+            row = rows[index]
+            stocks.append(StockRecord(
+                symbol=row.get('symbol'),
+                price=closes[index],
+                change=round(float(closes[index] - previous[index]), 4),
+                changesPercentage=round(float(gain[index]), 4),
+            ))
+        
+        profiles = self.get_company_profiles_batch([stock['symbol'] for stock in stocks])
+        for stock in stocks:
+            profile = profiles.get(stock['symbol']) or {}
+            stock['name'] = profile.get('companyName') or stock['symbol']
+            stock['industry'] = profile.get('industry', '')
+            stock['sector'] = profile.get('sector', '')
+            stock['exchange'] = profile.get('exchangeShortName')
+            market_cap = parse_number(profile.get('mktCap'))
+            current_price = parse_number(profile.get('price'))
+            stock['mktCap'] = market_cap / current_price * stock['price'] if market_cap and current_price else None
+        
+        logger.info(f"{day}: {len(rows)} end-of-day prices, {len(stocks)} gainers of {min_gain}%+")
+        return stocks
+    
     def filter_by_gain_percentage(self, stocks: List[Dict[str, Any]], 
                                   min_gain: float = 10.0) -> List[Dict[str, Any]]:
         """Filter stocks by minimum gain percentage.
@@ -182,22 +507,12 @@ class FMPAPIClient:
         Returns:
             Filtered list of stocks meeting the gain criteria
         """
-        filtered_stocks = []
+        from screening import ScreeningTable
         
-        for stock in stocks:
-            try:
-                change_value = stock.get('changesPercentage', 0)
-                # Handle both string and float formats
-                if isinstance(change_value, str):
-                    change_percent = float(change_value.replace('%', ''))
-                else:
-                    change_percent = float(change_value)
-                
-                if change_percent >= min_gain:
-                    filtered_stocks.append(stock)
-            except (ValueError, TypeError) as e:
-                logger.warning(f"Error parsing gain percentage for {stock.get('symbol', 'Unknown')}: {e}")
-                continue
+        table = ScreeningTable(stocks)
+        for index in table.missing('gain').tolist():
+            logger.warning(f"Missing or invalid gain percentage for {stocks[index].get('symbol', 'Unknown')}")
+        filtered_stocks = table.filter('gain >= min_gain', min_gain=min_gain)
         
         logger.debug(f"Filtered {len(filtered_stocks)} stocks with gains >= {min_gain}%")
         return filtered_stocks
@@ -227,9 +542,58 @@ class FMPAPIClient:
             logger.warning(f"Error fetching profile for {symbol}: {e}")
             return None
     
+    def get_company_profiles_batch(self, symbols: List[str],
+                                   batch_size: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """Fetch company profiles for many symbols using comma-separated bulk requests.
+        
+        Symbols are chunked to ``batch_size`` per request. If a bulk request fails,
+        the symbols in that chunk are fetched one at a time instead.
+        
+        Args:
+            symbols: Stock symbols to fetch profiles for
+            batch_size: Symbols per request (default: PROFILE_BATCH_SIZE)
+        
+        Returns:
+            Dictionary mapping symbols to profile dictionaries (missing symbols are omitted)
+        """
+        batch_size = batch_size or self.PROFILE_BATCH_SIZE
+        unique_symbols = list(dict.fromkeys(s for s in symbols if s))
+        profiles = {}
+        
+        for start in range(0, len(unique_symbols), batch_size):
+            chunk = unique_symbols[start:start + batch_size]
+            url = f"{self.BASE_URL}{self.PROFILE_ENDPOINT}/{','.join(chunk)}"
+            params = {'apikey': self.api_key}
+            
+            try:
+                response = self.session.get(url, params=params, timeout=30)
+                response.raise_for_status()
+                data = response.json()
+                
+                if not isinstance(data, list):
+                    raise RequestException(f"Unexpected profile response: {str(data)[:200]}")
+                
+                for profile in data:
+                    symbol = profile.get('symbol')
+                    if symbol:
+                        profiles[symbol] = profile
+                
+                logger.debug(f"Fetched {len(data)} profiles in bulk for {len(chunk)} symbols")
+            
+            except Exception as e:
+                logger.warning(f"Bulk profile request failed ({e}), falling back to single-symbol requests")
+                for symbol in chunk:
+                    profile = self.get_company_profile(symbol)
+                    if profile:
+                        profiles[symbol] = profile
+        
+        return profiles
+    
     def enrich_with_market_cap(self, stocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Enrich stock data with market cap, industry, and sector information.
         
+        Profiles are fetched with bulk requests (see get_company_profiles_batch).
+        
         Args:
             stocks: List of stock dictionaries
             
@@ -238,17 +602,15 @@ class FMPAPIClient:
         """
         logger.debug(f"Fetching company profile data for {len(stocks)} stocks")
         
-        for i, stock in enumerate(stocks):
+        profiles = self.get_company_profiles_batch([stock.get('symbol') for stock in stocks])
+        
+        for stock in stocks:
             symbol = stock.get('symbol')
             if not symbol:
                 continue
-                
-            # Add small delay to avoid rate limiting
-            if i > 0:
-                time.sleep(0.1)
             
-            # Fetch company profile for market cap, industry, and sector
-            profile = self.get_company_profile(symbol)
+            # Look up company profile for market cap, industry, and sector
+            profile = profiles.get(symbol)
             if profile:
                 # Add market cap
                 if 'mktCap' in profile:
@@ -274,6 +636,8 @@ class FMPAPIClient:
                              min_market_cap: float = 300_000_000) -> List[Dict[str, Any]]:
         """Filter stocks by minimum market cap.
         
+        Stocks without market cap data are excluded.
+        
         Args:
             stocks: List of stock dictionaries with market cap data
             min_market_cap: Minimum market cap in dollars (default: $300M)
@@ -281,27 +645,13 @@ class FMPAPIClient:
         Returns:
             Filtered list of stocks meeting the market cap criteria
         """
-        filtered_stocks = []
-        excluded_count = 0
+        from screening import ScreeningTable
         
-        for stock in stocks:
-            market_cap = stock.get('mktCap')
-            symbol = stock.get('symbol', 'Unknown')
-            
-            # Skip if no market cap data
-            if market_cap is None:
-                logger.debug(f"No market cap data for {symbol}, excluding")
-                excluded_count += 1
-                continue
-            
-            # Check if meets minimum market cap
-            if market_cap >= min_market_cap:
-                filtered_stocks.append(stock)
-            else:
-                logger.debug(f"Excluding {symbol} - Market cap ${market_cap:,.0f} < ${min_market_cap:,.0f}")
-                excluded_count += 1
+        table = ScreeningTable(stocks)
+        filtered_stocks = table.filter('market_cap >= min_market_cap', min_market_cap=min_market_cap)
         
-        logger.debug(f"Filtered {excluded_count} stocks with market cap < ${min_market_cap/1_000_000:.0f}M")
+        logger.debug(f"Filtered {len(stocks) - len(filtered_stocks)} stocks with market cap < "
+                     f"${min_market_cap/1_000_000:.0f}M ({len(table.missing('market_cap'))} without data)")
         logger.debug(f"Remaining stocks after market cap filter: {len(filtered_stocks)}")
         return filtered_stocks
     
@@ -337,7 +687,9 @@ class FMPAPIClient:
         """Filter stocks to keep only companies with minimum growth rate.
         
         Uses lenient approach: includes companies if ALL available years meet minimum,
-        excludes only if ANY available year is below minimum.
+        excludes only if ANY available year is below minimum. Growth rates are
+        parsed from text like "2025: 20%, 2026: 21%, 2027: 22%"; companies without
+        parseable growth data are included (benefit of doubt).
         
         Args:
             stocks: List of stock dictionaries with growth_rate data
@@ -346,64 +698,14 @@ class FMPAPIClient:
         Returns:
             Filtered list of stocks meeting growth criteria
         """
-        import re
+        from screening import ScreeningTable
         
-        filtered_stocks = []
-        excluded_count = 0
-        
-        for stock in stocks:
-            symbol = stock.get('symbol', 'Unknown')
-            name = stock.get('name', 'Unknown')
-            growth_rate = stock.get('growth_rate', '')
-            
-            # If no growth data, include (benefit of doubt)
-            if not growth_rate:
-                filtered_stocks.append(stock)
-                logger.debug(f"Including {symbol} - No growth data available")
-                continue
-            
-            # Parse growth rates from format like "2025: 20%, 2026: 21%, 2027: 22%"
-            year_pattern = r'(\d{4}):\s*([\d.-]+)(?:-[\d.]+)?%'
-            matches = re.findall(year_pattern, growth_rate)
-            
-            if not matches:
-                # Can't parse, include (benefit of doubt)
-                filtered_stocks.append(stock)
-                logger.debug(f"Including {symbol} - Could not parse growth rate: {growth_rate}")
-                continue
-            
-            # Check if all available years meet minimum
-            below_minimum = False
-            growth_values = []
-            
-            for year, rate_str in matches:
-                try:
-                    # Handle negative rates and ranges
-                    rate = float(rate_str)
-                    growth_values.append((year, rate))
-                    
-                    if rate < min_growth:
-                        below_minimum = True
-                        logger.debug(f"{symbol} has {year} growth of {rate}% (below {min_growth}%)")
-                except ValueError:
-                    # Can't parse this rate, skip it
-                    logger.debug(f"Could not parse rate for {symbol} {year}: {rate_str}")
-                    continue
-            
-            # Include only if no year is below minimum (or no valid data)
-            if not below_minimum and growth_values:
-                filtered_stocks.append(stock)
-                growth_summary = ", ".join([f"{yr}: {rt}%" for yr, rt in growth_values])
-                logger.debug(f"Including {symbol} - Growth rates: {growth_summary}")
-            elif below_minimum:
-                excluded_count += 1
-                logger.debug(f"Excluding {symbol} - Has growth below {min_growth}% threshold")
-            else:
-                # No valid growth values parsed, include
-                filtered_stocks.append(stock)
-                logger.debug(f"Including {symbol} - No valid growth rates parsed")
+        table = ScreeningTable(stocks)
+        # The growth column holds each company's lowest parsed yearly rate
+        filtered_stocks = table.filter('growth >= min_growth', min_growth=min_growth)
         
-        logger.debug(f"Filtered {excluded_count} stocks with growth below {min_growth}%")
+        logger.debug(f"Filtered {len(stocks) - len(filtered_stocks)} stocks with growth below {min_growth}% "
+                     f"({len(table.missing('growth'))} included without parseable growth data)")
         logger.debug(f"Remaining stocks after growth filter: {len(filtered_stocks)}")
         return filtered_stocks
     
@@ -411,6 +713,9 @@ class FMPAPIClient:
                                   min_growth: float = 10.0) -> List[Dict[str, Any]]:
         """Filter stocks to keep only companies with minimum projected growth rate in 2030.
         
+        Projections like "2-4%" or "2 to 4%" count with their upper bound;
+        companies without a parseable projection are included (benefit of doubt).
+        
         Args:
             stocks: List of stock dictionaries with revenue_projection_2030 data
             min_growth: Minimum acceptable growth rate percentage (default 10%)
@@ -418,59 +723,13 @@ class FMPAPIClient:
         Returns:
             Filtered list of stocks meeting 2030 growth criteria
         """
-        import re
+        from screening import ScreeningTable
         
-        filtered_stocks = []
-        excluded_count = 0
+        table = ScreeningTable(stocks)
+        filtered_stocks = table.filter('projection_2030 >= min_growth', min_growth=min_growth)
         
-        for stock in stocks:
-            symbol = stock.get('symbol', 'Unknown')
-            name = stock.get('name', 'Unknown')
-            projection = stock.get('revenue_projection_2030', '')
-            
-            # If no projection data, include (benefit of doubt)
-            if not projection:
-                filtered_stocks.append(stock)
-                logger.debug(f"Including {symbol} - No 2030 projection data available")
-                continue
-            
-            # Parse growth rate from projection
-            # Handle various formats: "2-4%", "2–4%", "2 to 4%", "15%"
-            growth_rate = None
-            
-            # Check for range with hyphen or em dash (e.g., "2-4%" or "2–4%")
-            range_match = re.search(r'^(\d+(?:\.\d+)?)\s*[-–]\s*(\d+(?:\.\d+)?)\s*%', projection)
-            if range_match:
-                # Use the upper bound of the range
-                growth_rate = float(range_match.group(2))
-                logger.debug(f"{symbol} has range {range_match.group(1)}-{range_match.group(2)}%, using upper bound {growth_rate}%")
-            else:
-                # Check for "X to Y%" format
-                to_match = re.search(r'^(\d+(?:\.\d+)?)\s+to\s+(\d+(?:\.\d+)?)\s*%', projection, re.IGNORECASE)
-                if to_match:
-                    # Use the upper bound of the range
-                    growth_rate = float(to_match.group(2))
-                    logger.debug(f"{symbol} has range {to_match.group(1)} to {to_match.group(2)}%, using upper bound {growth_rate}%")
-                else:
-                    # Check for single value (e.g., "15%")
-                    single_match = re.search(r'^(\d+(?:\.\d+)?)\s*%', projection)
-                    if single_match:
-                        growth_rate = float(single_match.group(1))
-                        logger.debug(f"{symbol} has single value {growth_rate}%")
-            
-            if growth_rate is not None:
-                if growth_rate >= min_growth:
-                    filtered_stocks.append(stock)
-                    logger.debug(f"Including {symbol} - 2030 growth projection: {growth_rate}%")
-                else:
-                    excluded_count += 1
-                    logger.debug(f"Excluding {symbol} - 2030 growth projection {growth_rate}% below {min_growth}% threshold")
-            else:
-                # Could not parse growth rate, include (benefit of doubt)
-                filtered_stocks.append(stock)
-                logger.debug(f"Including {symbol} - Could not parse 2030 growth rate from projection")
-        
-        logger.debug(f"Filtered {excluded_count} stocks with 2030 projection below {min_growth}%")
+        logger.debug(f"Filtered {len(stocks) - len(filtered_stocks)} stocks with 2030 projection below {min_growth}% "
+                     f"({len(table.missing('projection_2030'))} included without a parseable projection)")
         logger.debug(f"Remaining stocks after 2030 projection filter: {len(filtered_stocks)}")
         return filtered_stocks
     
@@ -509,6 +768,148 @@ class FMPAPIClient:
         logger.debug(f"Remaining stocks after industry filter: {len(filtered_stocks)}")
         return filtered_stocks
     
+    def _run_perplexity_batches(self, perplexity_api_key: str, company_names: List[str],
+                                batch_names: List[str],
+                                progress_callback: Optional[Callable] = None) -> List[Tuple[dict, int]]:
+        """Run Perplexity batch methods concurrently with the shared cache.
+        
+        Args:
+            perplexity_api_key: Perplexity API key
+            company_names: List of company names
+            batch_names: AsyncPerplexityClient batch method names
+            progress_callback: Optional callback for progress updates
+        
+        Returns:
+            List of (results, successful) tuples in the order of batch_names
+        """
+        from perplexity_client import run_batches
+        
+        return run_batches(
+            perplexity_api_key,
+            company_names,
+            batch_names,
+            progress_callback=progress_callback,
+            cache=self.cache,
+            max_concurrency=self.perplexity_concurrency,
+            request_slots=self.perplexity_slots,
+            technical_batch_size=self.technical_batch_size,
+            stream=self.perplexity_stream,
+            stream_deadline=self.perplexity_stream_deadline,
+            base_url=self.perplexity_base_url
+        )
+    
+    def _run_perplexity_jobs(self, perplexity_api_key: str, jobs: List[Tuple[str, List[str]]],
+                             progress_callback: Optional[Callable] = None) -> List[Tuple[dict, int]]:
+        """Run Perplexity batch methods over different company lists concurrently.
+        
+        Args:
+            perplexity_api_key: Perplexity API key
+            jobs: List of (batch method name, company names) pairs
+            progress_callback: Optional callback for progress updates
+        
+        Returns:
+            List of (results, successful) tuples in the order of jobs
+        """
+        from perplexity_client import run_batch_jobs
+        
+        return run_batch_jobs(
+            perplexity_api_key,
+            jobs,
+            progress_callback=progress_callback,
+            cache=self.cache,
+            max_concurrency=self.perplexity_concurrency,
+            request_slots=self.perplexity_slots,
+            technical_batch_size=self.technical_batch_size,
+            stream=self.perplexity_stream,
+            stream_deadline=self.perplexity_stream_deadline,
+            base_url=self.perplexity_base_url
+        )
+    
+    def _fetch_short_fields(self, stocks: List[Dict[str, Any]], company_names: List[str],
+                            perplexity_api_key: str, extra_batches: List[str],
+                            progress_callback: Optional[Callable] = None) -> List[Tuple[dict, int]]:
+        """Fill the short Perplexity fields, running other batches alongside.
+        
+        With dossiers enabled, one combined request per company fills the
+        description, competitive and market growth scores, P/S ratio, earnings
+        guidance and analyst price targets; any field a dossier lacks is
+        re-requested with its per-field prompt. Otherwise the per-field prompts
+        are used for every company.
+        
+        Args:
+            stocks: List of stock dictionaries (updated in place)
+            company_names: Company names matching stocks
+            perplexity_api_key: Perplexity API key
+            extra_batches: Other batch method names to run concurrently
+            progress_callback: Optional callback for progress updates
+        
+        Returns:
+            List of (results, successful) tuples in the order of extra_batches
+        """
+        from perplexity_client import DOSSIER_FIELDS
+        
+        first_round = [(name, company_names) for name in extra_batches]
+        
+        dossiers = {}
+        extra_results = None
+        if self.use_dossier:
+            results = self._run_perplexity_jobs(
+                perplexity_api_key,
+                first_round + [('get_dossiers_batch', company_names)],
+                progress_callback
+            )
+            dossiers, _ = results.pop()
+            extra_results = results
+        
+        # Per-field requests for whatever the dossiers didn't provide
+        field_jobs = []
+        for fields, batch_name in self.DOSSIER_FALLBACKS:
+            missing = [
+                name for name in company_names
+                if any((dossiers.get(name) or {}).get(field) is None for field in fields)
+            ]
+            if missing:
+                field_jobs.append((fields, batch_name, missing))
+        
+        jobs = [(batch_name, missing) for _, batch_name, missing in field_jobs]
+        if extra_results is None:
+            results = self._run_perplexity_jobs(perplexity_api_key, jobs + first_round, progress_callback)
+            field_results, extra_results = results[:len(jobs)], results[len(jobs):]
+        elif jobs:
+            logger.info(f"Falling back to per-field requests for {sum(len(m) for _, m in jobs)} missing dossier fields")
+            field_results = self._run_perplexity_jobs(perplexity_api_key, jobs, progress_callback)
+        else:
+            field_results = []
+        
+        for stock, company_name in zip(stocks, company_names):
+            dossier = dossiers.get(company_name) or {}
+            for field in DOSSIER_FIELDS:
+                stock[field] = dossier.get(field)
+        
+        for (fields, _, _), (values, _) in zip(field_jobs, field_results):
+            for stock, company_name in zip(stocks, company_names):
+                value = values.get(company_name)
+                if value is None:
+                    continue
+                if fields[0] == 'description':
+                    # Parse the structured description response; fields the dossier
+                    # did provide are kept
+                    parsed = self._parse_company_analysis(value)
+                    answers = {
+                        'description': parsed['short_description'],
+                        'competitive_score': parsed['competitive_score'],
+                        'competitive_reasoning': parsed['competitive_reasoning'],
+                        'market_growth_score': parsed['growth_score'],
+                        'market_growth_reasoning': parsed['growth_reasoning'],
+                    }
+                    for field, answer in answers.items():
+                        if stock[field] is None:
+                            stock[field] = answer
+                else:
+                    stock[fields[0]] = value
+        
+        return extra_results
+    
     def check_technical_nature(self, stocks: List[Dict[str, Any]], 
                                perplexity_api_key: str,
                                progress_callback: Optional[Callable] = None) -> List[Dict[str, Any]]:
@@ -522,37 +923,51 @@ class FMPAPIClient:
         Returns:
             List of stocks with added is_technical data
         """
+        # Reuse stored decisions so only unseen or expired symbols reach the LLM
+        known = {}
+        if self.symbol_store:
+            known = self.symbol_store.get_many([stock.get('symbol', '') for stock in stocks], 'is_technical')
+        
+        pending = []
+        for stock in stocks:
+            symbol = stock.get('symbol', '').upper()
+            if symbol in known:
+                stock['is_technical'] = known[symbol]
+            else:
+                pending.append(stock)
+        
+        if known:
+            logger.info(f"Reused stored technical decisions for {len(stocks) - len(pending)}/{len(stocks)} companies")
+        if not pending:
+            return stocks
+        
         if not perplexity_api_key:
             logger.warning("No Perplexity API key provided, skipping technical checks")
             return stocks
         
         logger.info("Checking technical nature of companies")
         
-        # Initialize Perplexity client
-        with PerplexityClient(perplexity_api_key) as client:
-            # Get company names with ticker symbols for better accuracy
-            company_names = []
-            for stock in stocks:
-                name = stock.get('name', stock.get('symbol', 'Unknown'))
-                symbol = stock.get('symbol', '')
-                # Format as "Company Name (SYMBOL)" if we have both
-                if name and symbol and name != symbol:
-                    company_names.append(f"{name} ({symbol})")
-                else:
-                    company_names.append(name)
-            
-            # Check technical nature
-            technical_checks, tech_successful = client.get_technical_companies_batch(
-                company_names,
-                progress_callback=progress_callback,
-                delay=1.5
+        # Get company names with ticker symbols for better accuracy
+        company_names = self._company_names(pending)
+        
+        # Classify several companies per prompt unless batching is disabled
+        batch_name = 'get_technical_companies_batched' if self.technical_batch_size > 1 else 'get_technical_companies_batch'
+        technical_checks, tech_successful = self._run_perplexity_batches(
+            perplexity_api_key, company_names, [batch_name], progress_callback
+        )[0]
+        
+        # Add technical nature to stock data
+        for stock, company_name in zip(pending, company_names):
+            stock['is_technical'] = technical_checks.get(company_name, None)
+        
+        if self.symbol_store:
+            self.symbol_store.set_many(
+                {stock.get('symbol', ''): stock['is_technical'] for stock in pending},
+                'is_technical',
+                source='perplexity:sonar-pro'
             )
-            
-            # Add technical nature to stock data
-            for stock, company_name in zip(stocks, company_names):
-                stock['is_technical'] = technical_checks.get(company_name, None)
-            
-            logger.info(f"Successfully checked technical nature for {tech_successful}/{len(stocks)} companies")
+        
+        logger.info(f"Successfully checked technical nature for {tech_successful}/{len(pending)} companies")
         
         return stocks
     
@@ -575,31 +990,19 @@ class FMPAPIClient:
         
         logger.info("Fetching growth rates from Perplexity API")
         
-        # Initialize Perplexity client
-        with PerplexityClient(perplexity_api_key) as client:
-            # Get company names with ticker symbols for better accuracy
-            company_names = []
-            for stock in stocks:
-                name = stock.get('name', stock.get('symbol', 'Unknown'))
-                symbol = stock.get('symbol', '')
-                # Format as "Company Name (SYMBOL)" if we have both
-                if name and symbol and name != symbol:
-                    company_names.append(f"{name} ({symbol})")
-                else:
-                    company_names.append(name)
-            
-            # Fetch growth rates
-            growth_rates, growth_successful = client.get_growth_rates_batch(
-                company_names, 
-                progress_callback=progress_callback,
-                delay=1.5
-            )
-            
-            # Add growth rates to stock data
-            for stock, company_name in zip(stocks, company_names):
-                stock['growth_rate'] = growth_rates.get(company_name, None)
-            
-            logger.info(f"Successfully fetched growth rates for {growth_successful}/{len(stocks)} companies")
+        # Get company names with ticker symbols for better accuracy
+        company_names = self._company_names(stocks)
+        
+        # Fetch concurrently, bounded by the Perplexity concurrency limit
+        growth_rates, growth_successful = self._run_perplexity_batches(
+            perplexity_api_key, company_names, ['get_growth_rates_batch'], progress_callback
+        )[0]
+        
+        # Add growth rates to stock data
+        for stock, company_name in zip(stocks, company_names):
+            stock['growth_rate'] = growth_rates.get(company_name, None)
+        
+        logger.info(f"Successfully fetched growth rates for {growth_successful}/{len(stocks)} companies")
         
         return stocks
     
@@ -622,31 +1025,19 @@ class FMPAPIClient:
         
         logger.info("Fetching revenue projections for 2030 from Perplexity API")
         
-        # Initialize Perplexity client
-        with PerplexityClient(perplexity_api_key) as client:
-            # Get company names with ticker symbols for better accuracy
-            company_names = []
-            for stock in stocks:
-                name = stock.get('name', stock.get('symbol', 'Unknown'))
-                symbol = stock.get('symbol', '')
-                # Format as "Company Name (SYMBOL)" if we have both
-                if name and symbol and name != symbol:
-                    company_names.append(f"{name} ({symbol})")
-                else:
-                    company_names.append(name)
-            
-            # Fetch revenue projections for 2030
-            revenue_projections_2030, projections_successful = client.get_revenue_projection_2030_batch(
-                company_names, 
-                progress_callback=progress_callback,
-                delay=1.5
-            )
-            
-            # Add revenue projections to stock data
-            for stock, company_name in zip(stocks, company_names):
-                stock['revenue_projection_2030'] = revenue_projections_2030.get(company_name, None)
-            
-            logger.info(f"Successfully fetched revenue projections 2030 for {projections_successful}/{len(stocks)} companies")
+        # Get company names with ticker symbols for better accuracy
+        company_names = self._company_names(stocks)
+        
+        # Fetch concurrently, bounded by the Perplexity concurrency limit
+        revenue_projections_2030, projections_successful = self._run_perplexity_batches(
+            perplexity_api_key, company_names, ['get_revenue_projection_2030_batch'], progress_callback
+        )[0]
+        
+        # Add revenue projections to stock data
+        for stock, company_name in zip(stocks, company_names):
+            stock['revenue_projection_2030'] = revenue_projections_2030.get(company_name, None)
+        
+        logger.info(f"Successfully fetched revenue projections 2030 for {projections_successful}/{len(stocks)} companies")
         
         return stocks
     
@@ -667,111 +1058,63 @@ class FMPAPIClient:
             logger.warning("No Perplexity API key provided, skipping enrichment")
             return stocks
         
+        self.fetch_perplexity_details(stocks, perplexity_api_key, progress_callback=progress_callback)
+        
+        # Fetch financial metrics and consensus price targets concurrently
+        self.enrich_with_financial_data(
+            stocks, self._company_names(stocks), progress_callback=progress_callback
+        )
+        
+        return stocks
+    
+    def fetch_perplexity_details(self, stocks: List[Dict[str, Any]],
+                                 perplexity_api_key: str,
+                                 progress_callback: Optional[Callable] = None) -> List[Dict[str, Any]]:
+        """Fetch the Perplexity part of enrich_remaining_data.
+        
+        Descriptions, P/S ratios, earnings guidance, analyst price targets and
+        investment evaluations are fetched; FMP financial data is not.
+        
+        Args:
+            stocks: List of stock dictionaries
+            perplexity_api_key: Perplexity API key
+            progress_callback: Optional callback for progress updates
+        
+        Returns:
+            List of stocks with the Perplexity fields added
+        """
         logger.info("Fetching company data from Perplexity API")
         
-        # Initialize Perplexity client
-        with PerplexityClient(perplexity_api_key) as client:
-            # Get company names with ticker symbols for better accuracy
-            company_names = []
-            for stock in stocks:
-                name = stock.get('name', stock.get('symbol', 'Unknown'))
-                symbol = stock.get('symbol', '')
-                # Format as "Company Name (SYMBOL)" if we have both
-                if name and symbol and name != symbol:
-                    company_names.append(f"{name} ({symbol})")
-                else:
-                    company_names.append(name)
-            
-            # Fetch descriptions
-            descriptions, desc_successful = client.get_descriptions_batch(
-                company_names, 
-                progress_callback=progress_callback,
-                delay=1.5
-            )
-            
-            # Fetch P/S ratios
-            ps_ratios, ps_successful = client.get_ps_ratios_batch(
-                company_names, 
-                progress_callback=progress_callback,
-                delay=1.5
-            )
-            
-            # Fetch earnings guidance
-            earnings_guidance, guidance_successful = client.get_earnings_guidance_batch(
-                company_names, 
-                progress_callback=progress_callback,
-                delay=1.5
-            )
-            
-            # Fetch analyst price targets
-            analyst_price_targets, price_targets_successful = client.get_analyst_price_targets_batch(
-                company_names, 
-                progress_callback=progress_callback,
-                delay=1.5
-            )
-            
-            # Fetch investment evaluations
-            investment_evaluations, evaluation_successful = client.get_investment_evaluation_batch(
-                company_names,
-                progress_callback=progress_callback,
-                delay=1.5
-            )
-            
-            # Add descriptions, P/S ratios, earnings guidance, analyst price targets, and investment evaluations to stock data
-            for stock, company_name in zip(stocks, company_names):
-                # Parse the structured description response
-                full_description = descriptions.get(company_name, None)
-                if full_description:
-                    parsed = self._parse_company_analysis(full_description)
-                    stock['description'] = parsed['short_description']
-                    stock['competitive_score'] = parsed['competitive_score']
-                    stock['competitive_reasoning'] = parsed['competitive_reasoning']
-                    stock['market_growth_score'] = parsed['growth_score']
-                    stock['market_growth_reasoning'] = parsed['growth_reasoning']
-                else:
-                    stock['description'] = None
-                    stock['competitive_score'] = None
-                    stock['competitive_reasoning'] = None
-                    stock['market_growth_score'] = None
-                    stock['market_growth_reasoning'] = None
-                
-                stock['ps_ratio'] = ps_ratios.get(company_name, None)
-                stock['earnings_guidance'] = earnings_guidance.get(company_name, None)
-                stock['analyst_price_targets'] = analyst_price_targets.get(company_name, None)
-                stock['investment_evaluation'] = investment_evaluations.get(company_name, None)
-                
-                # Fetch financial metrics
-                symbol = stock.get('symbol', '')
-                if symbol:
-                    financial_metrics = self.fetch_financial_metrics(symbol)
-                    stock['gross_margin'] = financial_metrics['gross_margin']
-                    stock['rd_margin'] = financial_metrics['rd_margin']
-                    stock['ebitda_margin'] = financial_metrics['ebitda_margin']
-                    stock['net_income_margin'] = financial_metrics['net_income_margin']
-                    stock['long_term_debt'] = financial_metrics['long_term_debt']
-                    stock['cash_and_equivalents'] = financial_metrics['cash_and_equivalents']
-                    
-                    # Fetch consensus price target history
-                    consensus_data = self.fetch_consensus_price_targets(symbol)
-                    stock['pt_consensus_current'] = consensus_data['pt_consensus_current']
-                    stock['pt_consensus_7d'] = consensus_data['pt_consensus_7d']
-                    stock['pt_consensus_30d'] = consensus_data['pt_consensus_30d']
-                    stock['pt_consensus_180d'] = consensus_data['pt_consensus_180d']
-                    stock['pt_change_7d'] = consensus_data['pt_change_7d']
-                    stock['pt_change_30d'] = consensus_data['pt_change_30d']
-                    stock['pt_change_180d'] = consensus_data['pt_change_180d']
-                    
-                    if progress_callback:
-                        progress_callback(company_name, True, "financial_metrics")
-            
-            logger.info(f"Successfully fetched descriptions for {desc_successful}/{len(stocks)} companies")
-            logger.info(f"Successfully fetched P/S ratios for {ps_successful}/{len(stocks)} companies")
-            logger.info(f"Successfully fetched earnings guidance for {guidance_successful}/{len(stocks)} companies")
-            logger.info(f"Successfully fetched analyst price targets for {price_targets_successful}/{len(stocks)} companies")
-            logger.info(f"Successfully fetched investment evaluations for {evaluation_successful}/{len(stocks)} companies")
+        company_names = self._company_names(stocks)
+        
+        # Short fields and investment evaluations run concurrently
+        investment_evaluations, evaluation_successful = self._fetch_short_fields(
+            stocks, company_names, perplexity_api_key,
+            ['get_investment_evaluation_batch'],
+            progress_callback
+        )[0]
+        
+        for stock, company_name in zip(stocks, company_names):
+            stock['investment_evaluation'] = investment_evaluations.get(company_name, None)
+        
+        logger.info(f"Successfully fetched investment evaluations for {evaluation_successful}/{len(stocks)} companies")
         
         return stocks
     
+    @staticmethod
+    def _company_names(stocks: List[Dict[str, Any]]) -> List[str]:
+        """Get display names formatted as "Company Name (SYMBOL)" for Perplexity prompts."""
+        company_names = []
+        for stock in stocks:
+            name = stock.get('name', stock.get('symbol', 'Unknown'))
+            symbol = stock.get('symbol', '')
+            # Format as "Company Name (SYMBOL)" if we have both
+            if name and symbol and name != symbol:
+                company_names.append(f"{name} ({symbol})")
+            else:
+                company_names.append(name)
+        return company_names
+    
     def enrich_with_descriptions(self, stocks: List[Dict[str, Any]], 
                                  perplexity_api_key: str,
                                  progress_callback: Optional[Callable] = None) -> List[Dict[str, Any]]:
@@ -791,151 +1134,64 @@ class FMPAPIClient:
         
         logger.info("Fetching company data from Perplexity API")
         
-        # Initialize Perplexity client
-        with PerplexityClient(perplexity_api_key) as client:
-            # Get company names with ticker symbols for better accuracy
-            company_names = []
-            for stock in stocks:
-                name = stock.get('name', stock.get('symbol', 'Unknown'))
-                symbol = stock.get('symbol', '')
-                # Format as "Company Name (SYMBOL)" if we have both
-                if name and symbol and name != symbol:
-                    company_names.append(f"{name} ({symbol})")
-                else:
-                    company_names.append(name)
-            
-            # Fetch descriptions
-            descriptions, desc_successful = client.get_descriptions_batch(
-                company_names, 
-                progress_callback=progress_callback,
-                delay=1.5
-            )
-            
-            # Fetch growth rates
-            growth_rates, growth_successful = client.get_growth_rates_batch(
-                company_names, 
-                progress_callback=progress_callback,
-                delay=1.5
-            )
-            
-            # Fetch P/S ratios
-            ps_ratios, ps_successful = client.get_ps_ratios_batch(
-                company_names, 
-                progress_callback=progress_callback,
-                delay=1.5
-            )
-            
-            # Fetch earnings guidance
-            earnings_guidance, guidance_successful = client.get_earnings_guidance_batch(
-                company_names, 
-                progress_callback=progress_callback,
-                delay=1.5
-            )
-            
-            # Fetch analyst price targets
-            analyst_price_targets, price_targets_successful = client.get_analyst_price_targets_batch(
-                company_names, 
-                progress_callback=progress_callback,
-                delay=1.5
-            )
-            
-            # Fetch revenue projections for 2030
-            revenue_projections_2030, projections_successful = client.get_revenue_projection_2030_batch(
-                company_names, 
-                progress_callback=progress_callback,
-                delay=1.5
-            )
-            
-            # Fetch investment evaluations
-            investment_evaluations, evaluation_successful = client.get_investment_evaluation_batch(
-                company_names,
-                progress_callback=progress_callback,
-                delay=1.5
-            )
-            
-            # Add descriptions, growth rates, P/S ratios, and earnings guidance to stock data
-            for stock, company_name in zip(stocks, company_names):
-                # Parse the structured description response
-                full_description = descriptions.get(company_name, None)
-                if full_description:
-                    parsed = self._parse_company_analysis(full_description)
-                    stock['description'] = parsed['short_description']
-                    stock['competitive_score'] = parsed['competitive_score']
-                    stock['competitive_reasoning'] = parsed['competitive_reasoning']
-                    stock['market_growth_score'] = parsed['growth_score']
-                    stock['market_growth_reasoning'] = parsed['growth_reasoning']
-                else:
-                    stock['description'] = None
-                    stock['competitive_score'] = None
-                    stock['competitive_reasoning'] = None
-                    stock['market_growth_score'] = None
-                    stock['market_growth_reasoning'] = None
-                
-                stock['growth_rate'] = growth_rates.get(company_name, None)
-                stock['ps_ratio'] = ps_ratios.get(company_name, None)
-                stock['earnings_guidance'] = earnings_guidance.get(company_name, None)
-                stock['analyst_price_targets'] = analyst_price_targets.get(company_name, None)
-                stock['revenue_projection_2030'] = revenue_projections_2030.get(company_name, None)
-                stock['investment_evaluation'] = investment_evaluations.get(company_name, None)
-                
-                # Fetch financial metrics
-                symbol = stock.get('symbol', '')
-                if symbol:
-                    financial_metrics = self.fetch_financial_metrics(symbol)
-                    stock['gross_margin'] = financial_metrics['gross_margin']
-                    stock['rd_margin'] = financial_metrics['rd_margin']
-                    stock['ebitda_margin'] = financial_metrics['ebitda_margin']
-                    stock['net_income_margin'] = financial_metrics['net_income_margin']
-                    stock['long_term_debt'] = financial_metrics['long_term_debt']
-                    stock['cash_and_equivalents'] = financial_metrics['cash_and_equivalents']
-                    
-                    # Fetch consensus price target history
-                    consensus_data = self.fetch_consensus_price_targets(symbol)
-                    stock['pt_consensus_current'] = consensus_data['pt_consensus_current']
-                    stock['pt_consensus_7d'] = consensus_data['pt_consensus_7d']
-                    stock['pt_consensus_30d'] = consensus_data['pt_consensus_30d']
-                    stock['pt_consensus_180d'] = consensus_data['pt_consensus_180d']
-                    stock['pt_change_7d'] = consensus_data['pt_change_7d']
-                    stock['pt_change_30d'] = consensus_data['pt_change_30d']
-                    stock['pt_change_180d'] = consensus_data['pt_change_180d']
-                    
-                    if progress_callback:
-                        progress_callback(company_name, True, "financial_metrics")
-            
-            logger.info(f"Successfully fetched descriptions for {desc_successful}/{len(stocks)} companies")
-            logger.info(f"Successfully fetched growth rates for {growth_successful}/{len(stocks)} companies")
-            logger.info(f"Successfully fetched P/S ratios for {ps_successful}/{len(stocks)} companies")
-            logger.info(f"Successfully fetched earnings guidance for {guidance_successful}/{len(stocks)} companies")
-            logger.info(f"Successfully fetched analyst price targets for {price_targets_successful}/{len(stocks)} companies")
-            logger.info(f"Successfully fetched revenue projections 2030 for {projections_successful}/{len(stocks)} companies")
-            logger.info(f"Successfully fetched investment evaluations for {evaluation_successful}/{len(stocks)} companies")
+        # Get company names with ticker symbols for better accuracy
+        company_names = self._company_names(stocks)
+        
+        # Short fields run concurrently with the remaining batches
+        (
+            (growth_rates, growth_successful),
+            (revenue_projections_2030, projections_successful),
+            (investment_evaluations, evaluation_successful),
+        ) = self._fetch_short_fields(
+            stocks, company_names, perplexity_api_key, [
+                'get_growth_rates_batch',
+                'get_revenue_projection_2030_batch',
+                'get_investment_evaluation_batch',
+            ],
+            progress_callback
+        )
+        
+        # Add growth rates, revenue projections, and investment evaluations to stock data
+        for stock, company_name in zip(stocks, company_names):
+            stock['growth_rate'] = growth_rates.get(company_name, None)
+            stock['revenue_projection_2030'] = revenue_projections_2030.get(company_name, None)
+            stock['investment_evaluation'] = investment_evaluations.get(company_name, None)
+        
+        # Fetch financial metrics and consensus price targets concurrently
+        self.enrich_with_financial_data(stocks, company_names, progress_callback=progress_callback)
+        
+        logger.info(f"Successfully fetched growth rates for {growth_successful}/{len(stocks)} companies")
+        logger.info(f"Successfully fetched revenue projections 2030 for {projections_successful}/{len(stocks)} companies")
+        logger.info(f"Successfully fetched investment evaluations for {evaluation_successful}/{len(stocks)} companies")
         
         return stocks
     
-    def fetch_consensus_price_targets(self, symbol: str) -> Dict[str, Any]:
+    def fetch_consensus_price_targets(self, symbol: str, as_of: Optional[datetime] = None) -> Dict[str, Any]:
         """Fetch consensus price targets: current and historical (7d, 30d, 180d ago).
         
         Args:
             symbol: Stock ticker symbol
+            as_of: Compute everything as of this past moment from the target
+                   history, ignoring later targets (default: now)
             
         Returns:
             Dictionary with consensus targets and changes
         """
         try:
-            from datetime import datetime, timedelta
-            
-            # Get current consensus from dedicated endpoint
-            consensus_url = f"https://financialmodelingprep.com/api/v4/price-target-consensus?symbol={symbol}&apikey={self.api_key}"
-            consensus_response = self.session.get(consensus_url, timeout=10)
-            
+            # Get current consensus from dedicated endpoint (only for today)
             current_consensus = None
-            if consensus_response.status_code == 200:
+            consensus_response = None
+            if as_of is None:
+                consensus_url = f"{self.V4_BASE_URL}/price-target-consensus?symbol={symbol}&apikey={self.api_key}"
+                consensus_response = self.session.get(consensus_url, timeout=10)
+            
+            if consensus_response is not None and consensus_response.status_code == 200:
                 consensus_data = consensus_response.json()
                 if consensus_data and isinstance(consensus_data, list) and len(consensus_data) > 0:
                     current_consensus = consensus_data[0].get('targetConsensus', None)
             
             # Get historical price targets to calculate past consensus
-            targets_url = f"https://financialmodelingprep.com/api/v4/price-target?symbol={symbol}&apikey={self.api_key}"
+            targets_url = f"{self.V4_BASE_URL}/price-target?symbol={symbol}&apikey={self.api_key}"
             targets_response = self.session.get(targets_url, timeout=10)
             
             if targets_response.status_code != 200:
@@ -962,46 +1218,19 @@ class FMPAPIClient:
                     'pt_change_180d': None
                 }
             
-            # Define time points
-            now = datetime.now()
-            week_ago = now - timedelta(days=7)
-            month_ago = now - timedelta(days=30)
-            six_months_ago = now - timedelta(days=180)
-            
-            def get_consensus_at_date(cutoff_date):
-                """Calculate consensus by taking most recent target from each analyst before cutoff."""
-                analyst_targets = {}
-                
-                for item in data:
-                    date_str = item.get('publishedDate', '')
-                    if 'T' in date_str:
-                        try:
-                            date = datetime.fromisoformat(date_str.replace('Z', '+00:00').replace('.000+00:00', ''))
-                            date = date.replace(tzinfo=None)
-                            
-                            if date <= cutoff_date:
-                                analyst = item.get('analystCompany', 'Unknown')
-                                target = item.get('priceTarget', 0)
-                                
-                                # Keep most recent target for each analyst before cutoff
-                                if analyst not in analyst_targets or date > analyst_targets[analyst]['date']:
-                                    analyst_targets[analyst] = {'target': target, 'date': date}
-                        except:
-                            continue
-                
-                if analyst_targets:
-                    targets = [v['target'] for v in analyst_targets.values()]
-                    return sum(targets) / len(targets)
-                return None
-            
-            # Calculate historical consensus
-            consensus_7d = get_consensus_at_date(week_ago)
-            consensus_30d = get_consensus_at_date(month_ago)
-            consensus_180d = get_consensus_at_date(six_months_ago)
+            # Parse and sort the history once, then answer every cutoff in one pass
+            history = ConsensusHistory.from_fmp(data)
+            now = as_of or datetime.now()
+            consensus_now, consensus_7d, consensus_30d, consensus_180d = history.consensus_at_many([
+                now,
+                now - timedelta(days=7),
+                now - timedelta(days=30),
+                now - timedelta(days=180),
+            ])
             
             # If no current consensus from API, calculate from recent targets
             if current_consensus is None:
-                current_consensus = get_consensus_at_date(now)
+                current_consensus = consensus_now
             
             # Calculate changes
             change_7d = None
@@ -1037,45 +1266,53 @@ class FMPAPIClient:
                 'pt_change_180d': None
             }
     
-    def fetch_financial_metrics(self, symbol: str) -> Dict[str, Any]:
-        """Fetch financial metrics for a single stock.
+    def _fetch_ratio_metrics(self, symbol: str, as_of: Optional[datetime] = None) -> Dict[str, Any]:
+        """Fetch gross and net income margins from the financial ratios endpoint.
         
         Args:
             symbol: Stock ticker symbol
+            as_of: Use the latest ratios public at this past moment (default: latest)
             
         Returns:
-            Dictionary with financial metrics
+            Dictionary with the margins found (may be empty)
         """
-        metrics = {
-            'gross_margin': None,
-            'rd_margin': None,
-            'ebitda_margin': None,
-            'net_income_margin': None,
-            'long_term_debt': None,
-            'cash_and_equivalents': None
-        }
+        metrics = {}
         
         try:
             # Fetch financial ratios (pre-calculated margins)
-            ratios_url = f"{self.BASE_URL}/ratios/{symbol}?limit=1&apikey={self.api_key}"
+            ratios_url = f"{self.BASE_URL}/ratios/{symbol}?limit={self._statement_limit(as_of)}&apikey={self.api_key}"
             ratios_response = self.session.get(ratios_url, timeout=10)
             if ratios_response.status_code == 200:
-                ratios_data = ratios_response.json()
-                if ratios_data and len(ratios_data) > 0:
-                    latest_ratios = ratios_data[0]
+                latest_ratios = self._statement_as_of(ratios_response.json(), as_of)
+                if latest_ratios:
                     # Convert decimals to percentages
                     if latest_ratios.get('grossProfitMargin'):
                         metrics['gross_margin'] = latest_ratios['grossProfitMargin'] * 100
                     if latest_ratios.get('netProfitMargin'):
                         metrics['net_income_margin'] = latest_ratios['netProfitMargin'] * 100
+        except Exception as e:
+            logger.warning(f"Error fetching financial ratios for {symbol}: {e}")
+        
+        return metrics
+    
+    def _fetch_income_metrics(self, symbol: str, as_of: Optional[datetime] = None) -> Dict[str, Any]:
+        """Fetch R&D and EBITDA margins from the income statement endpoint.
+        
+        Args:
+            symbol: Stock ticker symbol
+            as_of: Use the latest statement filed by this past moment (default: latest)
             
-            # Fetch income statement for R&D and EBITDA margins
-            income_url = f"{self.BASE_URL}/income-statement/{symbol}?limit=1&apikey={self.api_key}"
+        Returns:
+            Dictionary with the margins found (may be empty)
+        """
+        metrics = {}
+        
+        try:
+            income_url = f"{self.BASE_URL}/income-statement/{symbol}?limit={self._statement_limit(as_of)}&apikey={self.api_key}"
             income_response = self.session.get(income_url, timeout=10)
             if income_response.status_code == 200:
-                income_data = income_response.json()
-                if income_data and len(income_data) > 0:
-                    latest_income = income_data[0]
+                latest_income = self._statement_as_of(income_response.json(), as_of)
+                if latest_income:
                     revenue = latest_income.get('revenue', 0)
                     if revenue and revenue > 0:
                         # Calculate R&D margin
@@ -1087,31 +1324,198 @@ class FMPAPIClient:
                         ebitda = latest_income.get('ebitda', 0)
                         if ebitda:
                             metrics['ebitda_margin'] = (ebitda / revenue) * 100
+        except Exception as e:
+            logger.warning(f"Error fetching income statement for {symbol}: {e}")
+        
+        return metrics
+    
+    def _fetch_balance_metrics(self, symbol: str, as_of: Optional[datetime] = None) -> Dict[str, Any]:
+        """Fetch long-term debt and cash from the balance sheet endpoint.
+        
+        Args:
+            symbol: Stock ticker symbol
+            as_of: Use the latest balance sheet filed by this past moment (default: latest)
             
-            # Fetch balance sheet for debt and cash
-            balance_url = f"{self.BASE_URL}/balance-sheet-statement/{symbol}?limit=1&apikey={self.api_key}"
+        Returns:
+            Dictionary with the balance sheet values found (may be empty)
+        """
+        metrics = {}
+        
+        try:
+            balance_url = f"{self.BASE_URL}/balance-sheet-statement/{symbol}?limit={self._statement_limit(as_of)}&apikey={self.api_key}"
             balance_response = self.session.get(balance_url, timeout=10)
             if balance_response.status_code == 200:
-                balance_data = balance_response.json()
-                if balance_data and len(balance_data) > 0:
-                    latest_balance = balance_data[0]
+                latest_balance = self._statement_as_of(balance_response.json(), as_of)
+                if latest_balance:
                     metrics['long_term_debt'] = latest_balance.get('longTermDebt', None)
                     metrics['cash_and_equivalents'] = latest_balance.get('cashAndCashEquivalents', None)
-                    
         except Exception as e:
-            logger.warning(f"Error fetching financial metrics for {symbol}: {e}")
+            logger.warning(f"Error fetching balance sheet for {symbol}: {e}")
         
         return metrics
     
+    def _statement_limit(self, as_of: Optional[datetime]) -> int:
+        """Get the number of statements to request: the latest, or enough history for a past date."""
+        return 1 if as_of is None else self.STATEMENT_HISTORY_LIMIT
+    
+    def _statement_as_of(self, rows: Any, as_of: Optional[datetime]) -> Optional[Dict[str, Any]]:
+        """Pick the newest statement row that was public at a point in time.
+        
+        Args:
+            rows: Statement rows, newest first
+            as_of: Point in time, or None for the newest row
+        
+        Returns:
+            Statement row, or None if there is none
+        """
+        if not rows or not isinstance(rows, list):
+            return None
+        if as_of is None:
+            return rows[0]
+        
+        for row in rows:
+            filed = row.get('fillingDate') or row.get('acceptedDate')
+            try:
+                if filed:
+                    public = datetime.strptime(filed[:10], '%Y-%m-%d')
+                else:
+                    public = datetime.strptime(row.get('date', '')[:10], '%Y-%m-%d') + timedelta(days=self.FILING_LAG_DAYS)
+            except ValueError:
+                continue
+            if public <= as_of:
+                return row
+        return None
+    
+    @staticmethod
+    def _empty_financial_metrics() -> Dict[str, Any]:
+        """Return a financial metrics dictionary with every value unset."""
+        return {
+            'gross_margin': None,
+            'rd_margin': None,
+            'ebitda_margin': None,
+            'net_income_margin': None,
+            'long_term_debt': None,
+            'cash_and_equivalents': None
+        }
+    
+    def fetch_financial_metrics(self, symbol: str, as_of: Optional[datetime] = None) -> Dict[str, Any]:
+        """Fetch financial metrics for a single stock.
+        
+        Args:
+            symbol: Stock ticker symbol
+            as_of: Use the statements public at this past moment (default: latest)
+        
+        Returns:
+            Dictionary with financial metrics
+        """
+        metrics = self._empty_financial_metrics()
+        metrics.update(self._fetch_ratio_metrics(symbol, as_of))
+        metrics.update(self._fetch_income_metrics(symbol, as_of))
+        metrics.update(self._fetch_balance_metrics(symbol, as_of))
+        return metrics
+    
+    def fetch_financial_metrics_batch(self, symbols: List[str],
+                                      max_workers: Optional[int] = None,
+                                      as_of: Optional[datetime] = None) -> Dict[str, Dict[str, Any]]:
+        """Fetch financial metrics for many stocks concurrently.
+        
+        Each symbol's ratios, income statement and balance sheet requests are
+        submitted as separate tasks to a thread pool bounded by max_workers.
+        
+        Args:
+            symbols: Stock ticker symbols
+            max_workers: Maximum concurrent requests (default: client max_workers)
+            as_of: Use the statements public at this past moment (default: latest)
+        
+        Returns:
+            Dictionary mapping symbols to financial metrics
+        """
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as executor:
+            return self._collect_financial_metrics(executor, symbols, as_of)
+    
+    def _collect_financial_metrics(self, executor: ThreadPoolExecutor, symbols: List[str],
+                                   as_of: Optional[datetime] = None) -> Dict[str, Dict[str, Any]]:
+        """Submit per-endpoint metric requests to an executor and merge the results.
+        
+        Args:
+            executor: Thread pool to run the requests on
+            symbols: Stock ticker symbols
+            as_of: Use the statements public at this past moment (default: latest)
+        
+        Returns:
+            Dictionary mapping symbols to financial metrics
+        """
+        unique_symbols = list(dict.fromkeys(s for s in symbols if s))
+        fetchers = (self._fetch_ratio_metrics, self._fetch_income_metrics, self._fetch_balance_metrics)
+        futures = [
+            (symbol, executor.submit(fetcher, symbol, as_of))
+            for symbol in unique_symbols
+            for fetcher in fetchers
+        ]
+        
+        results = {symbol: self._empty_financial_metrics() for symbol in unique_symbols}
+        for symbol, future in futures:
+            results[symbol].update(future.result())
+        
+        return results
+    
+    def enrich_with_financial_data(self, stocks: List[Dict[str, Any]],
+                                   company_names: Optional[List[str]] = None,
+                                   progress_callback: Optional[Callable] = None,
+                                   max_workers: Optional[int] = None,
+                                   as_of: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Enrich stocks with FMP financial metrics and consensus price targets.
+        
+        Requests for all symbols and endpoints are fanned out across one bounded
+        thread pool; results are merged back into the stocks in their original order.
+        
+        Args:
+            stocks: List of stock dictionaries
+            company_names: Display names for progress updates (default: symbols)
+            progress_callback: Optional callback for progress updates
+            max_workers: Maximum concurrent requests (default: client max_workers)
+            as_of: Use only statements and price targets public at this past
+                   moment (default: latest)
+        
+        Returns:
+            List of stocks with added margin, balance sheet and consensus data
+        """
+        symbols = [stock.get('symbol', '') for stock in stocks]
+        if company_names is None:
+            company_names = symbols
+        
+        with ThreadPoolExecutor(max_workers=max_workers or self.max_workers) as executor:
+            consensus_futures = {
+                symbol: executor.submit(self.fetch_consensus_price_targets, symbol, as_of)
+                for symbol in dict.fromkeys(s for s in symbols if s)
+            }
+            metrics_by_symbol = self._collect_financial_metrics(executor, symbols, as_of)
+            consensus_by_symbol = {symbol: future.result() for symbol, future in consensus_futures.items()}
+        
+        for stock, symbol, company_name in zip(stocks, symbols, company_names):
+            if not symbol:
+                continue
+            
+            stock.update(metrics_by_symbol[symbol])
+            stock.update(consensus_by_symbol[symbol])
+            
+            if progress_callback:
+                progress_callback(company_name, True, "financial_metrics")
+        
+        return stocks
+    
     def enrich_with_polygon_data(self, stocks: List[Dict[str, Any]], 
                                  polygon_api_key: str,
-                                 progress_callback: Optional[Callable] = None) -> List[Dict[str, Any]]:
+                                 progress_callback: Optional[Callable] = None,
+                                 as_of: Optional[datetime] = None) -> List[Dict[str, Any]]:
         """Enrich stock data with Polygon analyst ratings and price targets.
         
         Args:
             stocks: List of stock dictionaries
             polygon_api_key: Polygon API key
             progress_callback: Optional callback for progress updates
+            as_of: Compute the consensus from ratings published by this past
+                   moment (default: now)
             
         Returns:
             List of stocks with added Polygon analyst data
@@ -1122,13 +1526,17 @@ class FMPAPIClient:
         
         logger.info("Fetching analyst ratings from Polygon API")
         
-        # Initialize Polygon client
-        with PolygonClient(polygon_api_key) as client:
+        # Initialize Polygon client (imported here so runs without a Polygon key never load it)
+        from polygon_client import PolygonClient
+        
+        with PolygonClient(polygon_api_key, max_workers=self.polygon_max_workers,
+                           ratings_store=self.ratings_store,
+                           base_url=self.polygon_base_url) as client:
             # Get tickers
             tickers = [stock.get('symbol', '') for stock in stocks if stock.get('symbol')]
             
-            # Fetch price targets in batch
-            polygon_data = client.get_price_targets_batch(tickers)
+            # Fetch price targets concurrently
+            polygon_data = client.get_price_targets_batch(tickers, as_of=as_of)
             
             # Add Polygon data to stocks
             for stock in stocks:
@@ -0,0 +1,271 @@
+"""Historical backfill: the FMP and Polygon screening stages replayed for past dates."""
+
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from api_client import FMPAPIClient
+from checkpoint import RunCheckpoint
+from config import Config
+from http_cache import create_response_cache
+from instrumentation import reset_metrics
+from rate_limiter import configure_limiter, parse_rate
+from stock_record import gain_percentage
+
+
+logger = logging.getLogger(__name__)
+
+# Stages saved to each date's directory, in run order
+BACKFILL_STAGES = ['gainers', 'complete']
+
+# Recorded in every backfilled date's run manifest
+SURVIVORSHIP_CAVEAT = (
+    "Market caps are today's profile share counts times the day's close, and industries "
+    "come from today's profiles. Symbols without a profile (often delisted or acquired "
+    "since) keep an unknown market cap and skip the market cap filter instead of being dropped."
+)
+
+# Unscheduled NYSE closures (storms, national days of mourning)
+SPECIAL_CLOSURES = {
+    date(2012, 10, 29), date(2012, 10, 30),
+    date(2018, 12, 5),
+    date(2025, 1, 9),
+}
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """Get the nth given weekday of a month (n=-1 for the last one)."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = (date(year, month + 1, 1) if month < 12 else date(year + 1, 1, 1)) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """Get the date of Easter Sunday (anonymous Gregorian algorithm)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 19 * l) // 433
+    month = (h + l - 7 * m + 90) // 25
+    return date(year, month, (h + l - 7 * m + 33 * month + 19) % 32)
+
+
+def _observed(holiday: date) -> date:
+    """Move a fixed-date holiday on a weekend to the Friday before or Monday after."""
+    if holiday.weekday() == 5:
+        return holiday - timedelta(days=1)
+    if holiday.weekday() == 6:
+        return holiday + timedelta(days=1)
+    return holiday
+
+
+def market_holidays(year: int) -> Set[date]:
+    """Get the full-day NYSE holidays of a year, including SPECIAL_CLOSURES.
+    
+    Args:
+        year: Calendar year
+    
+    Returns:
+        Set of weekday dates the market was (or will be) closed
+    """
+    holidays = {
+        _nth_weekday(year, 1, 0, 3),        # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),        # Washington's Birthday
+        _easter(year) - timedelta(days=2),  # Good Friday
+        _nth_weekday(year, 5, 0, -1),       # Memorial Day
+        _observed(date(year, 7, 4)),        # Independence Day
+        _nth_weekday(year, 9, 0, 1),        # Labor Day
+        _nth_weekday(year, 11, 3, 4),       # Thanksgiving
+        _observed(date(year, 12, 25)),      # Christmas
+    }
+    # New Year's Day on a Saturday isn't observed on the Friday before
+    if date(year, 1, 1).weekday() != 5:
+        holidays.add(_observed(date(year, 1, 1)))
+    if year >= 2022:
+        holidays.add(_observed(date(year, 6, 19)))  # Juneteenth
+    holidays.update(day for day in SPECIAL_CLOSURES if day.year == year)
+    return holidays
+
+
+def trading_days(start: date, end: date) -> List[date]:
+    """Get the NYSE trading days from start to end, inclusive.
+    
+    Args:
+        start: First date
+        end: Last date
+    
+    Returns:
+        List of dates in order, without weekends and market holidays
+    """
+    holidays = set()
+    for year in range(start.year, end.year + 1):
+        holidays |= market_holidays(year)
+    
+    days = []
+    day = start
+    while day <= end:
+        if day.weekday() < 5 and day not in holidays:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+def point_in_time_cutoff(day: date) -> datetime:
+    """Get the moment a backfilled date's data is cut off at: the end of that day."""
+    return datetime.combine(day, datetime.max.time()).replace(microsecond=0)
+
+
+def share_rate_limits(config: Config, processes: int) -> None:
+    """Give one worker process its share of the provider rate limits.
+    
+    Each process has its own limiters, so every worker gets 1/processes of
+    the configured rate to keep the total within the provider limits.
+    
+    Args:
+        config: Application configuration
+        processes: Number of worker processes
+    """
+    for provider, rate in (('fmp', config.fmp_rate_limit), ('polygon', config.polygon_rate_limit)):
+        try:
+            per_second = parse_rate(rate) / max(1, processes)
+        except ValueError as e:
+            logger.warning(f"{e}; using the default {provider} rate limit")
+            continue
+        configure_limiter(provider, f"{per_second:.6f}/s")
+
+
+def backfill_day(day: date, processes: int = 1) -> Dict[str, Any]:
+    """Screen one past date and store its results (runs in a worker process).
+    
+    The day's gainers are reconstructed from bulk end-of-day prices, filtered
+    by market cap and industry, and enriched with the FMP financial data and
+    Polygon analyst consensus public at the end of that day. Perplexity stages
+    are skipped because their answers can't be pinned to a past date. Gainers
+    without a current profile are kept with an unknown market cap (see
+    SURVIVORSHIP_CAVEAT).
+    
+    Args:
+        day: Trading date to backfill
+        processes: Number of worker processes sharing the rate limits
+    
+    Returns:
+        Summary with the date, gainer and stock counts, the number of stocks
+        with an unknown market cap and seconds taken
+    
+    Raises:
+        ValueError: If FMP has no end-of-day prices for the day or the days
+                    before it; nothing is stored, so the date is retried later
+    """
+    config = Config()
+    share_rate_limits(config, processes)
+    metrics = reset_metrics()
+    store = RunCheckpoint(config.backfill_dir, run_date=day.isoformat())
+    cutoff = point_in_time_cutoff(day)
+    started = time.perf_counter()
+    
+    with FMPAPIClient(config.fmp_api_key, max_workers=config.fmp_max_workers,
+                      cache=create_response_cache(config),
+                      polygon_max_workers=config.polygon_max_workers,
+                      base_url=config.fmp_base_url,
+                      polygon_base_url=config.polygon_base_url) as api_client:
+        with metrics.stage('gainers'):
+            stocks = api_client.get_historical_gainers(day, min_gain=10.0)
+        gainers = len(stocks)
+        store.save('gainers', stocks)
+        
+        with metrics.stage('profiles'):
+            # Symbols without a current profile (often delisted or acquired since)
+            # have no market cap; dropping them would leave only the survivors
+            unknown_cap = [stock for stock in stocks if stock.get('mktCap') is None]
+            known_cap = [stock for stock in stocks if stock.get('mktCap') is not None]
+            stocks = api_client.filter_by_market_cap(known_cap, min_market_cap=300_000_000) + unknown_cap
+            stocks = api_client.filter_by_industry(stocks, exclude_biotech=True)
+        
+        if stocks:
+            with metrics.stage('financials'):
+                stocks = api_client.enrich_with_financial_data(stocks, as_of=cutoff)
+        
+        if stocks and config.polygon_api_key:
+            with metrics.stage('polygon'):
+                stocks = api_client.enrich_with_polygon_data(stocks, config.polygon_api_key, as_of=cutoff)
+    
+    stocks = sorted(stocks, key=lambda stock: gain_percentage(stock) or 0.0, reverse=True)
+    store.save('complete', stocks)
+    metrics.write_manifest(os.path.join(store.directory, 'run_manifest.json'),
+                           status='succeeded', backfill=True, as_of=cutoff.isoformat(),
+                           market_cap_unknown=len(unknown_cap),
+                           caveats=[SURVIVORSHIP_CAVEAT])
+    
+    return {
+        'date': day.isoformat(),
+        'gainers': gainers,
+        'stocks': len(stocks),
+        'market_cap_unknown': len(unknown_cap),
+        'seconds': round(time.perf_counter() - started, 1),
+    }
+
+
+def run_backfill(config: Config, start: date, end: date,
+                 workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Backfill every trading day in a range, several dates at a time.
+    
+    Dates whose results are already stored are skipped, so an interrupted
+    backfill continues where it stopped.
+    
+    Args:
+        config: Application configuration
+        start: First date
+        end: Last date (before today)
+        workers: Worker processes (default: config.backfill_workers)
+    
+    Returns:
+        Per-date summaries (see backfill_day) in date order; failed dates have
+        an 'error' entry instead of counts
+    
+    Raises:
+        ValueError: If the range is empty or not entirely in the past
+    """
+    if start > end:
+        raise ValueError(f"Backfill start {start} is after end {end}")
+    if end >= date.today():
+        raise ValueError(f"Backfill end {end} must be before today")
+    
+    days = trading_days(start, end)
+    pending = [
+        day for day in days
+        if RunCheckpoint(config.backfill_dir, run_date=day.isoformat()).last_completed(BACKFILL_STAGES) != 'complete'
+    ]
+    if len(pending) < len(days):
+        print(f"✓ Skipping {len(days) - len(pending)} dates already in {config.backfill_dir}")
+    if not pending:
+        return []
+    
+    processes = min(workers or config.backfill_workers, len(pending))
+    print(f"✓ Backfilling {len(pending)} dates with {processes} worker processes...")
+    logger.info(f"Backfilling {len(pending)} dates from {start} to {end} with {processes} processes")
+    
+    results = []
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {executor.submit(backfill_day, day, processes): day for day in pending}
+        for future in as_completed(futures):
+            day = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Backfill of {day} failed: {e}")
+                print(f"  → {day} ✗ ({e})")
+                results.append({'date': day.isoformat(), 'error': str(e)})
+                continue
+            unknown = f", {result['market_cap_unknown']} with unknown market cap" if result['market_cap_unknown'] else ""
+            print(f"  → {day} ✓ ({result['gainers']} gainers → {result['stocks']} stocks{unknown}, {result['seconds']}s)")
+            results.append(result)
+    
+    return sorted(results, key=lambda result: result['date'])
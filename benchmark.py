@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Record a day of stock alert API traffic and replay it as an offline benchmark.
+
+    # Capture today's FMP, Perplexity and Polygon responses (needs real API keys)
+    python benchmark.py record --cassette cassettes/today.jsonl
+
+    # Replay it with 150ms ± 50ms latency and 2% rate-limited responses
+    python benchmark.py replay --cassette cassettes/today.jsonl \\
+        --latency 0.15 --jitter 0.05 --rate-429 0.02 --mode both
+
+Replays never touch the network or send email, and the response cache,
+symbol store and ratings store are disabled so every request is replayed.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict
+
+from replay import RecordReplay
+
+
+def _prepare_environment(mode: str, unlimited: bool) -> None:
+    """Set the environment for a reproducible run before Config is loaded.
+    
+    Args:
+        mode: 'record' or 'replay'
+        unlimited: Lift the provider rate limits (replay only)
+    """
+    # Persistent caches would hide requests from the cassette
+    for name in ('HTTP_CACHE_ENABLED', 'SYMBOL_STORE_ENABLED', 'RATINGS_STORE_ENABLED', 'CHECKPOINT_ENABLED'):
+        os.environ[name] = 'false'
+    
+    if mode == 'replay':
+        # Keys are not part of the recorded requests, but Config requires them
+        for name in ('FMP_API_KEY', 'PERPLEXITY_API_KEY', 'EMAIL_SENDER', 'EMAIL_PASSWORD', 'EMAIL_RECIPIENT'):
+            os.environ.setdefault(name, 'replay')
+        if unlimited:
+            for name in ('FMP_RATE_LIMIT', 'PERPLEXITY_RATE_LIMIT', 'POLYGON_RATE_LIMIT'):
+                os.environ[name] = '1000/s'
+
+
+def run_day(pipeline: bool, fetch_put_call: bool = True, verbose: bool = False) -> Dict[str, Any]:
+    """Run the main.py stages once (without sending email) and collect metrics.
+    
+    Args:
+        pipeline: Use the stage-overlapping pipeline instead of the serial chain
+        fetch_put_call: Whether to fetch the put/call ratio
+        verbose: Show the progress output of the run
+    
+    Returns:
+        Metrics summary with the stock count and wall time added
+    """
+    # Imported here so the environment is prepared before Config is read
+    from config import Config
+    from api_client import FMPAPIClient
+    from rate_limiter import configure_rate_limits
+    from instrumentation import get_metrics, reset_metrics
+    from main import run_filter_chain, run_alert_pipeline, fetch_put_call_ratio
+    
+    metrics = reset_metrics()
+    config = Config()
+    configure_rate_limits(config)
+    
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    started = time.perf_counter()
+    with output, FMPAPIClient(config.fmp_api_key, max_workers=config.fmp_max_workers,
+                              perplexity_concurrency=config.perplexity_max_concurrency,
+                              use_dossier=config.perplexity_dossier_enabled,
+                              technical_batch_size=config.technical_batch_size,
+                              perplexity_stream=config.perplexity_stream,
+                              perplexity_stream_deadline=config.perplexity_stream_deadline,
+                              polygon_max_workers=config.polygon_max_workers,
+                              base_url=config.fmp_base_url,
+                              perplexity_base_url=config.perplexity_base_url,
+                              polygon_base_url=config.polygon_base_url) as api_client:
+        if pipeline:
+            stocks, _ = run_alert_pipeline(api_client, config, fetch_put_call=fetch_put_call)
+        else:
+            stocks = run_filter_chain(api_client, config)
+            if fetch_put_call:
+                with get_metrics().stage('put_call'):
+                    fetch_put_call_ratio(config)
+    wall = time.perf_counter() - started
+    
+    summary = metrics.summary()
+    summary['wall_seconds'] = round(wall, 3)
+    summary['stocks'] = len(stocks)
+    return summary
+
+
+def print_report(name: str, summary: Dict[str, Any], replay_stats: Dict[str, int]) -> None:
+    """Print the per-stage wall times and provider counts of one run."""
+    print(f"\n{name}: {summary['wall_seconds']:.2f}s, {summary['stocks']} stocks")
+    for stage, stats in summary['stages'].items():
+        items = ''
+        if 'items_in' in stats:
+            items = f"  {stats['items_in']} → {stats.get('items_out', '?')}"
+        print(f"  {stage:<24}{stats['seconds']:>9.2f}s{items}")
+    for provider, stats in summary['providers'].items():
+        latency = stats['latency_seconds']
+        print(f"  {provider}: {stats['requests']} requests, {stats['rate_limited']} rate limited, "
+              f"{stats['retries']} retries, p50 {latency['p50']}s, p99 {latency['p99']}s, "
+              f"{stats['rate_limit_wait_seconds']}s waiting for rate limits")
+    print(f"  replay: {replay_stats}")
+
+
+def main() -> None:
+    """Parse arguments and record or replay a day."""
+    parser = argparse.ArgumentParser(
+        description='Record API traffic of a stock alert run, or replay it as a benchmark'
+    )
+    parser.add_argument('command', choices=['record', 'replay'])
+    parser.add_argument('--cassette', default=os.path.join('cassettes', 'day.jsonl'),
+                        help='Cassette file to record to or replay from')
+    parser.add_argument('--mode', choices=['serial', 'pipeline', 'both'], default='both',
+                        help='Which runner(s) to record or replay')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds of latency added to every replayed response')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='Maximum random deviation from --latency, in seconds')
+    parser.add_argument('--rate-429', type=float, default=0.0,
+                        help='Fraction of replayed requests answered with HTTP 429')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Replay each runner this many times')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='Random seed for jitter and injected 429s')
+    parser.add_argument('--unlimited', action='store_true',
+                        help='Lift provider rate limits during replay')
+    parser.add_argument('--json', dest='json_path',
+                        help='Also write all run summaries to this JSON file')
+    parser.add_argument('--verbose', action='store_true',
+                        help='Show run progress and log to stderr')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    if args.command == 'replay' and not os.path.exists(args.cassette):
+        print(f"Cassette not found: {args.cassette}")
+        sys.exit(1)
+    
+    _prepare_environment(args.command, args.unlimited)
+    runners = ['serial', 'pipeline'] if args.mode == 'both' else [args.mode]
+    repeat = 1 if args.command == 'record' else max(1, args.repeat)
+    
+    results = []
+    for runner in runners:
+        for attempt in range(1, repeat + 1):
+            transport = RecordReplay(args.cassette, mode=args.command, latency=args.latency,
+                                     jitter=args.jitter, rate_limit_ratio=args.rate_429,
+                                     seed=args.seed)
+            with transport:
+                summary = run_day(pipeline=runner == 'pipeline', verbose=args.verbose)
+            name = runner if repeat == 1 else f"{runner} #{attempt}"
+            print_report(name, summary, transport.stats)
+            results.append({'runner': runner, 'attempt': attempt, 'replay': transport.stats, **summary})
+            
+            if transport.stats['misses']:
+                print(f"  warning: {transport.stats['misses']} requests were not in the cassette")
+    
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'cassette': args.cassette,
+                'latency': args.latency,
+                'jitter': args.jitter,
+                'rate_429': args.rate_429,
+                'runs': results,
+            }, f, indent=2)
+        print(f"\nResults written to {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
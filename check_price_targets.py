@@ -14,6 +14,8 @@ import sys
 from datetime import datetime, timedelta
 from config import Config
 from polygon_client import PolygonClient
+from ratings_store import create_ratings_store
+from rate_limiter import configure_rate_limits
 
 
 def format_change(change_pct):
@@ -46,19 +48,22 @@ def main():
     
     # Load config
     config = Config()
+    configure_rate_limits(config)
     
     # Initialize Polygon client
-    with PolygonClient(config.polygon_api_key) as client:
+    ratings_store = create_ratings_store(config)
+    with PolygonClient(config.polygon_api_key, ratings_store=ratings_store,
+                       base_url=config.polygon_base_url) as client:
         # Fetch analyst ratings
         print(f"Fetching {ticker} analyst ratings...")
-        ratings = client.fetch_analyst_ratings(ticker, limit=100)
+        cutoff_date = datetime.now() - timedelta(days=days)
+        ratings = client.get_ratings(ticker, since=cutoff_date, limit=100)
         
         if not ratings:
             print(f"No analyst ratings found for {ticker}")
             sys.exit(0)
         
         # Filter for requested time period
-        cutoff_date = datetime.now() - timedelta(days=days)
         recent_changes = []
         
         for rating in ratings:
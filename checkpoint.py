@@ -0,0 +1,96 @@
+"""Per-stage checkpoints of the enriched stock list so failed runs can resume."""
+
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+
+logger = logging.getLogger(__name__)
+
+
+class RunCheckpoint:
+    """Stores the stock list after each stage of a run as JSON lines.
+    
+    Checkpoints live in one directory per run date (e.g. runs/2025-06-30),
+    with one file per stage holding one stock per line. Files are written to
+    a temporary name and renamed, so a stage file only exists once the stage
+    finished and its output was fully written.
+    """
+    
+    def __init__(self, base_dir: str = 'runs', run_date: Optional[str] = None):
+        """Set up the checkpoint directory for a run.
+        
+        Args:
+            base_dir: Directory holding one subdirectory per run date
+            run_date: Run date as YYYY-MM-DD (default: today)
+        """
+        self.run_date = run_date or datetime.now().strftime('%Y-%m-%d')
+        self.directory = os.path.join(base_dir, self.run_date)
+    
+    def _path(self, stage: str) -> str:
+        """Get the checkpoint file path for a stage."""
+        return os.path.join(self.directory, f"{stage}.jsonl")
+    
+    def save(self, stage: str, stocks: List[Dict[str, Any]]) -> None:
+        """Persist the stock list a stage produced.
+        
+        Args:
+            stage: Stage name
+            stocks: Stock records or dictionaries (values that aren't JSON types are stored as strings)
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(stage)
+        temp_path = f"{path}.tmp"
+        
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for stock in stocks:
+                    f.write(json.dumps(dict(stock), default=str, separators=(',', ':')))
+                    f.write('\n')
+            os.replace(temp_path, path)
+        except OSError as e:
+            # A missing checkpoint only costs a longer resume, so don't fail the run
+            logger.warning(f"Could not write checkpoint {path}: {e}")
+            return
+        
+        logger.info(f"Checkpointed {len(stocks)} stocks after stage '{stage}' to {path}")
+    
+    def load(self, stage: str) -> Optional[List[Dict[str, Any]]]:
+        """Load the stock list saved after a stage.
+        
+        Args:
+            stage: Stage name
+        
+        Returns:
+            List of stock dictionaries, or None if the stage has no checkpoint
+        """
+        path = self._path(stage)
+        if not os.path.exists(path):
+            return None
+        
+        with open(path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+    
+    def clear(self) -> None:
+        """Remove this run date's checkpoints so a fresh attempt doesn't mix with an earlier one."""
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.endswith('.jsonl') or name.endswith('.jsonl.tmp'):
+                os.remove(os.path.join(self.directory, name))
+    
+    def last_completed(self, stages: Sequence[str]) -> Optional[str]:
+        """Find the latest stage, in run order, that has a checkpoint.
+        
+        Args:
+            stages: Stage names in the order they run
+        
+        Returns:
+            Stage name, or None if no stage has been checkpointed
+        """
+        for stage in reversed(stages):
+            if os.path.exists(self._path(stage)):
+                return stage
+        return None
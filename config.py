@@ -2,7 +2,7 @@
 
 import os
 import sys
-from typing import Dict, Any
+from typing import Dict, Any, List
 from dotenv import load_dotenv
 
 
@@ -61,6 +61,180 @@ class Config:
         """Get Polygon API key."""
         return os.getenv('POLYGON_API_KEY', 'P_QrzKzuvur6ysG9X_EI983sP0j4rud2')
     
+    @property
+    def fmp_max_workers(self) -> int:
+        """Get the maximum number of concurrent FMP requests."""
+        return self._get_int('FMP_MAX_WORKERS', 8, minimum=1)
+    
+    @property
+    def polygon_max_workers(self) -> int:
+        """Get the maximum number of tickers fetched concurrently from Polygon."""
+        return self._get_int('POLYGON_MAX_WORKERS', 8, minimum=1)
+    
+    @property
+    def polygon_bulk_scan(self) -> bool:
+        """Check whether price target alerts scan ratings in bulk instead of per ticker."""
+        return os.getenv('POLYGON_BULK_SCAN', 'true').lower() not in ('0', 'false', 'no')
+    
+    @property
+    def polygon_scan_chunk_size(self) -> int:
+        """Get the tickers per bulk ratings query (0 scans the whole market at once)."""
+        return self._get_int('POLYGON_SCAN_CHUNK_SIZE', 0, minimum=0)
+    
+    @property
+    def full_scan_exchanges(self) -> List[str]:
+        """Get the exchanges whose full quote lists `main.py --full-scan` screens."""
+        value = os.getenv('FULL_SCAN_EXCHANGES', 'NASDAQ,NYSE,AMEX')
+        return [exchange.strip().upper() for exchange in value.split(',') if exchange.strip()]
+    
+    @property
+    def perplexity_max_concurrency(self) -> int:
+        """Get the maximum number of concurrent Perplexity requests."""
+        return self._get_int('PERPLEXITY_MAX_CONCURRENCY', 4, minimum=1)
+    
+    @property
+    def perplexity_dossier_enabled(self) -> bool:
+        """Check whether short Perplexity fields are fetched with one combined dossier request."""
+        return os.getenv('PERPLEXITY_DOSSIER_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+    
+    @property
+    def perplexity_stream(self) -> bool:
+        """Check whether long Perplexity responses (investment evaluations, deep research) are streamed."""
+        return os.getenv('PERPLEXITY_STREAM', 'true').lower() not in ('0', 'false', 'no')
+    
+    @property
+    def perplexity_stream_deadline(self) -> int:
+        """Get the maximum seconds to read a streamed investment evaluation."""
+        return self._get_int('PERPLEXITY_STREAM_DEADLINE', 300, minimum=1)
+    
+    @property
+    def technical_batch_size(self) -> int:
+        """Get the number of companies classified per technical-nature request."""
+        return self._get_int('TECHNICAL_BATCH_SIZE', 10, minimum=1)
+    
+    @property
+    def http_cache_enabled(self) -> bool:
+        """Check whether the on-disk HTTP response cache is enabled."""
+        return os.getenv('HTTP_CACHE_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+    
+    @property
+    def http_cache_path(self) -> str:
+        """Get the HTTP response cache database path."""
+        return os.getenv('HTTP_CACHE_PATH', os.path.join('.cache', 'http_cache.sqlite'))
+    
+    @property
+    def http_cache_max_mb(self) -> int:
+        """Get the maximum HTTP response cache size in megabytes."""
+        return self._get_int('HTTP_CACHE_MAX_MB', 256, minimum=1)
+    
+    @property
+    def http_cache_ttls(self) -> str:
+        """Get per-endpoint-class cache TTL overrides (e.g. "profile=3600,llm_description=86400")."""
+        return os.getenv('HTTP_CACHE_TTLS', '')
+    
+    @property
+    def symbol_store_enabled(self) -> bool:
+        """Check whether per-symbol decisions (e.g. is_technical) are persisted between runs."""
+        return os.getenv('SYMBOL_STORE_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+    
+    @property
+    def symbol_store_path(self) -> str:
+        """Get the symbol attribute store database path."""
+        return os.getenv('SYMBOL_STORE_PATH', os.path.join('data', 'symbol_attributes.sqlite'))
+    
+    @property
+    def symbol_store_max_age_days(self) -> int:
+        """Get the number of days after which a stored per-symbol decision is re-checked."""
+        return self._get_int('SYMBOL_STORE_MAX_AGE_DAYS', 180, minimum=1)
+    
+    @property
+    def ratings_store_enabled(self) -> bool:
+        """Check whether Polygon analyst ratings are kept in a local store and synced incrementally."""
+        return os.getenv('RATINGS_STORE_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+    
+    @property
+    def ratings_store_path(self) -> str:
+        """Get the analyst ratings store database path."""
+        return os.getenv('RATINGS_STORE_PATH', os.path.join('data', 'analyst_ratings.sqlite'))
+    
+    @property
+    def ratings_store_refresh_minutes(self) -> int:
+        """Get the minutes after a sync during which a ticker's stored ratings are used as is."""
+        return self._get_int('RATINGS_STORE_REFRESH_MINUTES', 60, minimum=0)
+    
+    @property
+    def checkpoint_enabled(self) -> bool:
+        """Check whether the stock list is checkpointed after each stage of a run."""
+        return os.getenv('CHECKPOINT_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+    
+    @property
+    def checkpoint_dir(self) -> str:
+        """Get the directory holding per-run-date checkpoint directories and run manifests."""
+        return os.getenv('CHECKPOINT_DIR', 'runs')
+    
+    @property
+    def backfill_dir(self) -> str:
+        """Get the directory holding one directory of `main.py --backfill` results per date."""
+        return os.getenv('BACKFILL_DIR', os.path.join('data', 'backfill'))
+    
+    @property
+    def backfill_workers(self) -> int:
+        """Get the number of worker processes that backfill dates in parallel."""
+        return self._get_int('BACKFILL_WORKERS', 4, minimum=1)
+    
+    @property
+    def prometheus_textfile(self) -> str:
+        """Get the path the run's metrics are written to in Prometheus text format (empty to disable)."""
+        return os.getenv('PROMETHEUS_TEXTFILE', '')
+    
+    @property
+    def fmp_rate_limit(self) -> str:
+        """Get the FMP request rate limit (e.g. "300/min")."""
+        return os.getenv('FMP_RATE_LIMIT', '300/min')
+    
+    @property
+    def perplexity_rate_limit(self) -> str:
+        """Get the Perplexity request rate limit (e.g. "50/min")."""
+        return os.getenv('PERPLEXITY_RATE_LIMIT', '50/min')
+    
+    @property
+    def polygon_rate_limit(self) -> str:
+        """Get the Polygon request rate limit (e.g. "10/s")."""
+        return os.getenv('POLYGON_RATE_LIMIT', '10/s')
+    
+    @property
+    def fmp_base_url(self) -> str:
+        """Get the FMP server root override, e.g. a local stub server (empty for the real API)."""
+        return os.getenv('FMP_BASE_URL', '')
+    
+    @property
+    def perplexity_base_url(self) -> str:
+        """Get the Perplexity API base URL override (empty for the real API)."""
+        return os.getenv('PERPLEXITY_BASE_URL', '')
+    
+    @property
+    def polygon_base_url(self) -> str:
+        """Get the Polygon API base URL override (empty for the real API)."""
+        return os.getenv('POLYGON_BASE_URL', '')
+    
+    def _get_int(self, name: str, default: int, minimum: int = 0) -> int:
+        """Read an integer environment variable, falling back to a default.
+        
+        Args:
+            name: Environment variable name
+            default: Value used when the variable is unset or invalid
+            minimum: Smallest accepted value
+            
+        Returns:
+            Parsed integer value
+        """
+        value_str = os.getenv(name, str(default))
+        try:
+            return max(minimum, int(value_str))
+        except ValueError:
+            print(f"Warning: Invalid {name} value: '{value_str}'. Using {default}.")
+            return default
+    
     def _validate_config(self) -> None:
         """Validate that all required configuration values are present."""
         required_vars = {
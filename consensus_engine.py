@@ -0,0 +1,149 @@
+"""Point-in-time analyst price target consensus from a target history."""
+
+import logging
+import math
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timedelta, date
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def parse_published_date(date_str: str) -> Optional[datetime]:
+    """Parse an FMP price target publishedDate (e.g. "2024-01-05T14:30:00.000Z").
+    
+    Args:
+        date_str: ISO timestamp string
+    
+    Returns:
+        Naive datetime, or None if the string isn't an ISO timestamp
+    """
+    if not date_str or 'T' not in date_str:
+        return None
+    try:
+        parsed = datetime.fromisoformat(date_str.replace('Z', '+00:00').replace('.000+00:00', ''))
+    except ValueError:
+        return None
+    return parsed.replace(tzinfo=None)
+
+
+def _to_seconds(moment: datetime) -> float:
+    """Convert a naive datetime to seconds since the epoch without local time zone effects."""
+    return (moment - _EPOCH).total_seconds()
+
+
+class ConsensusHistory:
+    """Analyst price target history prepared for fast point-in-time queries.
+    
+    The history is parsed and sorted once into compact parallel arrays of
+    publication time, analyst index and target. The consensus at a cutoff is
+    the mean of each analyst's most recent target published on or before it;
+    any number of cutoffs is answered in one ordered sweep that advances a
+    per-analyst latest-target map with bisect.
+    """
+    
+    def __init__(self, entries: Iterable[Tuple[datetime, str, float]]):
+        """Build the history from (published, analyst, target) tuples.
+        
+        Entries with the same publication time and analyst keep the first one
+        given, matching a scan that only replaces strictly newer targets.
+        
+        Args:
+            entries: Iterable of (published datetime, analyst name, price target)
+        """
+        indexed = [
+            (_to_seconds(published), -position, analyst, float(target))
+            for position, (published, analyst, target) in enumerate(entries)
+        ]
+        # Within equal timestamps the earliest entry is applied last, so it wins
+        indexed.sort(key=lambda entry: (entry[0], entry[1]))
+        
+        self.analyst_names: List[str] = []
+        analyst_ids: Dict[str, int] = {}
+        self.times = array('d')
+        self.analysts = array('l')
+        self.targets = array('d')
+        
+        for seconds, _, analyst, target in indexed:
+            if analyst not in analyst_ids:
+                analyst_ids[analyst] = len(self.analyst_names)
+                self.analyst_names.append(analyst)
+            self.times.append(seconds)
+            self.analysts.append(analyst_ids[analyst])
+            self.targets.append(target)
+    
+    @classmethod
+    def from_fmp(cls, items: List[Dict[str, Any]]) -> 'ConsensusHistory':
+        """Build the history from an FMP /api/v4/price-target response.
+        
+        Args:
+            items: Price target records with publishedDate, analystCompany and priceTarget
+        
+        Returns:
+            ConsensusHistory (items without a parseable date or numeric target are skipped)
+        """
+        entries = []
+        for item in items or []:
+            published = parse_published_date(item.get('publishedDate', ''))
+            target = item.get('priceTarget', 0)
+            if published is None or not isinstance(target, (int, float)):
+                continue
+            entries.append((published, item.get('analystCompany', 'Unknown'), target))
+        return cls(entries)
+    
+    def __len__(self) -> int:
+        """Number of price targets in the history."""
+        return len(self.times)
+    
+    def consensus_at(self, cutoff: datetime) -> Optional[float]:
+        """Get the consensus as of a single cutoff.
+        
+        Args:
+            cutoff: Point in time (naive datetime)
+        
+        Returns:
+            Mean of each analyst's latest target on or before the cutoff, or None
+        """
+        return self.consensus_at_many([cutoff])[0]
+    
+    def consensus_at_many(self, cutoffs: List[datetime]) -> List[Optional[float]]:
+        """Get the consensus at several cutoffs in one pass over the history.
+        
+        Args:
+            cutoffs: Points in time, in any order
+        
+        Returns:
+            Consensus values (or None) in the order of cutoffs
+        """
+        results: List[Optional[float]] = [None] * len(cutoffs)
+        latest: Dict[int, float] = {}
+        position = 0
+        
+        for index in sorted(range(len(cutoffs)), key=lambda i: cutoffs[i]):
+            end = bisect_right(self.times, _to_seconds(cutoffs[index]))
+            for j in range(position, end):
+                latest[self.analysts[j]] = self.targets[j]
+            position = max(position, end)
+            
+            if latest:
+                results[index] = math.fsum(latest.values()) / len(latest)
+        
+        return results
+    
+    def daily_series(self, start: date, end: date) -> List[Tuple[date, Optional[float]]]:
+        """Get the end-of-day consensus for every calendar day in a range.
+        
+        Args:
+            start: First day (inclusive)
+            end: Last day (inclusive)
+        
+        Returns:
+            List of (day, consensus or None) tuples
+        """
+        days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        cutoffs = [datetime(day.year, day.month, day.day, 23, 59, 59, 999999) for day in days]
+        return list(zip(days, self.consensus_at_many(cutoffs)))
@@ -10,7 +10,9 @@ from typing import Dict, Any, Optional
 from config import Config
 from api_client import FMPAPIClient
 from email_sender import EmailSender
+from http_cache import create_response_cache
 from perplexity_client import PerplexityClient
+from rate_limiter import configure_rate_limits
 
 
 logger = logging.getLogger(__name__)
@@ -224,12 +226,14 @@ def create_research_email_html(company_name: str, symbol: str, research_content:
     return html
 
 
-def generate_deep_research(symbol: str, company_name: Optional[str] = None) -> int:
+def generate_deep_research(symbol: str, company_name: Optional[str] = None,
+                           stream: bool = False) -> int:
     """Generate and send a deep research report for a stock.
     
     Args:
         symbol: Stock symbol
         company_name: Optional company name (will fetch if not provided)
+        stream: Stream the report and print it as it is generated
         
     Returns:
         Exit code (0 for success, 1 for failure)
@@ -245,12 +249,15 @@ def generate_deep_research(symbol: str, company_name: Optional[str] = None) -> i
     try:
         # Load configuration
         config = Config()
+        configure_rate_limits(config)
+        response_cache = create_response_cache(config)
         
         # Get company data if name not provided
         stock_data = None
         if not company_name:
             logger.info("Fetching company profile...")
-            with FMPAPIClient(config.fmp_api_key) as api:
+            with FMPAPIClient(config.fmp_api_key, cache=response_cache,
+                              base_url=config.fmp_base_url) as api:
                 profile = api.get_company_profile(symbol)
                 if profile and 'companyName' in profile:
                     company_name = profile['companyName']
@@ -262,11 +269,15 @@ def generate_deep_research(symbol: str, company_name: Optional[str] = None) -> i
         
         # Generate deep research using Perplexity
         logger.info("Generating deep research report...")
-        with PerplexityClient(config.perplexity_api_key) as client:
+        with PerplexityClient(config.perplexity_api_key, cache=response_cache,
+                              base_url=config.perplexity_base_url) as client:
             prompt = format_deep_research_prompt(company_name, symbol)
             
-            # Call the deep research API
-            research_content = client.get_deep_research(prompt)
+            # Call the deep research API, echoing streamed text as it arrives
+            on_chunk = (lambda text: print(text, end="", flush=True)) if stream else None
+            research_content = client.get_deep_research(prompt, stream=stream, on_chunk=on_chunk)
+            if stream:
+                print()
             
             if not research_content:
                 logger.error("Failed to generate research report")
@@ -333,10 +344,12 @@ def main():
     parser = argparse.ArgumentParser(description='Generate deep research report for a stock')
     parser.add_argument('symbol', help='Stock symbol (e.g., AAPL, MSFT)')
     parser.add_argument('--name', help='Company name (optional, will fetch if not provided)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Stream the report and print it while it is generated')
     
     args = parser.parse_args()
     
-    exit_code = generate_deep_research(args.symbol, args.name)
+    exit_code = generate_deep_research(args.symbol, args.name, stream=args.stream)
     sys.exit(exit_code)
 
 
@@ -0,0 +1,375 @@
+"""Persistent on-disk cache for HTTP responses from the data providers."""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple, Union, Callable
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+
+logger = logging.getLogger(__name__)
+
+DAY = 24 * 60 * 60
+
+# Default time-to-live in seconds per endpoint class. A string value names a
+# content-based policy in TTL_POLICIES instead.
+DEFAULT_TTLS: Dict[str, Union[float, str]] = {
+    'gainers': 5 * 60,
+    'eod': 'past_prices',
+    'profile': DAY,
+    'statement': 'until_next_filing',
+    'price_target': 6 * 60 * 60,
+    'llm_classification': 30 * DAY,
+    'llm_description': 30 * DAY,
+    'llm_analysis': DAY,
+    'llm_research': 7 * DAY,
+}
+
+# Query parameters that must never become part of a cache key
+SECRET_PARAMS = {'apikey', 'api_key', 'apiKey', 'token'}
+
+
+def until_next_filing(payload: Any) -> float:
+    """Compute how long a financial statement response stays fresh.
+    
+    Statements only change when the company files again, so the entry expires
+    when the next filing is due: one year after an annual (FY) filing or one
+    quarter after a quarterly one. Overdue filings are re-checked daily.
+    
+    Args:
+        payload: Decoded JSON body of a statement endpoint response
+    
+    Returns:
+        TTL in seconds (at least one hour)
+    """
+    try:
+        latest = payload[0]
+        date_str = latest.get('fillingDate') or latest.get('acceptedDate') or latest.get('date')
+        filed = datetime.strptime(str(date_str)[:10], "%Y-%m-%d")
+        interval_days = 365 if latest.get('period', 'FY') == 'FY' else 91
+        remaining = interval_days * DAY - (datetime.now() - filed).total_seconds()
+    except Exception:
+        return DAY
+    
+    if remaining <= 0:
+        return DAY
+    return max(remaining, 60 * 60)
+
+
+def past_prices(payload: Any) -> float:
+    """Compute how long a bulk end-of-day prices response stays fresh.
+    
+    A past date's prices don't change, so a response with rows is kept for 30
+    days. An empty one (a holiday, or prices not published yet) isn't cached.
+    
+    Args:
+        payload: Decoded JSON rows, or the raw CSV body
+    
+    Returns:
+        TTL in seconds, or 0 to skip caching
+    """
+    if isinstance(payload, (bytes, str)):
+        # A header line followed by at least one row
+        has_rows = len(payload.strip().splitlines()) > 1
+    else:
+        has_rows = isinstance(payload, list) and len(payload) > 0
+    return 30 * DAY if has_rows else 0
+
+
+TTL_POLICIES: Dict[str, Callable[[Any], float]] = {
+    'until_next_filing': until_next_filing,
+    'past_prices': past_prices,
+}
+
+
+def describe_request(method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                     body: Any = None) -> str:
+    """Describe a request as a canonical string without API keys or parameter order.
+    
+    Args:
+        method: HTTP method
+        url: Request URL (may include a query string)
+        params: Extra query parameters
+        body: JSON payload for POST requests
+    
+    Returns:
+        "METHOD url?sorted-query [json-body]"
+    """
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query.extend((k, str(v)) for k, v in params.items())
+    query = sorted((k, v) for k, v in query if k not in SECRET_PARAMS)
+    
+    normalized = f"{method.upper()} {parts.scheme}://{parts.netloc}{parts.path}?{urlencode(query)}"
+    if body is not None:
+        normalized += " " + json.dumps(body, sort_keys=True, separators=(',', ':'))
+    return normalized
+
+
+def normalize_request_key(method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                          body: Any = None) -> str:
+    """Build a stable cache key from a request, ignoring API keys and parameter order.
+    
+    Args:
+        method: HTTP method
+        url: Request URL (may include a query string)
+        params: Extra query parameters
+        body: JSON payload for POST requests
+    
+    Returns:
+        Hex digest identifying the request
+    """
+    return hashlib.sha256(describe_request(method, url, params, body).encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed response cache with per-entry expiry and size-based eviction."""
+    
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024,
+                 ttls: Optional[Dict[str, Union[float, str]]] = None):
+        """Open (or create) the cache database.
+        
+        Args:
+            path: SQLite database file path
+            max_bytes: Maximum total size of cached bodies before eviction
+            ttls: Overrides for the per-endpoint-class TTLs in DEFAULT_TTLS
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        
+        self.hits = 0
+        self.misses = 0
+        self.class_stats: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                endpoint_class TEXT,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                size INTEGER,
+                created_at REAL,
+                expires_at REAL,
+                accessed_at REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+    
+    def ttl_for(self, endpoint_class: Optional[str], payload: Any = None) -> Optional[float]:
+        """Resolve the TTL for an endpoint class.
+        
+        Args:
+            endpoint_class: Endpoint class name, or None for uncached requests
+            payload: Decoded response body, used by content-based policies
+        
+        Returns:
+            TTL in seconds, or None if responses of this class are not cached
+        """
+        if not endpoint_class:
+            return None
+        
+        ttl = self.ttls.get(endpoint_class)
+        if isinstance(ttl, str):
+            policy = TTL_POLICIES.get(ttl)
+            return policy(payload) if policy else None
+        if ttl is None or ttl <= 0:
+            return None
+        return float(ttl)
+    
+    def is_cacheable(self, endpoint_class: Optional[str]) -> bool:
+        """Check whether responses of an endpoint class are cached at all."""
+        ttl = self.ttls.get(endpoint_class) if endpoint_class else None
+        return isinstance(ttl, str) or bool(ttl and ttl > 0)
+    
+    def _record(self, endpoint_class: Optional[str], hit: bool) -> None:
+        """Update the hit/miss counters (caller holds the lock)."""
+        stats = self.class_stats.setdefault(endpoint_class or 'other', {'hits': 0, 'misses': 0})
+        if hit:
+            self.hits += 1
+            stats['hits'] += 1
+        else:
+            self.misses += 1
+            stats['misses'] += 1
+    
+    def get(self, key: str, endpoint_class: Optional[str] = None) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """Look up a cached response.
+        
+        Args:
+            key: Cache key from normalize_request_key
+            endpoint_class: Endpoint class, for per-class statistics
+        
+        Returns:
+            Tuple of (status code, headers, body) or None on a miss (including
+            when the database is locked or unreadable)
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT status, headers, body, expires_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                
+                if row is None or row[3] <= now:
+                    if row is not None:
+                        self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                        self._conn.commit()
+                    self._record(endpoint_class, hit=False)
+                    return None
+                
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                # Other processes (e.g. backfill workers) share the file; a busy
+                # database costs a network request, not the run
+                logger.warning(f"HTTP cache read failed, treating as a miss: {e}")
+                self._rollback()
+                self._record(endpoint_class, hit=False)
+                return None
+            self._record(endpoint_class, hit=True)
+        
+        status, headers, body, _ = row
+        return status, json.loads(headers), bytes(body)
+    
+    def set(self, key: str, status: int, headers: Dict[str, str], body: bytes,
+            ttl: float, endpoint_class: Optional[str] = None) -> None:
+        """Store a response and evict old entries if the cache is over its size limit.
+        
+        Args:
+            key: Cache key from normalize_request_key
+            status: HTTP status code
+            headers: Response headers
+            body: Raw response body
+            ttl: Time to live in seconds
+            endpoint_class: Endpoint class name
+        """
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, endpoint_class, status, json.dumps(headers), sqlite3.Binary(body),
+                     len(body), now, now + ttl, now)
+                )
+                self._evict(now)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"HTTP cache write failed, response not stored: {e}")
+                self._rollback()
+    
+    def _rollback(self) -> None:
+        """Abandon a failed transaction (caller holds the lock)."""
+        try:
+            self._conn.rollback()
+        except sqlite3.Error:
+            pass
+    
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        
+        evicted = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+        
+        logger.debug(f"Evicted {evicted} cached responses to stay under {self.max_bytes} bytes")
+    
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and the current cache size.
+        
+        Returns:
+            Dictionary with overall and per-endpoint-class statistics
+        """
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': entries,
+                'size_bytes': size,
+                'by_class': {name: dict(counts) for name, counts in self.class_stats.items()}
+            }
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def parse_ttl_overrides(value: str) -> Dict[str, float]:
+    """Parse TTL overrides of the form "profile=3600,llm_description=86400".
+    
+    Args:
+        value: Comma-separated class=seconds pairs
+    
+    Returns:
+        Dictionary mapping endpoint classes to TTLs in seconds
+    """
+    overrides = {}
+    for item in value.split(','):
+        if '=' not in item:
+            continue
+        name, seconds = item.split('=', 1)
+        try:
+            overrides[name.strip()] = float(seconds)
+        except ValueError:
+            logger.warning(f"Ignoring invalid cache TTL override: {item}")
+    return overrides
+
+
+def create_response_cache(config) -> Optional[ResponseCache]:
+    """Create the shared response cache from application configuration.
+    
+    Args:
+        config: Application Config instance
+    
+    Returns:
+        ResponseCache, or None if caching is disabled or the database can't be opened
+    """
+    if not config.http_cache_enabled:
+        return None
+    
+    try:
+        return ResponseCache(
+            config.http_cache_path,
+            max_bytes=config.http_cache_max_mb * 1024 * 1024,
+            ttls=parse_ttl_overrides(config.http_cache_ttls)
+        )
+    except sqlite3.Error as e:
+        logger.warning(f"Could not open HTTP cache at {config.http_cache_path}: {e}")
+        return None
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Check that the CLI entry points start within their import-time budgets.
+
+Each entry point is imported in a fresh interpreter with `python -X importtime`,
+and the check fails when its cumulative import time exceeds the budget or when
+a module that should only load on first use (a provider SDK or client) was
+imported anyway.
+
+Usage:
+    python import_budget.py                 # check every entry point
+    python import_budget.py --report 15     # also list the 15 slowest imports
+    python import_budget.py --scale 2       # double the budgets on a slow machine
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+
+# Entry point -> (budget in milliseconds, modules that must not be imported at startup)
+BUDGETS: Dict[str, Tuple[float, List[str]]] = {
+    'check_price_targets': (100, ['polygon', 'perplexity_client', 'requests']),
+    'main': (250, ['polygon', 'polygon_client', 'perplexity_client', 'numpy']),
+    'price_target_alerts': (250, ['polygon', 'perplexity_client']),
+    'deep_research': (250, ['polygon', 'polygon_client']),
+}
+
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)\s*$')
+
+
+def measure_imports(module: str) -> List[Tuple[str, int, int]]:
+    """Import a module in a fresh interpreter and collect its import times.
+    
+    Args:
+        module: Module to import
+    
+    Returns:
+        List of (module name, self microseconds, cumulative microseconds) in import order
+    
+    Raises:
+        RuntimeError: If the import fails
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip().splitlines()[-1]}")
+    
+    timings = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            timings.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return timings
+
+
+def check_entry_point(module: str, budget_ms: float, forbidden: List[str],
+                      runs: int = 3) -> Tuple[bool, float, List[str], List[Tuple[str, int, int]]]:
+    """Measure an entry point's import time and look for modules it shouldn't load.
+    
+    Args:
+        module: Entry point module
+        budget_ms: Maximum cumulative import time in milliseconds
+        forbidden: Top-level module names that must not be imported
+        runs: Number of measurements; the fastest one counts
+    
+    Returns:
+        Tuple of (passed, import milliseconds, forbidden modules that were
+        imported, timings of the fastest run)
+    """
+    best_ms, best_timings = None, []
+    for _ in range(max(1, runs)):
+        timings = measure_imports(module)
+        total_ms = next((cumulative for name, _, cumulative in timings if name == module), 0) / 1000
+        if best_ms is None or total_ms < best_ms:
+            best_ms, best_timings = total_ms, timings
+    
+    imported = {name for name, _, _ in best_timings}
+    loaded = [name for name in forbidden
+              if name in imported or any(other.startswith(name + '.') for other in imported)]
+    return best_ms <= budget_ms and not loaded, best_ms, loaded, best_timings
+
+
+def main() -> None:
+    """Check every entry point and exit non-zero if any is over budget."""
+    parser = argparse.ArgumentParser(description='Check import-time budgets of the CLI entry points')
+    parser.add_argument('modules', nargs='*', help='Entry points to check (default: all)')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply every budget by this factor')
+    parser.add_argument('--runs', type=int, default=3, help='Measurements per entry point (the fastest counts)')
+    parser.add_argument('--report', type=int, default=0, metavar='N',
+                        help='List the N slowest imports (by own time) of each entry point')
+    args = parser.parse_args()
+    
+    unknown = [module for module in args.modules if module not in BUDGETS]
+    if unknown:
+        print(f"No budget for: {', '.join(unknown)}")
+        sys.exit(2)
+    
+    failed = False
+    for module in args.modules or BUDGETS:
+        budget_ms, forbidden = BUDGETS[module]
+        budget_ms *= args.scale
+        passed, total_ms, loaded, timings = check_entry_point(module, budget_ms, forbidden, args.runs)
+        failed |= not passed
+        
+        status = '✓' if passed else '✗'
+        print(f"{status} {module}: {total_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+        if loaded:
+            print(f"    imports at startup: {', '.join(loaded)}")
+        if args.report:
+            for name, own, cumulative in sorted(timings, key=lambda t: t[1], reverse=True)[:args.report]:
+                print(f"    {own / 1000:7.1f} ms  {name} (cumulative {cumulative / 1000:.1f} ms)")
+    
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
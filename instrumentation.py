@@ -0,0 +1,299 @@
+"""Run-wide timing and API call metrics with a JSON manifest and Prometheus export."""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Get a nearest-rank percentile.
+    
+    Args:
+        values: Sorted values
+        pct: Percentile between 0 and 100
+    
+    Returns:
+        Percentile value, or None for an empty list
+    """
+    if not values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
+
+
+class RunMetrics:
+    """Thread-safe collector of stage timings and per-provider request metrics.
+    
+    Providers record one entry per network request (status, latency, bytes)
+    and per cache hit; stages record their wall time and item counts. At the
+    end of a run the collected data is written as a JSON manifest and,
+    optionally, a Prometheus textfile for node_exporter.
+    """
+    
+    def __init__(self):
+        """Start collecting for a new run."""
+        self._lock = threading.Lock()
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.providers: Dict[str, Dict[str, Any]] = {}
+        self._latencies: Dict[str, List[float]] = {}
+    
+    def _provider(self, provider: str) -> Dict[str, Any]:
+        """Get a provider's counters, creating them (call with the lock held)."""
+        stats = self.providers.get(provider)
+        if stats is None:
+            stats = {
+                'requests': 0,
+                'cache_hits': 0,
+                'errors': 0,
+                'retries': 0,
+                'rate_limited': 0,
+                'bytes': 0,
+                'rate_limit_wait_seconds': 0.0,
+                'status_codes': {},
+            }
+            self.providers[provider] = stats
+            self._latencies[provider] = []
+        return stats
+    
+    def record_request(self, provider: str, status: Optional[int], latency: float,
+                       nbytes: int = 0, rate_limit_wait: float = 0.0) -> None:
+        """Record a request that went to the network.
+        
+        Args:
+            provider: Provider name (e.g. 'fmp')
+            status: HTTP status code, or None if the request failed without a response
+            latency: Seconds until the response (headers, for streamed responses) arrived
+            nbytes: Response body size in bytes
+            rate_limit_wait: Seconds spent waiting for the provider's rate limiter
+        """
+        with self._lock:
+            stats = self._provider(provider)
+            stats['requests'] += 1
+            stats['bytes'] += nbytes
+            stats['rate_limit_wait_seconds'] += rate_limit_wait
+            key = str(status) if status is not None else 'error'
+            stats['status_codes'][key] = stats['status_codes'].get(key, 0) + 1
+            if status is None or status >= 400:
+                stats['errors'] += 1
+            if status == 429:
+                stats['rate_limited'] += 1
+            self._latencies[provider].append(latency)
+    
+    def record_cache_hit(self, provider: str) -> None:
+        """Record a request answered from the response cache."""
+        with self._lock:
+            self._provider(provider)['cache_hits'] += 1
+    
+    def record_retry(self, provider: str, count: int = 1) -> None:
+        """Record requests that were retried (by the client or the HTTP library)."""
+        if count <= 0:
+            return
+        with self._lock:
+            self._provider(provider)['retries'] += count
+    
+    def record_stage(self, name: str, seconds: float, items_in: Optional[int] = None,
+                     items_out: Optional[int] = None) -> None:
+        """Record a completed stage, adding to earlier records of the same stage.
+        
+        Args:
+            name: Stage name
+            seconds: Wall time (or busy time, for pipeline stages)
+            items_in: Number of stocks the stage received
+            items_out: Number of stocks the stage passed on
+        """
+        with self._lock:
+            stats = self.stages.setdefault(name, {'seconds': 0.0, 'runs': 0})
+            stats['seconds'] += seconds
+            stats['runs'] += 1
+            if items_in is not None:
+                stats['items_in'] = stats.get('items_in', 0) + items_in
+            if items_out is not None:
+                stats['items_out'] = stats.get('items_out', 0) + items_out
+    
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block of code as a stage.
+        
+        Args:
+            name: Stage name
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(name, time.perf_counter() - started)
+    
+    def summary(self) -> Dict[str, Any]:
+        """Get all collected metrics as a JSON-serializable dictionary."""
+        with self._lock:
+            providers = {}
+            for provider, stats in self.providers.items():
+                latencies = sorted(self._latencies[provider])
+                providers[provider] = {
+                    **stats,
+                    'status_codes': dict(stats['status_codes']),
+                    'rate_limit_wait_seconds': round(stats['rate_limit_wait_seconds'], 3),
+                    'latency_seconds': {
+                        name: round(value, 4) if value is not None else None
+                        for name, value in (
+                            ('p50', percentile(latencies, 50)),
+                            ('p90', percentile(latencies, 90)),
+                            ('p99', percentile(latencies, 99)),
+                            ('max', latencies[-1] if latencies else None),
+                        )
+                    },
+                }
+            stages = {
+                name: {**stats, 'seconds': round(stats['seconds'], 3)}
+                for name, stats in self.stages.items()
+            }
+        
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'wall_seconds': round(time.perf_counter() - self._started, 3),
+            'stages': stages,
+            'providers': providers,
+        }
+    
+    def write_manifest(self, path: str, **extra) -> None:
+        """Write the run manifest JSON.
+        
+        Args:
+            path: Output file path
+            **extra: Additional top-level fields (e.g. status='succeeded')
+        """
+        manifest = {**self.summary(), **extra}
+        directory = os.path.dirname(path)
+        try:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+        except OSError as e:
+            logger.warning(f"Could not write run manifest {path}: {e}")
+            return
+        logger.info(f"Run manifest written to {path}")
+    
+    def write_prometheus(self, path: str, job: str = 'stock_alerts') -> None:
+        """Write the metrics in the Prometheus text exposition format.
+        
+        The file is written under a temporary name and renamed, as the
+        node_exporter textfile collector expects.
+        
+        Args:
+            path: Output file path (conventionally ending in .prom)
+            job: Value of the job label on every metric
+        """
+        summary = self.summary()
+        lines = [
+            '# HELP stock_alerts_run_seconds Wall time of the run.',
+            '# TYPE stock_alerts_run_seconds gauge',
+            f'stock_alerts_run_seconds{{job="{job}"}} {summary["wall_seconds"]}',
+            '# HELP stock_alerts_stage_seconds Time spent in each stage.',
+            '# TYPE stock_alerts_stage_seconds gauge',
+        ]
+        for name, stats in summary['stages'].items():
+            lines.append(f'stock_alerts_stage_seconds{{job="{job}",stage="{name}"}} {stats["seconds"]}')
+        
+        lines += [
+            '# HELP stock_alerts_requests_total Network requests by provider and status.',
+            '# TYPE stock_alerts_requests_total counter',
+        ]
+        for provider, stats in summary['providers'].items():
+            for status, count in stats['status_codes'].items():
+                lines.append(f'stock_alerts_requests_total{{job="{job}",provider="{provider}",status="{status}"}} {count}')
+        
+        for metric, key, help_text in (
+            ('cache_hits_total', 'cache_hits', 'Requests answered from the response cache.'),
+            ('retries_total', 'retries', 'Retried requests.'),
+            ('response_bytes_total', 'bytes', 'Response body bytes received.'),
+            ('rate_limit_wait_seconds', 'rate_limit_wait_seconds', 'Time spent waiting for rate limiters.'),
+        ):
+            lines += [f'# HELP stock_alerts_{metric} {help_text}',
+                      f'# TYPE stock_alerts_{metric} {"counter" if metric.endswith("_total") else "gauge"}']
+            for provider, stats in summary['providers'].items():
+                lines.append(f'stock_alerts_{metric}{{job="{job}",provider="{provider}"}} {stats[key]}')
+        
+        lines += [
+            '# HELP stock_alerts_request_latency_seconds Request latency quantiles.',
+            '# TYPE stock_alerts_request_latency_seconds gauge',
+        ]
+        for provider, stats in summary['providers'].items():
+            for name, quantile in (('p50', '0.5'), ('p90', '0.9'), ('p99', '0.99')):
+                value = stats['latency_seconds'][name]
+                if value is not None:
+                    lines.append(f'stock_alerts_request_latency_seconds{{job="{job}",provider="{provider}",quantile="{quantile}"}} {value}')
+        
+        directory = os.path.dirname(path)
+        temp_path = f"{path}.tmp"
+        try:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write Prometheus textfile {path}: {e}")
+            return
+        logger.info(f"Prometheus metrics written to {path}")
+
+
+def instrument_pool_manager(pool_manager, provider: str) -> None:
+    """Record every request made through a urllib3 PoolManager.
+    
+    Used for SDKs that talk to urllib3 directly instead of through requests
+    (e.g. the Polygon client); retries done by urllib3 are counted from the
+    response's retry history.
+    
+    Args:
+        pool_manager: urllib3 PoolManager whose request method is wrapped
+        provider: Provider name the requests are recorded under
+    """
+    send = pool_manager.request
+    
+    def request(method, url, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = send(method, url, *args, **kwargs)
+        except Exception:
+            get_metrics().record_request(provider, None, time.perf_counter() - started)
+            raise
+        get_metrics().record_request(
+            provider, response.status, time.perf_counter() - started, len(response.data or b'')
+        )
+        retries = getattr(response, 'retries', None)
+        if retries is not None:
+            get_metrics().record_retry(provider, len(retries.history))
+        return response
+    
+    pool_manager.request = request
+
+
+_metrics = RunMetrics()
+
+
+def get_metrics() -> RunMetrics:
+    """Get the process-wide metrics collector shared by all clients."""
+    return _metrics
+
+
+def reset_metrics() -> RunMetrics:
+    """Start a fresh metrics collector (e.g. at the start of a run).
+    
+    Returns:
+        The new collector
+    """
+    global _metrics
+    _metrics = RunMetrics()
+    return _metrics
@@ -8,13 +8,23 @@ and sends email alerts for stocks that gained 10% or more.
 
 import argparse
 import logging
+import os
 import sys
-from datetime import datetime
-from typing import List, Dict, Any
+import time
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional, Tuple
 
 from config import Config
 from api_client import FMPAPIClient
 from email_sender import EmailSender
+from http_cache import create_response_cache
+from rate_limiter import configure_rate_limits
+from symbol_store import create_symbol_store
+from ratings_store import create_ratings_store
+from pipeline import Pipeline, Stage
+from checkpoint import RunCheckpoint
+from instrumentation import get_metrics, reset_metrics
+from stock_record import StockRecord, gain_percentage
 
 
 # Configure logging
@@ -46,18 +56,432 @@ def sort_by_gain_percentage(stocks: List[Dict[str, Any]]) -> List[Dict[str, Any]
     Returns:
         Sorted list of stocks
     """
-    def get_change_percent(stock: Dict[str, Any]) -> float:
-        try:
-            change_value = stock.get('changesPercentage', 0)
-            # Handle both string and float formats
-            if isinstance(change_value, str):
-                return float(change_value.replace('%', ''))
-            else:
-                return float(change_value)
-        except (ValueError, TypeError):
-            return 0.0
+    # Gains are floats once a stock is a StockRecord; plain dictionaries are parsed
+    return sorted(stocks, key=lambda stock: gain_percentage(stock) or 0.0, reverse=True)
+
+
+def print_progress(company, success, data_type=None):
+    """Print a progress line for one company and data type."""
+    if success:
+        if data_type == "growth":
+            print(f"  → {company} growth rate ✓")
+        elif data_type == "ps_ratio":
+            print(f"  → {company} P/S ratio ✓")
+        elif data_type == "technical_check":
+            print(f"  → {company} technical check ✓")
+        elif data_type == "earnings_guidance":
+            print(f"  → {company} earnings guidance ✓")
+        elif data_type == "analyst_price_targets":
+            print(f"  → {company} analyst price targets ✓")
+        elif data_type == "revenue_projection_2030":
+            print(f"  → {company} revenue projection 2030 ✓")
+        elif data_type == "dossier":
+            print(f"  → {company} company dossier ✓")
+        elif data_type == "investment_evaluation":
+            print(f"  → {company} investment evaluation ✓")
+        elif data_type == "financial_metrics":
+            print(f"  → {company} financial metrics ✓")
+        elif data_type == "polygon_data":
+            print(f"  → {company} Polygon analyst data ✓")
+        else:
+            print(f"  → {company} description ✓")
+    else:
+        # data_type contains error message when success is False
+        print(f"  → {company} ✗ ({data_type})")
+
+
+# Stages of run_filter_chain in run order; each checkpoints the surviving stocks
+CHECKPOINT_STAGES = ['gainers', 'profiles', 'technical', 'growth', 'projection', 'remaining', 'polygon', 'complete']
+
+
+def run_filter_chain(api_client: FMPAPIClient, config: Config,
+                     checkpoint: Optional[RunCheckpoint] = None,
+                     resume: bool = False, full_scan: bool = False) -> List[Dict[str, Any]]:
+    """Fetch the day's gainers and run every filter and enrichment step in turn.
+    
+    Args:
+        api_client: FMP API client
+        config: Application configuration
+        checkpoint: Optional checkpoint store the stocks are saved to after each stage
+        resume: Continue from the last checkpointed stage instead of starting over
+        full_scan: Screen whole exchanges instead of the top 50 gainers list
+    
+    Returns:
+        Stocks that passed all filters, sorted by gain
+    """
+    logger = logging.getLogger(__name__)
+    
+    sorted_gainers = []
+    resumed_from = -1
+    if checkpoint and resume:
+        stage = checkpoint.last_completed(CHECKPOINT_STAGES)
+        if stage:
+            sorted_gainers = StockRecord.from_rows(checkpoint.load(stage))
+            resumed_from = CHECKPOINT_STAGES.index(stage)
+            print(f"✓ Resuming after stage '{stage}' ({len(sorted_gainers)} stocks)")
+            logger.info(f"Resuming from checkpoint after stage '{stage}' in {checkpoint.directory}")
+    elif checkpoint:
+        checkpoint.clear()
+    
+    def pending(stage: str) -> bool:
+        return CHECKPOINT_STAGES.index(stage) > resumed_from
+    
+    stage_started = time.perf_counter()
+    
+    def completed(stage: str) -> None:
+        nonlocal stage_started
+        if stage != 'complete':
+            get_metrics().record_stage(stage, time.perf_counter() - stage_started, items_out=len(sorted_gainers))
+        stage_started = time.perf_counter()
+        if checkpoint:
+            checkpoint.save(stage, sorted_gainers)
+    
+    if pending('gainers') and full_scan:
+        # Screen every stock on the configured exchanges for gain and market cap
+        print("✓ Scanning the full market...", end="", flush=True)
+        logger.info(f"Scanning {', '.join(config.full_scan_exchanges)} for 10%+ gainers...")
+        sorted_gainers = api_client.scan_market_gainers(
+            min_gain=10.0, min_market_cap=300_000_000, exchanges=config.full_scan_exchanges
+        )
+        print(f" ({len(sorted_gainers)} gainers of 10%+ and $300M+)")
+        logger.info(f"Full-market 10%+ gainers: {len(sorted_gainers)}")
+        completed('gainers')
+    elif pending('gainers'):
+        # Fetch daily gainers
+        print("✓ Fetching gainers...", end="", flush=True)
+        logger.info("Fetching daily stock gainers...")
+        all_gainers = api_client.get_daily_gainers()
+        print(f" ({len(all_gainers)} found)")
+        
+        # Filter for 10%+ gainers
+        high_gainers = api_client.filter_by_gain_percentage(all_gainers, min_gain=10.0)
+        
+        # Sort by gain percentage
+        sorted_gainers = sort_by_gain_percentage(high_gainers)
+        
+        logger.info(f"Total gainers: {len(all_gainers)}")
+        logger.info(f"10%+ gainers: {len(sorted_gainers)}")
+        completed('gainers')
+    
+    # Enrich with market cap data and apply filters
+    if sorted_gainers and pending('profiles'):
+        print("✓ Applying filters...", end="", flush=True)
+        logger.info("Fetching company profile data...")
+        sorted_gainers = api_client.enrich_with_market_cap(sorted_gainers)
+        
+        initial_count = len(sorted_gainers)
+        
+        # Filter by market cap (minimum $300M)
+        logger.info("Applying market cap filter ($300M minimum)...")
+        sorted_gainers = api_client.filter_by_market_cap(sorted_gainers, min_market_cap=300_000_000)
+        after_market_cap = len(sorted_gainers)
+        
+        # Filter by industry (exclude biotechnology/pharmaceutical)
+        logger.info("Applying industry filter (excluding biotechnology)...")
+        sorted_gainers = api_client.filter_by_industry(sorted_gainers, exclude_biotech=True)
+        after_industry = len(sorted_gainers)
+        
+        # Re-sort after filtering (in case order changed)
+        sorted_gainers = sort_by_gain_percentage(sorted_gainers)
+        
+        # Show filter results
+        print(f" ({initial_count} → {after_market_cap} → {after_industry} qualify)")
+        completed('profiles')
+    
+    # Check technical nature and filter before enriching with other data
+    if sorted_gainers and config.perplexity_api_key:
+        if pending('technical'):
+            print("\nChecking technical nature:")
+            
+            # First, check technical nature only
+            sorted_gainers = api_client.check_technical_nature(
+                sorted_gainers,
+                config.perplexity_api_key,
+                progress_callback=print_progress
+            )
+            
+            # Filter by technical nature
+            print("✓ Applying technical filter...", end="", flush=True)
+            before_tech = len(sorted_gainers)
+            sorted_gainers = api_client.filter_by_technical_nature(sorted_gainers)
+            after_tech = len(sorted_gainers)
+            print(f" ({before_tech} → {after_tech} technical companies)")
+            completed('technical')
+        
+        # Fetch growth rates first and filter early to save API calls
+        if sorted_gainers and pending('growth'):
+            print("\nFetching growth rates:")
+            sorted_gainers = api_client.fetch_growth_rates(
+                sorted_gainers,
+                config.perplexity_api_key,
+                progress_callback=print_progress
+            )
+            
+            growth_successful = sum(1 for stock in sorted_gainers if stock.get('growth_rate'))
+            print(f"✓ Growth rates fetched ({growth_successful}/{len(sorted_gainers)} companies)")
+            
+            # Filter by growth rate (minimum 10% per year) BEFORE fetching other data
+            print("\nFiltering by growth rate (minimum 10% per year)...")
+            before_growth = len(sorted_gainers)
+            sorted_gainers = api_client.filter_by_growth_rate(sorted_gainers, min_growth=10.0)
+            after_growth = len(sorted_gainers)
+            print(f" ({before_growth} → {after_growth} companies with ≥10% growth in all available years)")
+            completed('growth')
+        
+        # Fetch revenue projections for 2030
+        if sorted_gainers and pending('projection'):
+            print("\nFetching revenue projections for 2030:")
+            sorted_gainers = api_client.fetch_revenue_projection_2030(
+                sorted_gainers,
+                config.perplexity_api_key,
+                progress_callback=print_progress
+            )
+            
+            projection_successful = sum(1 for stock in sorted_gainers if stock.get('revenue_projection_2030'))
+            print(f"✓ Revenue projections fetched ({projection_successful}/{len(sorted_gainers)} companies)")
+            
+            # Filter by 2030 projection (minimum 10% growth)
+            print("\nFiltering by 2030 growth projection (minimum 10% per year)...")
+            before_2030 = len(sorted_gainers)
+            sorted_gainers = api_client.filter_by_2030_projection(sorted_gainers, min_growth=10.0)
+            after_2030 = len(sorted_gainers)
+            print(f" ({before_2030} → {after_2030} companies with ≥10% projected growth in 2030)")
+            completed('projection')
+        
+        # Now fetch remaining data only for companies that passed all filters
+        if sorted_gainers and pending('remaining'):
+            print("\nFetching remaining company data:")
+            sorted_gainers = api_client.enrich_remaining_data(
+                sorted_gainers,
+                config.perplexity_api_key,
+                progress_callback=print_progress
+            )
+            
+            # Count successful fetches
+            desc_successful = sum(1 for stock in sorted_gainers if stock.get('description'))
+            ps_successful = sum(1 for stock in sorted_gainers if stock.get('ps_ratio') is not None)
+            guidance_successful = sum(1 for stock in sorted_gainers if stock.get('earnings_guidance'))
+            eval_successful = sum(1 for stock in sorted_gainers if stock.get('investment_evaluation'))
+            print(f"✓ Data fetching complete (descriptions: {desc_successful}/{len(sorted_gainers)}, P/S ratios: {ps_successful}/{len(sorted_gainers)}, earnings guidance: {guidance_successful}/{len(sorted_gainers)}, investment evaluations: {eval_successful}/{len(sorted_gainers)})")
+            completed('remaining')
+        
+        # Fetch Polygon analyst data
+        if sorted_gainers and config.polygon_api_key and pending('polygon'):
+            print("\nFetching analyst ratings from Polygon:")
+            sorted_gainers = api_client.enrich_with_polygon_data(
+                sorted_gainers,
+                config.polygon_api_key,
+                progress_callback=print_progress
+            )
+            
+            polygon_successful = sum(1 for stock in sorted_gainers if stock.get('polygon_consensus') is not None)
+            print(f"✓ Polygon data fetched ({polygon_successful}/{len(sorted_gainers)} companies)")
+            completed('polygon')
+    
+    if pending('complete'):
+        completed('complete')
+    return sorted_gainers
+
+
+def fetch_put_call_ratio(config: Config, response_cache=None) -> Optional[str]:
+    """Fetch the market put/call ratio from Perplexity.
+    
+    Args:
+        config: Application configuration
+        response_cache: Optional response cache
+    
+    Returns:
+        Put/call ratio text, or None if unavailable
+    """
+    put_call_ratio = None
+    if config.perplexity_api_key:
+        print("\n✓ Fetching market sentiment (put/call ratio)...", end="", flush=True)
+        from perplexity_client import PerplexityClient
+        with PerplexityClient(config.perplexity_api_key, cache=response_cache,
+                              base_url=config.perplexity_base_url) as perplexity:
+            put_call_ratio = perplexity.get_put_call_ratio()
+        if put_call_ratio:
+            print(f" {put_call_ratio}")
+        else:
+            print(" N/A")
+    return put_call_ratio
+
+
+def build_alert_pipeline(api_client: FMPAPIClient, config: Config,
+                         response_cache=None, fetch_put_call: bool = True,
+                         full_scan: bool = False) -> Pipeline:
+    """Build the stock alert stages as a pipeline.
+    
+    After the profile filters each stock moves through the technical, growth
+    and 2030 projection filters on its own, and the stocks that pass get
+    Perplexity details, FMP financial data and Polygon analyst data
+    concurrently. The put/call ratio is fetched alongside everything else.
+    
+    Args:
+        api_client: FMP API client
+        config: Application configuration
+        response_cache: Optional response cache for the put/call request
+        fetch_put_call: Whether to fetch the put/call ratio
+        full_scan: Screen whole exchanges instead of the top 50 gainers list
+    
+    Returns:
+        Pipeline whose 'enriched' stage yields the final stocks and whose
+        'put_call' stage yields the put/call ratio
+    """
+    perplexity_key = config.perplexity_api_key
+    concurrency = config.perplexity_max_concurrency
+    
+    def gainers(_):
+        if full_scan:
+            stocks = api_client.scan_market_gainers(
+                min_gain=10.0, min_market_cap=300_000_000, exchanges=config.full_scan_exchanges
+            )
+            print(f"✓ Scanned the full market ({len(stocks)} gainers of 10%+ and $300M+)")
+            return stocks
+        all_gainers = api_client.get_daily_gainers()
+        print(f"✓ Fetched gainers ({len(all_gainers)} found)")
+        return api_client.filter_by_gain_percentage(all_gainers, min_gain=10.0)
+    
+    def profiles(stocks):
+        stocks = api_client.enrich_with_market_cap(stocks)
+        stocks = api_client.filter_by_market_cap(stocks, min_market_cap=300_000_000)
+        return api_client.filter_by_industry(stocks, exclude_biotech=True)
+    
+    def technical(stocks):
+        stocks = api_client.check_technical_nature(stocks, perplexity_key, progress_callback=print_progress)
+        return api_client.filter_by_technical_nature(stocks)
+    
+    def growth(stocks):
+        stocks = api_client.fetch_growth_rates(stocks, perplexity_key, progress_callback=print_progress)
+        return api_client.filter_by_growth_rate(stocks, min_growth=10.0)
+    
+    def projection(stocks):
+        stocks = api_client.fetch_revenue_projection_2030(stocks, perplexity_key, progress_callback=print_progress)
+        return api_client.filter_by_2030_projection(stocks, min_growth=10.0)
+    
+    def details(stocks):
+        return api_client.fetch_perplexity_details(stocks, perplexity_key, progress_callback=print_progress)
+    
+    def financials(stocks):
+        return api_client.enrich_with_financial_data(stocks, progress_callback=print_progress)
+    
+    def polygon(stocks):
+        return api_client.enrich_with_polygon_data(stocks, config.polygon_api_key, progress_callback=print_progress)
+    
+    def put_call(_):
+        # Counts toward the same Perplexity concurrency bound as the filter stages
+        with api_client.perplexity_slots:
+            return [fetch_put_call_ratio(config, response_cache)]
+    
+    stages = [Stage('gainers', gainers), Stage('profiles', profiles, after=['gainers'])]
+    if fetch_put_call:
+        stages.append(Stage('put_call', put_call))
+    
+    if not perplexity_key:
+        stages.append(Stage('enriched', lambda stocks: stocks, after=['profiles']))
+        return Pipeline(stages)
+    
+    # Filters run per stock (technical checks in batches) so each stock moves on as soon as it passes
+    stages += [
+        Stage('technical', technical, after=['profiles'],
+              batch_size=config.technical_batch_size, workers=concurrency),
+        Stage('growth', growth, after=['technical'], batch_size=1, workers=concurrency),
+        Stage('projection', projection, after=['growth'], batch_size=1, workers=concurrency),
+        Stage('details', details, after=['projection'], batch_size=1, workers=concurrency),
+        Stage('financials', financials, after=['projection'], batch_size=1, workers=2),
+    ]
+    branches = ['details', 'financials']
+    if config.polygon_api_key:
+        stages.append(Stage('polygon', polygon, after=['projection'], batch_size=1, workers=2))
+        branches.append('polygon')
+    stages.append(Stage('enriched', lambda stocks: stocks, after=branches))
     
-    return sorted(stocks, key=get_change_percent, reverse=True)
+    return Pipeline(stages)
+
+
+def run_alert_pipeline(api_client: FMPAPIClient, config: Config, response_cache=None,
+                       fetch_put_call: bool = True, checkpoint: Optional[RunCheckpoint] = None,
+                       resume: bool = False, full_scan: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Run the stock alert stages as a pipeline.
+    
+    Stocks flow through the pipeline individually, so only the final stock
+    list is checkpointed; resuming skips the pipeline once that exists.
+    
+    Args:
+        api_client: FMP API client
+        config: Application configuration
+        response_cache: Optional response cache for the put/call request
+        fetch_put_call: Whether to fetch the put/call ratio
+        checkpoint: Optional checkpoint store for the final stock list
+        resume: Reuse the final stock list of an earlier attempt if one was saved
+        full_scan: Screen whole exchanges instead of the top 50 gainers list
+    
+    Returns:
+        Tuple of (stocks that passed all filters sorted by gain, put/call ratio)
+    """
+    logger = logging.getLogger(__name__)
+    
+    if checkpoint and resume:
+        stocks = checkpoint.load('complete')
+        if stocks is not None:
+            stocks = StockRecord.from_rows(stocks)
+            print(f"✓ Resuming with the completed stock list ({len(stocks)} stocks)")
+            put_call_ratio = fetch_put_call_ratio(config, response_cache) if fetch_put_call else None
+            return stocks, put_call_ratio
+    elif checkpoint:
+        checkpoint.clear()
+    
+    print("✓ Running pipeline...")
+    pipeline = build_alert_pipeline(api_client, config, response_cache, fetch_put_call, full_scan)
+    metrics = get_metrics()
+    with metrics.stage('pipeline'):
+        outputs = pipeline.run()
+    for name, stats in pipeline.stats.items():
+        metrics.record_stage(f"pipeline.{name}", stats['seconds'], int(stats['in']), int(stats['out']))
+    
+    funnel = ' → '.join(
+        f"{name} {int(pipeline.stats[name]['out'])}"
+        for name in ('profiles', 'technical', 'growth', 'projection') if name in pipeline.stats
+    )
+    print(f"✓ Pipeline complete ({funnel})")
+    logger.info(f"Pipeline stage stats: {pipeline.stats}")
+    
+    stocks = sort_by_gain_percentage(outputs['enriched'])
+    if checkpoint:
+        checkpoint.save('complete', stocks)
+    
+    put_call_ratio = (outputs.get('put_call') or [None])[0]
+    return stocks, put_call_ratio
+
+
+def run_backfill_command(start: date, end: date) -> None:
+    """Backfill screening results for a range of past dates and exit non-zero if any failed.
+    
+    Args:
+        start: First date
+        end: Last date
+    """
+    logger = logging.getLogger(__name__)
+    print(f"Stock Alerts - Backfill {start} to {end}")
+    print("━" * 24)
+    
+    # Imported here so regular runs don't load the multiprocessing machinery
+    from backfill import run_backfill
+    
+    try:
+        config = Config()
+        results = run_backfill(config, start, end)
+    except Exception as e:
+        print(f"\n✗ Error: {e}")
+        logger.error(f"Backfill error: {e}")
+        sys.exit(1)
+    
+    failed = [result['date'] for result in results if 'error' in result]
+    stored = sum(result.get('stocks', 0) for result in results)
+    print(f"\n✓ Backfilled {len(results) - len(failed)} dates ({stored} stocks) to {config.backfill_dir}")
+    if failed:
+        print(f"✗ Failed dates (re-run to retry): {', '.join(failed)}")
+        sys.exit(1)
 
 
 def main() -> None:
@@ -76,12 +500,38 @@ def main() -> None:
         action='store_true',
         help='Preview email without sending'
     )
+    parser.add_argument(
+        '--pipeline',
+        action='store_true',
+        help='Run independent stages concurrently, moving each stock on as soon as it passes a filter'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help="Continue today's run from its last checkpointed stage"
+    )
+    parser.add_argument(
+        '--full-scan',
+        action='store_true',
+        help='Screen every stock on the configured exchanges instead of the top 50 gainers'
+    )
+    parser.add_argument(
+        '--backfill',
+        nargs=2,
+        type=date.fromisoformat,
+        metavar=('START', 'END'),
+        help='Screen past dates (YYYY-MM-DD, inclusive) from historical data instead of today; no email is sent'
+    )
     args = parser.parse_args()
     
     # Set up logging
     setup_logging()
     logger = logging.getLogger(__name__)
     
+    if args.backfill:
+        run_backfill_command(*args.backfill)
+        return
+    
     # Clean progress display
     if args.test:
         print("Stock Alerts - Test Run")
@@ -92,161 +542,50 @@ def main() -> None:
     logger.info("=== Stock Alerts Started ===")
     logger.info(f"Run time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
+    # Timings and per-provider request counts for the run manifest
+    metrics = reset_metrics()
+    config = None
+    status = 'failed'
+    
     try:
         # Load configuration
         config = Config()
         logger.info("Configuration loaded successfully")
+        configure_rate_limits(config)
+        
+        # Shared on-disk response cache for FMP and Perplexity requests
+        response_cache = create_response_cache(config)
+        # Per-symbol decisions (e.g. technical nature) persisted between runs
+        symbol_store = create_symbol_store(config)
+        # Polygon analyst ratings, synced incrementally between runs
+        ratings_store = create_ratings_store(config)
+        # Stock list saved after each stage so a failed run can --resume
+        checkpoint = RunCheckpoint(config.checkpoint_dir) if config.checkpoint_enabled or args.resume else None
         
         # Initialize API client
-        with FMPAPIClient(config.fmp_api_key) as api_client:
-            # Fetch daily gainers
-            print("✓ Fetching gainers...", end="", flush=True)
-            logger.info("Fetching daily stock gainers...")
-            all_gainers = api_client.get_daily_gainers()
-            print(f" ({len(all_gainers)} found)")
-            
-            # Filter for 10%+ gainers
-            high_gainers = api_client.filter_by_gain_percentage(all_gainers, min_gain=10.0)
-            
-            # Sort by gain percentage
-            sorted_gainers = sort_by_gain_percentage(high_gainers)
-            
-            logger.info(f"Total gainers: {len(all_gainers)}")
-            logger.info(f"10%+ gainers: {len(sorted_gainers)}")
-            
-            # Enrich with market cap data and apply filters
-            if sorted_gainers:
-                print("✓ Applying filters...", end="", flush=True)
-                logger.info("Fetching company profile data...")
-                sorted_gainers = api_client.enrich_with_market_cap(sorted_gainers)
-                
-                initial_count = len(sorted_gainers)
-                
-                # Filter by market cap (minimum $300M)
-                logger.info("Applying market cap filter ($300M minimum)...")
-                sorted_gainers = api_client.filter_by_market_cap(sorted_gainers, min_market_cap=300_000_000)
-                after_market_cap = len(sorted_gainers)
-                
-                # Filter by industry (exclude biotechnology/pharmaceutical)
-                logger.info("Applying industry filter (excluding biotechnology)...")
-                sorted_gainers = api_client.filter_by_industry(sorted_gainers, exclude_biotech=True)
-                after_industry = len(sorted_gainers)
-                
-                # Re-sort after filtering (in case order changed)
-                sorted_gainers = sort_by_gain_percentage(sorted_gainers)
-                
-                # Show filter results
-                print(f" ({initial_count} → {after_market_cap} → {after_industry} qualify)")
-            
-            # Check technical nature and filter before enriching with other data
-            if sorted_gainers and config.perplexity_api_key:
-                print("\nChecking technical nature:")
-                
-                def progress_callback(company, success, data_type=None):
-                    if success:
-                        if data_type == "growth":
-                            print(f"  → {company} growth rate ✓")
-                        elif data_type == "ps_ratio":
-                            print(f"  → {company} P/S ratio ✓")
-                        elif data_type == "technical_check":
-                            print(f"  → {company} technical check ✓")
-                        elif data_type == "earnings_guidance":
-                            print(f"  → {company} earnings guidance ✓")
-                        elif data_type == "analyst_price_targets":
-                            print(f"  → {company} analyst price targets ✓")
-                        elif data_type == "revenue_projection_2030":
-                            print(f"  → {company} revenue projection 2030 ✓")
-                        elif data_type == "investment_evaluation":
-                            print(f"  → {company} investment evaluation ✓")
-                        elif data_type == "financial_metrics":
-                            print(f"  → {company} financial metrics ✓")
-                        elif data_type == "polygon_data":
-                            print(f"  → {company} Polygon analyst data ✓")
-                        else:
-                            print(f"  → {company} description ✓")
-                    else:
-                        # data_type contains error message when success is False
-                        print(f"  → {company} ✗ ({data_type})")
-                
-                # First, check technical nature only
-                sorted_gainers = api_client.check_technical_nature(
-                    sorted_gainers,
-                    config.perplexity_api_key,
-                    progress_callback=progress_callback
+        with FMPAPIClient(config.fmp_api_key, max_workers=config.fmp_max_workers,
+                          cache=response_cache,
+                          perplexity_concurrency=config.perplexity_max_concurrency,
+                          use_dossier=config.perplexity_dossier_enabled,
+                          technical_batch_size=config.technical_batch_size,
+                          symbol_store=symbol_store,
+                          perplexity_stream=config.perplexity_stream,
+                          perplexity_stream_deadline=config.perplexity_stream_deadline,
+                          polygon_max_workers=config.polygon_max_workers,
+                          ratings_store=ratings_store,
+                          base_url=config.fmp_base_url,
+                          perplexity_base_url=config.perplexity_base_url,
+                          polygon_base_url=config.polygon_base_url) as api_client:
+            if args.pipeline:
+                sorted_gainers, put_call_ratio = run_alert_pipeline(
+                    api_client, config, response_cache,
+                    fetch_put_call=args.test or not args.dry_run,
+                    checkpoint=checkpoint, resume=args.resume, full_scan=args.full_scan
                 )
-                
-                # Filter by technical nature
-                print("✓ Applying technical filter...", end="", flush=True)
-                before_tech = len(sorted_gainers)
-                sorted_gainers = api_client.filter_by_technical_nature(sorted_gainers)
-                after_tech = len(sorted_gainers)
-                print(f" ({before_tech} → {after_tech} technical companies)")
-                
-                # Fetch growth rates first and filter early to save API calls
-                if sorted_gainers:
-                    print("\nFetching growth rates:")
-                    sorted_gainers = api_client.fetch_growth_rates(
-                        sorted_gainers,
-                        config.perplexity_api_key,
-                        progress_callback=progress_callback
-                    )
-                    
-                    growth_successful = sum(1 for stock in sorted_gainers if stock.get('growth_rate'))
-                    print(f"✓ Growth rates fetched ({growth_successful}/{len(sorted_gainers)} companies)")
-                    
-                    # Filter by growth rate (minimum 10% per year) BEFORE fetching other data
-                    print("\nFiltering by growth rate (minimum 10% per year)...")
-                    before_growth = len(sorted_gainers)
-                    sorted_gainers = api_client.filter_by_growth_rate(sorted_gainers, min_growth=10.0)
-                    after_growth = len(sorted_gainers)
-                    print(f" ({before_growth} → {after_growth} companies with ≥10% growth in all available years)")
-                    
-                    # Fetch revenue projections for 2030
-                    if sorted_gainers:
-                        print("\nFetching revenue projections for 2030:")
-                        sorted_gainers = api_client.fetch_revenue_projection_2030(
-                            sorted_gainers,
-                            config.perplexity_api_key,
-                            progress_callback=progress_callback
-                        )
-                        
-                        projection_successful = sum(1 for stock in sorted_gainers if stock.get('revenue_projection_2030'))
-                        print(f"✓ Revenue projections fetched ({projection_successful}/{len(sorted_gainers)} companies)")
-                        
-                        # Filter by 2030 projection (minimum 10% growth)
-                        print("\nFiltering by 2030 growth projection (minimum 10% per year)...")
-                        before_2030 = len(sorted_gainers)
-                        sorted_gainers = api_client.filter_by_2030_projection(sorted_gainers, min_growth=10.0)
-                        after_2030 = len(sorted_gainers)
-                        print(f" ({before_2030} → {after_2030} companies with ≥10% projected growth in 2030)")
-                    
-                    # Now fetch remaining data only for companies that passed all filters
-                    if sorted_gainers:
-                        print("\nFetching remaining company data:")
-                        sorted_gainers = api_client.enrich_remaining_data(
-                            sorted_gainers,
-                            config.perplexity_api_key,
-                            progress_callback=progress_callback
-                        )
-                        
-                        # Count successful fetches
-                        desc_successful = sum(1 for stock in sorted_gainers if stock.get('description'))
-                        ps_successful = sum(1 for stock in sorted_gainers if stock.get('ps_ratio') is not None)
-                        guidance_successful = sum(1 for stock in sorted_gainers if stock.get('earnings_guidance'))
-                        eval_successful = sum(1 for stock in sorted_gainers if stock.get('investment_evaluation'))
-                        print(f"✓ Data fetching complete (descriptions: {desc_successful}/{len(sorted_gainers)}, P/S ratios: {ps_successful}/{len(sorted_gainers)}, earnings guidance: {guidance_successful}/{len(sorted_gainers)}, investment evaluations: {eval_successful}/{len(sorted_gainers)})")
-                        
-                        # Fetch Polygon analyst data
-                        if config.polygon_api_key:
-                            print("\nFetching analyst ratings from Polygon:")
-                            sorted_gainers = api_client.enrich_with_polygon_data(
-                                sorted_gainers,
-                                config.polygon_api_key,
-                                progress_callback=progress_callback
-                            )
-                            
-                            polygon_successful = sum(1 for stock in sorted_gainers if stock.get('polygon_consensus') is not None)
-                            print(f"✓ Polygon data fetched ({polygon_successful}/{len(sorted_gainers)} companies)")
+            else:
+                sorted_gainers = run_filter_chain(api_client, config, checkpoint=checkpoint,
+                                                  resume=args.resume, full_scan=args.full_scan)
+                put_call_ratio = None
             
             # Log top gainers
             if sorted_gainers:
@@ -258,17 +597,10 @@ def main() -> None:
             
             # Send email if --test flag is set or if it's a regular run
             if args.test or not args.dry_run:
-                # Fetch put/call ratio
-                put_call_ratio = None
-                if config.perplexity_api_key:
-                    print("\n✓ Fetching market sentiment (put/call ratio)...", end="", flush=True)
-                    from perplexity_client import PerplexityClient
-                    with PerplexityClient(config.perplexity_api_key) as perplexity:
-                        put_call_ratio = perplexity.get_put_call_ratio()
-                    if put_call_ratio:
-                        print(f" {put_call_ratio}")
-                    else:
-                        print(" N/A")
+                # Fetch put/call ratio (the pipeline fetches it alongside the other stages)
+                if not args.pipeline:
+                    with get_metrics().stage('put_call'):
+                        put_call_ratio = fetch_put_call_ratio(config, response_cache)
                 
                 email_sender = EmailSender(
                     smtp_server=config.smtp_server,
@@ -279,12 +611,13 @@ def main() -> None:
                 
                 print("\n✓ Sending email...", end="", flush=True)
                 logger.info(f"Sending email to {config.email_recipient}...")
-                success = email_sender.send_email(
-                    recipient=config.email_recipient,
-                    stocks=sorted_gainers,
-                    dry_run=args.dry_run,
-                    put_call_ratio=put_call_ratio
-                )
+                with get_metrics().stage('email'):
+                    success = email_sender.send_email(
+                        recipient=config.email_recipient,
+                        stocks=sorted_gainers,
+                        dry_run=args.dry_run,
+                        put_call_ratio=put_call_ratio
+                    )
                 
                 if success:
                     print(" Done!")
@@ -297,12 +630,27 @@ def main() -> None:
             else:
                 logger.info("Dry run mode - email not sent")
         
+        if response_cache:
+            logger.info(f"HTTP cache stats: {response_cache.stats()}")
+        
         logger.info("=== Stock Alerts Completed Successfully ===")
+        status = 'succeeded'
         
     except Exception as e:
         print(f"\n✗ Error: {e}")
         logger.error(f"Error: {e}")
         sys.exit(1)
+    
+    finally:
+        if config is not None:
+            run_date = metrics.started_at.strftime('%Y-%m-%d')
+            metrics.write_manifest(
+                os.path.join(config.checkpoint_dir, run_date, 'run_manifest.json'),
+                status=status, pipeline=args.pipeline, resumed=args.resume,
+                full_scan=args.full_scan
+            )
+            if config.prometheus_textfile:
+                metrics.write_prometheus(config.prometheus_textfile)
 
 
 if __name__ == "__main__":
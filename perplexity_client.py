@@ -1,11 +1,21 @@
 """Perplexity API client for generating company descriptions."""
 
+import asyncio
+import json
 import logging
+import re
+import socket
+import threading
 import time
-from typing import Optional, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Callable, List, Tuple
 import requests
 from requests.exceptions import RequestException, Timeout
 
+from http_cache import ResponseCache, normalize_request_key
+from instrumentation import get_metrics
+from provider_session import ProviderSession
+
 
 logger = logging.getLogger(__name__)
 
@@ -39,24 +49,256 @@ def clean_markdown(text: str) -> str:
     return text.strip()
 
 
+# Keys filled by a company dossier response
+DOSSIER_FIELDS = (
+    'description',
+    'competitive_score',
+    'competitive_reasoning',
+    'market_growth_score',
+    'market_growth_reasoning',
+    'ps_ratio',
+    'earnings_guidance',
+    'analyst_price_targets',
+)
+
+
+def parse_company_dossier(text: str) -> Optional[dict]:
+    """Parse a JSON-shaped company dossier response.
+    
+    Tolerates code fences, surrounding prose and citation markers. Scores are
+    converted to integers out of 10 and the P/S ratio to a float; values that
+    can't be interpreted are set to None.
+    
+    Args:
+        text: Raw model response
+    
+    Returns:
+        Dictionary with every key in DOSSIER_FIELDS, or None if no JSON object was found
+    """
+    if not text:
+        return None
+    
+    # Remove citation markers like [1], [2] before decoding
+    text = re.sub(r'\s*\[\d+\]', '', text)
+    start, end = text.find('{'), text.rfind('}')
+    if start < 0 or end <= start:
+        return None
+    
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    if not isinstance(data, dict):
+        return None
+    
+    dossier = {}
+    for key in DOSSIER_FIELDS:
+        value = data.get(key)
+        if value is None or isinstance(value, (dict, list)) or str(value).strip().lower() in ('', 'null', 'n/a'):
+            dossier[key] = None
+        elif key in ('competitive_score', 'market_growth_score'):
+            match = re.search(r'\d+', str(value))
+            score = int(match.group()) if match else None
+            dossier[key] = score if score is not None and 0 <= score <= 10 else None
+        elif key == 'ps_ratio':
+            match = re.search(r'\d+\.?\d*', str(value))
+            dossier[key] = float(match.group()) if match else None
+        else:
+            dossier[key] = clean_markdown(str(value).strip())
+    
+    return dossier
+
+
+def classification_label(company_name: str) -> str:
+    """Get the label a company is listed under in a multi-company prompt.
+    
+    Uses the ticker from a "Name (TICKER)" company name, otherwise the name itself.
+    
+    Args:
+        company_name: Company name
+    
+    Returns:
+        Upper-case label
+    """
+    match = re.search(r'\(([A-Za-z0-9.\-]+)\)\s*$', company_name)
+    return (match.group(1) if match else company_name).strip().upper()
+
+
+def parse_classification_map(text: str, labels) -> dict:
+    """Parse "LABEL: yes/no" lines from a multi-company classification reply.
+    
+    Args:
+        text: Raw model response
+        labels: Labels that were asked about
+    
+    Returns:
+        Dictionary mapping each answered label to True (yes) or False (no);
+        unknown labels and unclear lines are ignored
+    """
+    wanted = {label.upper() for label in labels}
+    answers = {}
+    
+    for line in clean_markdown(re.sub(r'\[\d+\]', '', text or '')).splitlines():
+        match = re.match(r'^\s*(?:[-*\u2022]|\d+[.)])?\s*(.+?)\s*[:=\u2013\u2014-]\s*(yes|no)\b', line, re.IGNORECASE)
+        if not match:
+            continue
+        label = match.group(1).strip(' *`"\'').upper()
+        if label in wanted and label not in answers:
+            answers[label] = match.group(2).lower() == 'yes'
+    
+    return answers
+
+
 class PerplexityClient:
     """Client for interacting with Perplexity API."""
     
     BASE_URL = "https://api.perplexity.ai"
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache: Optional[ResponseCache] = None,
+                 stream: bool = False, stream_deadline: float = 300,
+                 base_url: Optional[str] = None):
         """Initialize the Perplexity client with an API key.
         
         Args:
             api_key: Perplexity API key
+            cache: Optional response cache for completions
+            stream: Stream long investment evaluation and deep research responses
+            stream_deadline: Maximum seconds to read a streamed response before
+                             keeping the partial text
+            base_url: API base URL override (e.g. a local stand-in server)
         """
         self.api_key = api_key
-        self.session = requests.Session()
+        if base_url:
+            self.BASE_URL = base_url.rstrip('/')
+        self.stream = stream
+        self.stream_deadline = stream_deadline
+        self.session = ProviderSession('perplexity', cache=cache)
         self.session.headers.update({
             'Authorization': f'Bearer {api_key}',
             'Content-Type': 'application/json'
         })
     
+    def _stream_completion(self, payload: dict, deadline: float,
+                           on_chunk: Optional[Callable[[str], None]] = None,
+                           cache_class: Optional[str] = None,
+                           read_timeout: float = 60) -> Tuple[Optional[str], bool]:
+        """Request a chat completion as server-sent events and assemble the text.
+        
+        The body is consumed chunk by chunk; each piece of content is passed to
+        on_chunk as it arrives. When the deadline passes or the connection
+        stalls, whatever text has arrived so far is returned instead of being
+        discarded. A watchdog shuts the connection down at the deadline, so a
+        server that stops sending can't hold the read past it. Complete
+        responses are stored in the response cache under the same key as the
+        equivalent non-streamed request.
+        
+        Args:
+            payload: Chat completion request body (without "stream")
+            deadline: Maximum total seconds to spend reading the response
+            on_chunk: Optional callback receiving each content fragment
+            cache_class: Endpoint class for caching complete responses
+            read_timeout: Maximum seconds to wait between chunks
+        
+        Returns:
+            Tuple of (text or None if nothing arrived, whether the response completed)
+        """
+        url = f"{self.BASE_URL}/chat/completions"
+        cache = self.session.cache
+        key = None
+        if cache is not None and cache.is_cacheable(cache_class):
+            key = normalize_request_key('POST', url, body=payload)
+            cached = cache.get(key, cache_class)
+            if cached is not None:
+                content = json.loads(cached[2])['choices'][0]['message']['content']
+                if on_chunk:
+                    on_chunk(content)
+                return content, True
+        
+        started = time.monotonic()
+        parts = []
+        complete = False
+        
+        response = self.session.post(
+            url,
+            json={**payload, "stream": True},
+            timeout=(10, min(read_timeout, deadline)),
+            stream=True
+        )
+        
+        expired = threading.Event()
+        
+        def expire():
+            expired.set()
+            self._abort_stream(response)
+        
+        watchdog = threading.Timer(max(0.0, deadline - (time.monotonic() - started)), expire)
+        watchdog.daemon = True
+        watchdog.start()
+        try:
+            response.raise_for_status()
+            
+            # Decode explicitly: event-stream responses often omit a charset
+            for raw_line in response.iter_lines():
+                line = raw_line.decode('utf-8', errors='replace')
+                if line.startswith('data:'):
+                    data = line[5:].strip()
+                    if data == '[DONE]':
+                        complete = True
+                        break
+                    
+                    try:
+                        event = json.loads(data)
+                    except ValueError:
+                        event = {}
+                    
+                    choices = event.get('choices') or [{}]
+                    delta = choices[0].get('delta') or choices[0].get('message') or {}
+                    content = delta.get('content')
+                    if content:
+                        parts.append(content)
+                        if on_chunk:
+                            on_chunk(content)
+                    if choices[0].get('finish_reason'):
+                        complete = True
+                
+                if not complete and (expired.is_set() or time.monotonic() - started > deadline):
+                    break
+        except (Timeout, requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+            if not parts and not expired.is_set():
+                raise
+            if not expired.is_set():
+                logger.warning(f"Stream interrupted ({e}); keeping partial response")
+        finally:
+            watchdog.cancel()
+            response.close()
+        
+        if not complete and (expired.is_set() or time.monotonic() - started > deadline):
+            logger.warning(f"Streaming deadline of {deadline:.0f}s reached; keeping partial response")
+        
+        text = ''.join(parts)
+        if not text:
+            return None, complete
+        
+        if complete and key:
+            body = json.dumps({'choices': [{'message': {'content': text}}]}).encode('utf-8')
+            ttl = cache.ttl_for(cache_class)
+            if ttl:
+                cache.set(key, 200, {'Content-Type': 'application/json'}, body, ttl, endpoint_class=cache_class)
+        
+        return text, complete
+    
+    @staticmethod
+    def _abort_stream(response: requests.Response) -> None:
+        """Shut down a streamed response's socket, waking a read blocked on it."""
+        connection = getattr(response.raw, 'connection', None)
+        sock = getattr(connection, 'sock', None)
+        if sock is None:
+            return
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+    
     def get_company_description(self, company_name: str) -> Optional[str]:
         """Get company description with competitive advantage and market growth analysis.
         
@@ -85,7 +327,8 @@ class PerplexityClient:
                     "temperature": 0.1,
                     "max_tokens": 200
                 },
-                timeout=20
+                timeout=20,
+                cache_class='llm_description'
             )
             
             response.raise_for_status()
@@ -151,7 +394,8 @@ class PerplexityClient:
                     "temperature": 0.1,
                     "max_tokens": 50
                 },
-                timeout=20
+                timeout=20,
+                cache_class='llm_analysis'
             )
             
             response.raise_for_status()
@@ -189,13 +433,14 @@ class PerplexityClient:
     
     def get_descriptions_batch(self, company_names: list, 
                              progress_callback: Optional[Callable] = None,
-                             delay: float = 0.5) -> dict:
+                             delay: float = 0.0) -> dict:
         """Get descriptions for multiple companies with rate limiting.
         
         Args:
             company_names: List of company names
             progress_callback: Optional callback for progress updates
-            delay: Delay between requests in seconds
+            delay: Optional extra delay between requests in seconds; pacing
+                   normally comes from the shared Perplexity rate limiter
             
         Returns:
             Dictionary mapping company names to descriptions
@@ -204,8 +449,8 @@ class PerplexityClient:
         successful = 0
         
         for i, company in enumerate(company_names):
-            if i > 0:
-                time.sleep(delay)  # Rate limiting
+            if i > 0 and delay > 0:
+                time.sleep(delay)
             
             try:
                 description = self.get_company_description(company)
@@ -255,7 +500,8 @@ class PerplexityClient:
                     "temperature": 0.1,
                     "max_tokens": 20
                 },
-                timeout=20
+                timeout=20,
+                cache_class='llm_analysis'
             )
             
             response.raise_for_status()
@@ -302,13 +548,14 @@ class PerplexityClient:
     
     def get_growth_rates_batch(self, company_names: list, 
                                progress_callback: Optional[Callable] = None,
-                               delay: float = 0.5) -> dict:
+                               delay: float = 0.0) -> dict:
         """Get growth rates for multiple companies with rate limiting.
         
         Args:
             company_names: List of company names
             progress_callback: Optional callback for progress updates
-            delay: Delay between requests in seconds
+            delay: Optional extra delay between requests in seconds; pacing
+                   normally comes from the shared Perplexity rate limiter
             
         Returns:
             Dictionary mapping company names to growth rates
@@ -317,8 +564,8 @@ class PerplexityClient:
         successful = 0
         
         for i, company in enumerate(company_names):
-            if i > 0:
-                time.sleep(delay)  # Rate limiting
+            if i > 0 and delay > 0:
+                time.sleep(delay)
             
             try:
                 growth_rate = self.get_company_growth_rate(company)
@@ -343,13 +590,14 @@ class PerplexityClient:
     
     def get_ps_ratios_batch(self, company_names: list, 
                             progress_callback: Optional[Callable] = None,
-                            delay: float = 0.5) -> dict:
+                            delay: float = 0.0) -> dict:
         """Get P/S ratios for multiple companies with rate limiting.
         
         Args:
             company_names: List of company names
             progress_callback: Optional callback for progress updates
-            delay: Delay between requests in seconds
+            delay: Optional extra delay between requests in seconds; pacing
+                   normally comes from the shared Perplexity rate limiter
             
         Returns:
             Dictionary mapping company names to P/S ratios
@@ -358,8 +606,8 @@ class PerplexityClient:
         successful = 0
         
         for i, company in enumerate(company_names):
-            if i > 0:
-                time.sleep(delay)  # Rate limiting
+            if i > 0 and delay > 0:
+                time.sleep(delay)
             
             try:
                 ps_ratio = self.get_ps_ratio(company)
@@ -406,7 +654,8 @@ class PerplexityClient:
                     "temperature": 0.1,
                     "max_tokens": 10
                 },
-                timeout=20
+                timeout=20,
+                cache_class='llm_classification'
             )
             
             response.raise_for_status()
@@ -450,15 +699,86 @@ class PerplexityClient:
             logger.error(f"Unexpected error checking technical nature for {company_name}: {e}")
             raise RequestException(str(e))
     
+    def classify_technical_companies(self, company_names: list) -> dict:
+        """Classify several companies as technical/engineering-heavy in one request.
+        
+        Args:
+            company_names: List of company names, ideally formatted "Name (TICKER)"
+        
+        Returns:
+            Dictionary mapping company names to True/False for every company the
+            reply answered; companies missing from the reply are left out
+        """
+        labels = {classification_label(name): name for name in company_names}
+        company_lines = "\n".join(f"{label}: {name}" for label, name in labels.items())
+        prompt = (
+            "For each company below, does it require significant technical or engineering expertise in its "
+            "core operations (including software, hardware, aerospace, manufacturing, industrial, scientific, or R&D)?\n"
+            f"{company_lines}\n"
+            "Critical: answer with exactly one line per company in the format 'LABEL: yes' or 'LABEL: no', "
+            "using the label before the colon above, and nothing else."
+        )
+        
+        try:
+            logger.debug(f"Classifying technical nature of {len(company_names)} companies")
+            
+            response = self.session.post(
+                f"{self.BASE_URL}/chat/completions",
+                json={
+                    "model": "sonar-pro",
+                    "messages": [
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    "temperature": 0.1,
+                    "max_tokens": 20 + 10 * len(company_names)
+                },
+                timeout=30,
+                cache_class='llm_classification'
+            )
+            
+            response.raise_for_status()
+            data = response.json()
+            
+            # Extract the per-label answers from response
+            if 'choices' in data and len(data['choices']) > 0:
+                answer = data['choices'][0]['message']['content']
+                answers = parse_classification_map(answer, labels.keys())
+                return {labels[label]: value for label, value in answers.items()}
+            else:
+                logger.warning(f"No answer in response for {len(company_names)} companies")
+                return {}
+        
+        except Timeout:
+            logger.warning(f"Timeout classifying {len(company_names)} companies")
+            raise RequestException("timeout")
+        
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 429:
+                logger.warning(f"Rate limit hit classifying {len(company_names)} companies")
+                raise RequestException("rate limit")
+            else:
+                logger.error(f"HTTP error classifying companies: {e}")
+                if e.response.text:
+                    logger.error(f"Response body: {e.response.text}")
+                raise RequestException(f"HTTP {e.response.status_code}")
+        
+        except Exception as e:
+            logger.error(f"Unexpected error classifying companies: {e}")
+            raise RequestException(str(e))
+    
     def get_technical_companies_batch(self, company_names: list, 
                                       progress_callback: Optional[Callable] = None,
-                                      delay: float = 0.5) -> dict:
+                                      delay: float = 0.0) -> dict:
         """Check if multiple companies are technical/engineering-heavy.
         
         Args:
             company_names: List of company names
             progress_callback: Optional callback for progress updates
-            delay: Delay between requests in seconds
+            delay: Optional extra delay between requests in seconds; pacing
+                   normally comes from the shared Perplexity rate limiter
             
         Returns:
             Dictionary mapping company names to boolean values
@@ -467,8 +787,8 @@ class PerplexityClient:
         successful = 0
         
         for i, company in enumerate(company_names):
-            if i > 0:
-                time.sleep(delay)  # Rate limiting
+            if i > 0 and delay > 0:
+                time.sleep(delay)
             
             try:
                 is_technical = self.is_technical_company(company)
@@ -518,7 +838,8 @@ class PerplexityClient:
                     "temperature": 0.1,
                     "max_tokens": 300
                 },
-                timeout=20
+                timeout=20,
+                cache_class='llm_analysis'
             )
             
             response.raise_for_status()
@@ -558,13 +879,14 @@ class PerplexityClient:
     
     def get_earnings_guidance_batch(self, company_names: list, 
                                     progress_callback: Optional[Callable] = None,
-                                    delay: float = 0.5) -> dict:
+                                    delay: float = 0.0) -> dict:
         """Get earnings guidance for multiple companies with rate limiting.
         
         Args:
             company_names: List of company names
             progress_callback: Optional callback for progress updates
-            delay: Delay between requests in seconds
+            delay: Optional extra delay between requests in seconds; pacing
+                   normally comes from the shared Perplexity rate limiter
             
         Returns:
             Dictionary mapping company names to earnings guidance
@@ -573,8 +895,8 @@ class PerplexityClient:
         successful = 0
         
         for i, company in enumerate(company_names):
-            if i > 0:
-                time.sleep(delay)  # Rate limiting
+            if i > 0 and delay > 0:
+                time.sleep(delay)
             
             try:
                 guidance = self.get_earnings_guidance(company)
@@ -624,7 +946,8 @@ class PerplexityClient:
                     "temperature": 0.1,
                     "max_tokens": 300
                 },
-                timeout=20
+                timeout=20,
+                cache_class='llm_analysis'
             )
             
             response.raise_for_status()
@@ -664,13 +987,14 @@ class PerplexityClient:
     
     def get_analyst_price_targets_batch(self, company_names: list, 
                                         progress_callback: Optional[Callable] = None,
-                                        delay: float = 0.5) -> dict:
+                                        delay: float = 0.0) -> dict:
         """Get analyst price targets for multiple companies with rate limiting.
         
         Args:
             company_names: List of company names
             progress_callback: Optional callback for progress updates
-            delay: Delay between requests in seconds
+            delay: Optional extra delay between requests in seconds; pacing
+                   normally comes from the shared Perplexity rate limiter
             
         Returns:
             Dictionary mapping company names to analyst price targets
@@ -679,8 +1003,8 @@ class PerplexityClient:
         successful = 0
         
         for i, company in enumerate(company_names):
-            if i > 0:
-                time.sleep(delay)  # Rate limiting
+            if i > 0 and delay > 0:
+                time.sleep(delay)
             
             try:
                 price_targets = self.get_analyst_price_targets(company)
@@ -703,6 +1027,130 @@ class PerplexityClient:
         logger.info(f"Successfully fetched analyst price targets for {successful}/{len(company_names)} companies")
         return results, successful
     
+    def get_company_dossier(self, company_name: str) -> Optional[dict]:
+        """Get the short per-company fields in a single JSON-shaped response.
+        
+        Combines the description/competitive/market growth analysis, P/S ratio,
+        earnings guidance and analyst price target prompts into one request.
+        
+        Args:
+            company_name: Name of the company
+        
+        Returns:
+            Dictionary with the DOSSIER_FIELDS keys (missing values are None),
+            or None if the response could not be parsed
+        """
+        prompt = (
+            f"Return a JSON object about {company_name} with exactly these keys: "
+            f"\"description\": what the company does in 50 words or less; "
+            f"\"competitive_score\": an integer out of 10 for how strong its competitive advantage is, "
+            f"based on how effectively its competitors can compete with it (near monopolies should receive the highest score); "
+            f"\"competitive_reasoning\": your reasoning for that score in 50 words or less; "
+            f"\"market_growth_score\": an integer out of 10 for how fast its market is going to grow over the next 5 years; "
+            f"\"market_growth_reasoning\": your reasoning for that score in 50 words or less; "
+            f"\"ps_ratio\": its current price to sales ratio as a number; "
+            f"\"earnings_guidance\": exactly in the format \"{company_name} last reported earnings on [date] and "
+            f"[commentary on how top and bottom line guidance changed]\"; "
+            f"\"analyst_price_targets\": analyst price target changes over the last week and the last 6 months in 50 words or less. "
+            f"Use null for anything you cannot find. Critical: respond with the JSON object only, no other text."
+        )
+        
+        try:
+            logger.debug(f"Requesting company dossier for {company_name}")
+            
+            response = self.session.post(
+                f"{self.BASE_URL}/chat/completions",
+                json={
+                    "model": "sonar-pro",
+                    "messages": [
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    "temperature": 0.1,
+                    "max_tokens": 900
+                },
+                timeout=30,
+                cache_class='llm_analysis'
+            )
+            
+            response.raise_for_status()
+            data = response.json()
+            
+            # Extract the JSON object from response
+            if 'choices' in data and len(data['choices']) > 0:
+                content = data['choices'][0]['message']['content'].strip()
+                dossier = parse_company_dossier(content)
+                if dossier is None:
+                    logger.warning(f"Could not parse company dossier for {company_name}")
+                else:
+                    logger.debug(f"Got company dossier for {company_name}")
+                return dossier
+            else:
+                logger.warning(f"No company dossier in response for {company_name}")
+                return None
+        
+        except Timeout:
+            logger.warning(f"Timeout getting company dossier for {company_name}")
+            raise RequestException("timeout")
+        
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 429:
+                logger.warning(f"Rate limit hit for {company_name}")
+                raise RequestException("rate limit")
+            else:
+                logger.error(f"HTTP error for {company_name}: {e}")
+                if e.response.text:
+                    logger.error(f"Response body: {e.response.text}")
+                raise RequestException(f"HTTP {e.response.status_code}")
+        
+        except Exception as e:
+            logger.error(f"Unexpected error getting company dossier for {company_name}: {e}")
+            raise RequestException(str(e))
+    
+    def get_dossiers_batch(self, company_names: list, 
+                           progress_callback: Optional[Callable] = None,
+                           delay: float = 0.0) -> dict:
+        """Get company dossiers for multiple companies with rate limiting.
+        
+        Args:
+            company_names: List of company names
+            progress_callback: Optional callback for progress updates
+            delay: Optional extra delay between requests in seconds; pacing
+                   normally comes from the shared Perplexity rate limiter
+        
+        Returns:
+            Dictionary mapping company names to dossiers
+        """
+        results = {}
+        successful = 0
+        
+        for i, company in enumerate(company_names):
+            if i > 0 and delay > 0:
+                time.sleep(delay)
+            
+            try:
+                dossier = self.get_company_dossier(company)
+                results[company] = dossier
+                if dossier is not None:
+                    successful += 1
+                    if progress_callback:
+                        progress_callback(company, True, "dossier")
+                else:
+                    if progress_callback:
+                        progress_callback(company, False, "No data returned")
+            
+            except RequestException as e:
+                results[company] = None
+                error_msg = str(e)
+                if progress_callback:
+                    progress_callback(company, False, error_msg)
+                logger.warning(f"Failed to get company dossier for {company}: {error_msg}")
+        
+        logger.info(f"Successfully fetched company dossiers for {successful}/{len(company_names)} companies")
+        return results, successful
+    
     def get_revenue_projection_2030(self, company_name: str) -> Optional[str]:
         """Get revenue growth projection for 2030.
         
@@ -730,7 +1178,8 @@ class PerplexityClient:
                     "temperature": 0.1,
                     "max_tokens": 200
                 },
-                timeout=20
+                timeout=20,
+                cache_class='llm_analysis'
             )
             
             response.raise_for_status()
@@ -770,13 +1219,14 @@ class PerplexityClient:
     
     def get_revenue_projection_2030_batch(self, company_names: list, 
                                           progress_callback: Optional[Callable] = None,
-                                          delay: float = 0.5) -> dict:
+                                          delay: float = 0.0) -> dict:
         """Get revenue projections for 2030 for multiple companies with rate limiting.
         
         Args:
             company_names: List of company names
             progress_callback: Optional callback for progress updates
-            delay: Delay between requests in seconds
+            delay: Optional extra delay between requests in seconds; pacing
+                   normally comes from the shared Perplexity rate limiter
             
         Returns:
             Dictionary mapping company names to revenue projections
@@ -785,8 +1235,8 @@ class PerplexityClient:
         successful = 0
         
         for i, company in enumerate(company_names):
-            if i > 0:
-                time.sleep(delay)  # Rate limiting
+            if i > 0 and delay > 0:
+                time.sleep(delay)
             
             try:
                 projection = self.get_revenue_projection_2030(company)
@@ -809,14 +1259,18 @@ class PerplexityClient:
         logger.info(f"Successfully fetched revenue projections 2030 for {successful}/{len(company_names)} companies")
         return results, successful
     
-    def get_investment_evaluation(self, company_name: str) -> Optional[str]:
+    def get_investment_evaluation(self, company_name: str, stream: Optional[bool] = None,
+                                  on_chunk: Optional[Callable[[str], None]] = None) -> Optional[str]:
         """Get comprehensive investment evaluation using the 20-point framework.
         
         Args:
             company_name: Name of the company
+            stream: Stream the response (default: the client's stream setting)
+            on_chunk: Optional callback receiving streamed content fragments
             
         Returns:
-            Investment evaluation with scores and analysis or None if error
+            Investment evaluation with scores and analysis (possibly truncated
+            if a streamed response hit the deadline) or None if error
         """
         prompt = f"""Complete Investment Evaluation Framework for {company_name}
 
@@ -1110,43 +1564,62 @@ RED FLAGS THAT CAP SCORES:
 - No path to profitability after 10 years: Cap at 50/100
 """
         
+        payload = {
+            "model": "sonar-reasoning-pro",
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "temperature": 0.1,
+            "max_tokens": 20000
+        }
+        
         try:
             logger.debug(f"Requesting investment evaluation for {company_name}")
             
-            response = self.session.post(
-                f"{self.BASE_URL}/chat/completions",
-                json={
-                    "model": "sonar-reasoning-pro",
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "temperature": 0.1,
-                    "max_tokens": 20000
-                },
-                timeout=300
-            )
-            
-            response.raise_for_status()
-            data = response.json()
+            complete = True
+            if self.stream if stream is None else stream:
+                evaluation, complete = self._stream_completion(
+                    payload, self.stream_deadline, on_chunk=on_chunk, cache_class='llm_analysis'
+                )
+            else:
+                response = self.session.post(
+                    f"{self.BASE_URL}/chat/completions",
+                    json=payload,
+                    timeout=300,
+                    cache_class='llm_analysis'
+                )
+                
+                response.raise_for_status()
+                data = response.json()
+                
+                evaluation = None
+                if 'choices' in data and len(data['choices']) > 0:
+                    evaluation = data['choices'][0]['message']['content']
             
             # Extract evaluation from response
-            if 'choices' in data and len(data['choices']) > 0:
-                evaluation = data['choices'][0]['message']['content'].strip()
-                # Remove think tags and their content
+            if evaluation:
+                evaluation = evaluation.strip()
+                # Remove think tags and their content (a truncated stream may end inside one)
                 import re
-                evaluation = re.sub(r'<think>.*?</think>', '', evaluation, flags=re.DOTALL).strip()
+                evaluation = re.sub(r'<think>.*?(?:</think>|$)', '', evaluation, flags=re.DOTALL).strip()
                 # Remove citation markers
                 evaluation = re.sub(r'\[\d+\]|\[\d*$', '', evaluation).strip()
                 # Clean markdown formatting
                 evaluation = clean_markdown(evaluation)
-                logger.debug(f"Got investment evaluation for {company_name}")
-                return evaluation
-            else:
+            
+            if not evaluation:
                 logger.warning(f"No investment evaluation in response for {company_name}")
                 return None
+            
+            if not complete:
+                logger.warning(f"Investment evaluation for {company_name} is incomplete")
+                evaluation += "\n\n[Evaluation truncated: response did not finish in time]"
+            
+            logger.debug(f"Got investment evaluation for {company_name}")
+            return evaluation
                 
         except Timeout:
             logger.warning(f"Timeout getting investment evaluation for {company_name}")
@@ -1168,13 +1641,14 @@ RED FLAGS THAT CAP SCORES:
     
     def get_investment_evaluation_batch(self, company_names: list, 
                                         progress_callback: Optional[Callable] = None,
-                                        delay: float = 0.5) -> dict:
+                                        delay: float = 0.0) -> dict:
         """Get investment evaluations for multiple companies with rate limiting.
         
         Args:
             company_names: List of company names
             progress_callback: Optional callback for progress updates
-            delay: Delay between requests in seconds
+            delay: Optional extra delay between requests in seconds; pacing
+                   normally comes from the shared Perplexity rate limiter
             
         Returns:
             Dictionary mapping company names to investment evaluations
@@ -1183,8 +1657,8 @@ RED FLAGS THAT CAP SCORES:
         successful = 0
         
         for i, company in enumerate(company_names):
-            if i > 0:
-                time.sleep(delay)  # Rate limiting
+            if i > 0 and delay > 0:
+                time.sleep(delay)
             
             try:
                 evaluation = self.get_investment_evaluation(company)
@@ -1211,39 +1685,63 @@ RED FLAGS THAT CAP SCORES:
         """Context manager entry."""
         return self
     
-    def get_deep_research(self, prompt: str, max_retries: int = 3) -> Optional[str]:
+    def get_deep_research(self, prompt: str, max_retries: int = 3, stream: Optional[bool] = None,
+                          on_chunk: Optional[Callable[[str], None]] = None,
+                          deadline: float = 600) -> Optional[str]:
         """Generate deep research using sonar-deep-research model.
         
         Args:
             prompt: Research prompt
             max_retries: Maximum number of retry attempts
+            stream: Stream the response (default: the client's stream setting)
+            on_chunk: Optional callback receiving streamed content fragments
+            deadline: Maximum seconds to read a streamed response before keeping
+                      the partial report
             
         Returns:
             Deep research report or None if error
         """
+        payload = {
+            "model": "sonar-deep-research",
+            "messages": [
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "temperature": 0.1,
+            "max_tokens": 4000  # Deep research needs more tokens
+        }
+        
         for attempt in range(max_retries):
             try:
                 if attempt > 0:
                     retry_delay = 30 * (attempt + 1)  # 60, 90, 120 seconds
                     logger.info(f"Retrying deep research after {retry_delay}s (attempt {attempt + 1}/{max_retries})")
+                    get_metrics().record_retry('perplexity')
                     time.sleep(retry_delay)
                 
                 logger.debug(f"Requesting deep research (attempt {attempt + 1}/{max_retries})")
                 
+                if self.stream if stream is None else stream:
+                    research, complete = self._stream_completion(
+                        payload, deadline, on_chunk=on_chunk, cache_class='llm_research'
+                    )
+                    if not research:
+                        logger.warning("No research in response")
+                        return None
+                    research = research.strip()
+                    if not complete:
+                        # Keep the partial report rather than starting over
+                        logger.warning(f"Deep research incomplete after streaming ({len(research)} chars)")
+                        research += "\n\n[Research truncated: response did not finish in time]"
+                    return research
+                
                 response = self.session.post(
                     f"{self.BASE_URL}/chat/completions",
-                    json={
-                        "model": "sonar-deep-research",
-                        "messages": [
-                            {
-                                "role": "user",
-                                "content": prompt
-                            }
-                        ],
-                        "temperature": 0.1,
-                        "max_tokens": 4000  # Deep research needs more tokens
-                    },
-                    timeout=600  # Deep research can take up to 10 minutes
+                    json=payload,
+                    timeout=600,  # Deep research can take up to 10 minutes
+                    cache_class='llm_research'
                 )
                 
                 response.raise_for_status()
@@ -1364,4 +1862,265 @@ RED FLAGS THAT CAP SCORES:
             self.session.close()
         except Exception as e:
             # Ignore errors during cleanup
-            logger.debug(f"Session cleanup error (non-critical): {e}")
\ No newline at end of file
+            logger.debug(f"Session cleanup error (non-critical): {e}")
+
+
+class AsyncPerplexityClient:
+    """Asyncio client that runs Perplexity batch requests concurrently.
+    
+    Requests reuse PerplexityClient's session (so caching and the shared
+    Perplexity rate limiter still apply) and run on a worker pool. A single
+    semaphore bounds the number of requests in flight across every batch
+    started from this client, so several batches can be gathered at once.
+    Clients running at the same time (e.g. in different pipeline stages) can
+    also share a threading semaphore that bounds their requests together.
+    """
+    
+    # Batch method name -> (PerplexityClient method, progress data type, failure message, log label)
+    BATCH_METHODS = {
+        'get_descriptions_batch': ('get_company_description', None, "No data returned", "descriptions"),
+        'get_growth_rates_batch': ('get_company_growth_rate', "growth", "No data returned", "growth rates"),
+        'get_ps_ratios_batch': ('get_ps_ratio', "ps_ratio", "No data returned", "P/S ratios"),
+        'get_technical_companies_batch': ('is_technical_company', "technical_check", "Unclear response", "technical checks"),
+        'get_earnings_guidance_batch': ('get_earnings_guidance', "earnings_guidance", "No data returned", "earnings guidance"),
+        'get_analyst_price_targets_batch': ('get_analyst_price_targets', "analyst_price_targets", "No data returned", "analyst price targets"),
+        'get_revenue_projection_2030_batch': ('get_revenue_projection_2030', "revenue_projection_2030", "No data returned", "revenue projections 2030"),
+        'get_investment_evaluation_batch': ('get_investment_evaluation', "investment_evaluation", "No data returned", "investment evaluations"),
+        'get_dossiers_batch': ('get_company_dossier', "dossier", "No data returned", "company dossiers"),
+    }
+    
+    def __init__(self, api_key: str, cache: Optional[ResponseCache] = None,
+                 max_concurrency: int = 4, technical_batch_size: int = 10,
+                 stream: bool = False, stream_deadline: float = 300,
+                 base_url: Optional[str] = None,
+                 request_slots: Optional[threading.Semaphore] = None):
+        """Initialize the async client.
+        
+        Args:
+            api_key: Perplexity API key
+            cache: Optional response cache for completions
+            max_concurrency: Maximum number of requests in flight
+            technical_batch_size: Companies per request in get_technical_companies_batched
+            stream: Stream long investment evaluation responses
+            stream_deadline: Maximum seconds to read a streamed response
+            base_url: API base URL override
+            request_slots: Optional semaphore shared with other clients; each
+                           request holds a slot while it runs
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.request_slots = request_slots
+        self.technical_batch_size = max(1, technical_batch_size)
+        self.client = PerplexityClient(api_key, cache=cache, stream=stream,
+                                       stream_deadline=stream_deadline, base_url=base_url)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    async def _call(self, method_name: str, *args):
+        """Run a blocking PerplexityClient method on the worker pool under the semaphore."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        method = getattr(self.client, method_name)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._run_in_slot, method, *args)
+    
+    def _run_in_slot(self, method: Callable, *args):
+        """Call a blocking method on a worker thread, holding a shared request slot if any."""
+        if self.request_slots is None:
+            return method(*args)
+        with self.request_slots:
+            return method(*args)
+    
+    async def _run_batch(self, batch_name: str, company_names: list,
+                         progress_callback: Optional[Callable] = None) -> Tuple[dict, int]:
+        """Run one PerplexityClient method for every company concurrently.
+        
+        Args:
+            batch_name: Key into BATCH_METHODS
+            company_names: List of company names
+            progress_callback: Optional callback for progress updates
+        
+        Returns:
+            Tuple of (dictionary mapping company names to results, success count)
+        """
+        method_name, data_type, failure_message, label = self.BATCH_METHODS[batch_name]
+        
+        async def run_one(company):
+            try:
+                value = await self._call(method_name, company)
+            except RequestException as e:
+                error_msg = str(e)
+                if progress_callback:
+                    progress_callback(company, False, error_msg)
+                logger.warning(f"Failed to get {label} for {company}: {error_msg}")
+                return None
+            
+            if progress_callback:
+                if value is None:
+                    progress_callback(company, False, failure_message)
+                elif data_type:
+                    progress_callback(company, True, data_type)
+                else:
+                    progress_callback(company, True)
+            return value
+        
+        values = await asyncio.gather(*(run_one(company) for company in company_names))
+        results = dict(zip(company_names, values))
+        successful = sum(1 for value in values if value is not None)
+        
+        logger.info(f"Successfully fetched {label} for {successful}/{len(company_names)} companies")
+        return results, successful
+    
+    async def get_descriptions_batch(self, company_names: list,
+                                     progress_callback: Optional[Callable] = None) -> Tuple[dict, int]:
+        """Get descriptions for multiple companies concurrently."""
+        return await self._run_batch('get_descriptions_batch', company_names, progress_callback)
+    
+    async def get_growth_rates_batch(self, company_names: list,
+                                     progress_callback: Optional[Callable] = None) -> Tuple[dict, int]:
+        """Get growth rates for multiple companies concurrently."""
+        return await self._run_batch('get_growth_rates_batch', company_names, progress_callback)
+    
+    async def get_ps_ratios_batch(self, company_names: list,
+                                  progress_callback: Optional[Callable] = None) -> Tuple[dict, int]:
+        """Get P/S ratios for multiple companies concurrently."""
+        return await self._run_batch('get_ps_ratios_batch', company_names, progress_callback)
+    
+    async def get_technical_companies_batch(self, company_names: list,
+                                            progress_callback: Optional[Callable] = None) -> Tuple[dict, int]:
+        """Check if multiple companies are technical/engineering-heavy concurrently."""
+        return await self._run_batch('get_technical_companies_batch', company_names, progress_callback)
+    
+    async def get_technical_companies_batched(self, company_names: list,
+                                              progress_callback: Optional[Callable] = None) -> Tuple[dict, int]:
+        """Check technical nature with several companies per request.
+        
+        Companies are classified technical_batch_size at a time; any company
+        missing from a reply (or from a failed request) is re-asked individually.
+        
+        Args:
+            company_names: List of company names
+            progress_callback: Optional callback for progress updates
+        
+        Returns:
+            Tuple of (dictionary mapping company names to results, success count)
+        """
+        size = self.technical_batch_size
+        chunks = [company_names[i:i + size] for i in range(0, len(company_names), size)]
+        
+        async def classify(chunk):
+            try:
+                return await self._call('classify_technical_companies', chunk)
+            except RequestException as e:
+                logger.warning(f"Batched technical check failed for {len(chunk)} companies: {e}")
+                return {}
+        
+        answers = {}
+        for chunk_answers in await asyncio.gather(*(classify(chunk) for chunk in chunks)):
+            answers.update(chunk_answers)
+        
+        if progress_callback:
+            for company in company_names:
+                if company in answers:
+                    progress_callback(company, True, "technical_check")
+        
+        missing = [company for company in company_names if company not in answers]
+        if missing:
+            logger.info(f"Re-checking {len(missing)} companies missing from batched technical replies")
+            retried, _ = await self._run_batch('get_technical_companies_batch', missing, progress_callback)
+            answers.update(retried)
+        
+        results = {company: answers.get(company) for company in company_names}
+        successful = sum(1 for value in results.values() if value is not None)
+        
+        logger.info(f"Successfully fetched technical checks for {successful}/{len(company_names)} companies")
+        return results, successful
+    
+    async def get_earnings_guidance_batch(self, company_names: list,
+                                          progress_callback: Optional[Callable] = None) -> Tuple[dict, int]:
+        """Get earnings guidance for multiple companies concurrently."""
+        return await self._run_batch('get_earnings_guidance_batch', company_names, progress_callback)
+    
+    async def get_analyst_price_targets_batch(self, company_names: list,
+                                              progress_callback: Optional[Callable] = None) -> Tuple[dict, int]:
+        """Get analyst price targets for multiple companies concurrently."""
+        return await self._run_batch('get_analyst_price_targets_batch', company_names, progress_callback)
+    
+    async def get_revenue_projection_2030_batch(self, company_names: list,
+                                                progress_callback: Optional[Callable] = None) -> Tuple[dict, int]:
+        """Get revenue projections for 2030 for multiple companies concurrently."""
+        return await self._run_batch('get_revenue_projection_2030_batch', company_names, progress_callback)
+    
+    async def get_investment_evaluation_batch(self, company_names: list,
+                                              progress_callback: Optional[Callable] = None) -> Tuple[dict, int]:
+        """Get investment evaluations for multiple companies concurrently."""
+        return await self._run_batch('get_investment_evaluation_batch', company_names, progress_callback)
+    
+    async def get_dossiers_batch(self, company_names: list,
+                                 progress_callback: Optional[Callable] = None) -> Tuple[dict, int]:
+        """Get company dossiers for multiple companies concurrently."""
+        return await self._run_batch('get_dossiers_batch', company_names, progress_callback)
+    
+    async def close(self) -> None:
+        """Shut down the worker pool and close the underlying session."""
+        self._executor.shutdown(wait=False)
+        self.client.__exit__(None, None, None)
+    
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit - release the worker pool and session."""
+        await self.close()
+
+
+def run_batches(api_key: str, company_names: list, batch_names: List[str],
+                progress_callback: Optional[Callable] = None,
+                cache: Optional[ResponseCache] = None,
+                max_concurrency: int = 4, **client_options) -> List[Tuple[dict, int]]:
+    """Run several AsyncPerplexityClient batches concurrently from synchronous code.
+    
+    Args:
+        api_key: Perplexity API key
+        company_names: List of company names
+        batch_names: Batch method names (keys of AsyncPerplexityClient.BATCH_METHODS)
+        progress_callback: Optional callback for progress updates
+        cache: Optional response cache for completions
+        max_concurrency: Maximum number of requests in flight across all batches
+        **client_options: Extra AsyncPerplexityClient options (e.g. technical_batch_size, stream)
+    
+    Returns:
+        List of (results, successful) tuples in the order of batch_names
+    """
+    jobs = [(name, company_names) for name in batch_names]
+    return run_batch_jobs(api_key, jobs, progress_callback, cache, max_concurrency, **client_options)
+
+
+def run_batch_jobs(api_key: str, jobs: List[Tuple[str, list]],
+                   progress_callback: Optional[Callable] = None,
+                   cache: Optional[ResponseCache] = None,
+                   max_concurrency: int = 4, **client_options) -> List[Tuple[dict, int]]:
+    """Run batches over different company lists concurrently from synchronous code.
+    
+    Args:
+        api_key: Perplexity API key
+        jobs: List of (batch method name, company names) pairs
+        progress_callback: Optional callback for progress updates
+        cache: Optional response cache for completions
+        max_concurrency: Maximum number of requests in flight across all batches
+        **client_options: Extra AsyncPerplexityClient options (e.g. technical_batch_size, stream)
+    
+    Returns:
+        List of (results, successful) tuples in the order of jobs
+    """
+    async def run_all():
+        async with AsyncPerplexityClient(api_key, cache=cache, max_concurrency=max_concurrency,
+                                         **client_options) as client:
+            return await asyncio.gather(*(
+                getattr(client, name)(names, progress_callback=progress_callback)
+                for name, names in jobs
+            ))
+    
+    return list(asyncio.run(run_all()))
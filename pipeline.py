@@ -0,0 +1,225 @@
+"""Small DAG executor that streams items through concurrent stages."""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+logger = logging.getLogger(__name__)
+
+_CLOSED = object()
+
+
+class Stage:
+    """A pipeline step that processes items and passes on the ones that survive.
+    
+    A stage's function takes a list of items and returns the items to hand to
+    the stages that depend on it (enriched in place, filtered, or new items).
+    Stages without dependencies receive the items the pipeline is run with; a
+    stage with several dependencies receives an item once every one of them has
+    passed it on.
+    """
+    
+    def __init__(self, name: str, func: Callable[[List[Any]], List[Any]],
+                 after: Sequence[str] = (), batch_size: Optional[int] = None,
+                 workers: int = 1):
+        """Define a stage.
+        
+        Args:
+            name: Unique stage name
+            func: Function mapping a batch of items to the items that pass
+            after: Names of the stages whose output this stage consumes
+            batch_size: Items per call; items are processed as soon as they
+                        arrive (None waits for all items and makes one call)
+            workers: Maximum concurrent calls of func
+        """
+        self.name = name
+        self.func = func
+        self.after = list(after)
+        self.batch_size = batch_size
+        self.workers = max(1, workers)
+
+
+class Pipeline:
+    """Runs a DAG of stages, overlapping independent stages and items.
+    
+    Every stage runs on its own thread with a queue of incoming items. Batched
+    stages start work as soon as an item arrives, so an item moves on to the
+    next stage the moment it passes the current one, and stages that don't
+    depend on each other run side by side.
+    """
+    
+    def __init__(self, stages: List[Stage]):
+        """Validate and wire up the stages.
+        
+        Args:
+            stages: Stages in any order
+        
+        Raises:
+            ValueError: On duplicate names, unknown dependencies or cycles
+        """
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate pipeline stage: {stage.name}")
+            self.stages[stage.name] = stage
+        
+        self.downstream: Dict[str, List[str]] = {name: [] for name in self.stages}
+        for stage in stages:
+            for dependency in stage.after:
+                if dependency not in self.stages:
+                    raise ValueError(f"Stage {stage.name} depends on unknown stage {dependency}")
+                self.downstream[dependency].append(stage.name)
+        
+        self._check_acyclic()
+        self.stats: Dict[str, Dict[str, float]] = {}
+    
+    def _check_acyclic(self) -> None:
+        """Raise ValueError if the stage dependencies contain a cycle."""
+        remaining = {name: len(stage.after) for name, stage in self.stages.items()}
+        ready = [name for name, count in remaining.items() if count == 0]
+        visited = 0
+        while ready:
+            name = ready.pop()
+            visited += 1
+            for child in self.downstream[name]:
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    ready.append(child)
+        if visited != len(self.stages):
+            raise ValueError("Pipeline stages contain a dependency cycle")
+    
+    def run(self, items: Optional[List[Any]] = None) -> Dict[str, List[Any]]:
+        """Run the pipeline to completion.
+        
+        Args:
+            items: Items given to the stages without dependencies
+        
+        Returns:
+            Dictionary mapping each stage that nothing depends on to its output
+            items, in the order they finished
+        
+        Raises:
+            Exception: The first error raised by a stage, after all stages stop
+        """
+        self._lock = threading.Lock()
+        self._queues = {name: queue.Queue() for name in self.stages}
+        self._open_inputs = {name: len(stage.after) for name, stage in self.stages.items()}
+        self._arrivals: Dict[str, Dict[int, int]] = {name: {} for name in self.stages}
+        self._outputs: Dict[str, List[Any]] = {
+            name: [] for name, children in self.downstream.items() if not children
+        }
+        self._errors: List[BaseException] = []
+        self.stats = {name: {'in': 0, 'out': 0, 'seconds': 0.0} for name in self.stages}
+        
+        for name, stage in self.stages.items():
+            if not stage.after:
+                for item in items or []:
+                    self._queues[name].put(item)
+                self._queues[name].put(_CLOSED)
+        
+        threads = [
+            threading.Thread(target=self._run_stage, args=(stage,), name=f"pipeline-{name}", daemon=True)
+            for name, stage in self.stages.items()
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        for name, stats in self.stats.items():
+            logger.info(f"Stage {name}: {int(stats['in'])} in, {int(stats['out'])} out, "
+                        f"{stats['seconds']:.1f}s busy")
+        
+        if self._errors:
+            raise self._errors[0]
+        return self._outputs
+    
+    def _run_stage(self, stage: Stage) -> None:
+        """Feed a stage's incoming items to its function until its inputs close."""
+        inbox = self._queues[stage.name]
+        
+        if stage.batch_size is None:
+            batch = []
+            while True:
+                item = inbox.get()
+                if item is _CLOSED:
+                    break
+                batch.append(item)
+            # Root stages run once even without items (e.g. to fetch the first items)
+            if batch or not stage.after:
+                self._process(stage, batch)
+        else:
+            with ThreadPoolExecutor(max_workers=stage.workers) as executor:
+                futures = []
+                closed = False
+                while not closed:
+                    item = inbox.get()
+                    if item is _CLOSED:
+                        break
+                    batch = [item]
+                    while len(batch) < stage.batch_size:
+                        try:
+                            item = inbox.get_nowait()
+                        except queue.Empty:
+                            break
+                        if item is _CLOSED:
+                            closed = True
+                            break
+                        batch.append(item)
+                    futures.append(executor.submit(self._process, stage, batch))
+                wait(futures)
+        
+        for child in self.downstream[stage.name]:
+            self._close_input(child)
+    
+    def _process(self, stage: Stage, batch: List[Any]) -> None:
+        """Run a stage on one batch and pass on the items that survive."""
+        if self._errors:
+            return
+        
+        started = time.perf_counter()
+        try:
+            passed = stage.func(batch) or []
+        except Exception as e:
+            logger.error(f"Pipeline stage {stage.name} failed: {e}")
+            with self._lock:
+                self._errors.append(e)
+            return
+        finally:
+            with self._lock:
+                stats = self.stats[stage.name]
+                stats['in'] += len(batch)
+                stats['seconds'] += time.perf_counter() - started
+        
+        with self._lock:
+            self.stats[stage.name]['out'] += len(passed)
+            if stage.name in self._outputs:
+                self._outputs[stage.name].extend(passed)
+        
+        for child in self.downstream[stage.name]:
+            for item in passed:
+                self._deliver(child, item)
+    
+    def _deliver(self, name: str, item: Any) -> None:
+        """Queue an item for a stage once all of the stage's dependencies have passed it."""
+        needed = len(self.stages[name].after)
+        if needed > 1:
+            with self._lock:
+                arrivals = self._arrivals[name]
+                arrivals[id(item)] = arrivals.get(id(item), 0) + 1
+                if arrivals[id(item)] < needed:
+                    return
+                del arrivals[id(item)]
+        self._queues[name].put(item)
+    
+    def _close_input(self, name: str) -> None:
+        """Record that one of a stage's dependencies has finished."""
+        with self._lock:
+            self._open_inputs[name] -= 1
+            if self._open_inputs[name] > 0:
+                return
+        self._queues[name].put(_CLOSED)
@@ -1,46 +1,114 @@
 """Polygon API client for fetching analyst ratings and price targets."""
 
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
-from polygon import RESTClient
-from polygon.exceptions import BadResponse, AuthError
+
+from rate_limiter import get_limiter
+from instrumentation import instrument_pool_manager
 
 logger = logging.getLogger(__name__)
 
 
+def parse_rating_date(rating: Any) -> Optional[datetime]:
+    """Get the date of a Benzinga rating as a datetime.
+    
+    Args:
+        rating: Rating object from the Polygon API
+    
+    Returns:
+        Rating date, or None if missing or unparseable
+    """
+    value = getattr(rating, 'date', None)
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            return datetime.strptime(value[:10], "%Y-%m-%d")
+        except ValueError:
+            return None
+    return value
+
+
 class PolygonClient:
     """Client for interacting with Polygon API for analyst data."""
     
-    def __init__(self, api_key: str):
+    # Days of history pulled the first time a ticker is synced into the ratings
+    # store, and the window consensus is computed from (the 90-day point plus
+    # its 180-day lookback)
+    HISTORY_DAYS = 365
+    CONSENSUS_WINDOW_DAYS = 270
+    
+    def __init__(self, api_key: str, max_workers: int = 8, ratings_store=None,
+                 base_url: Optional[str] = None):
         """Initialize the Polygon API client.
         
         Args:
             api_key: Polygon API key
+            max_workers: Maximum concurrent requests in batch methods
+            ratings_store: Optional RatingsStore; when given, ratings are synced
+                           incrementally into it and read back locally
+            base_url: API base URL override (e.g. a local stand-in server)
         """
         self.api_key = api_key
-        self.client = RESTClient(api_key)
+        self.max_workers = max(1, max_workers)
+        self.ratings_store = ratings_store
+        self.base_url = base_url
+        self.limiter = get_limiter('polygon')
+        self._client = None
+        self._client_lock = threading.Lock()
     
-    def fetch_analyst_ratings(self, ticker: str, limit: int = 50) -> List[Any]:
+    @property
+    def client(self):
+        """Polygon SDK client, created on first use.
+        
+        Importing the SDK takes a noticeable part of a second, so it is only
+        loaded once a request actually has to go to Polygon (reads answered by
+        the ratings store never load it).
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from polygon import RESTClient
+                    
+                    if self.base_url:
+                        client = RESTClient(self.api_key, base=self.base_url.rstrip('/'))
+                    else:
+                        client = RESTClient(self.api_key)
+                    # urllib3 keeps one connection per host by default; size the shared
+                    # pool so concurrent workers reuse connections instead of discarding them
+                    client.client.connection_pool_kw['maxsize'] = self.max_workers
+                    instrument_pool_manager(client.client, 'polygon')
+                    self._client = client
+        return self._client
+    
+    def fetch_analyst_ratings(self, ticker: str, limit: int = 50,
+                              since: Optional[datetime] = None,
+                              until: Optional[datetime] = None) -> List[Any]:
         """Fetch analyst ratings and price targets for a ticker.
         
         Args:
             ticker: Stock ticker symbol
-            limit: Maximum number of results to fetch
+            limit: Number of results per page
+            since: Only return ratings dated on or after this day. The request
+                   is filtered server-side with date.gte, and iteration stops at
+                   the first older rating so no further pages are fetched.
+            until: Only return ratings dated on or before this day (date.lte)
         
         Returns:
-            List of analyst ratings
+            List of analyst ratings, newest first
         """
         logger.debug(f"Fetching analyst ratings for {ticker} from Polygon")
+        from polygon.exceptions import BadResponse, AuthError
+        
+        filters = {'ticker': ticker}
+        if until is not None:
+            filters['date_lte'] = until.strftime("%Y-%m-%d")
         
-        ratings = []
         try:
-            for rating in self.client.list_benzinga_ratings(
-                ticker=ticker,
-                limit=limit,
-                sort="date.desc"
-            ):
-                ratings.append(rating)
+            ratings = self._list_ratings(limit, since, **filters)
         except (BadResponse, AuthError) as e:
             logger.error(f"Error fetching Polygon ratings for {ticker}: {e}")
             return []
@@ -51,11 +119,96 @@ class PolygonClient:
         logger.debug(f"Found {len(ratings)} analyst updates for {ticker}")
         return ratings
     
-    def calculate_price_target_consensus(self, ratings: List[Any]) -> Dict[str, Any]:
+    def sync_ratings(self, ticker: str, page_size: int = 100) -> None:
+        """Bring a ticker's ratings in the ratings store up to date.
+        
+        Only ratings on or after the ticker's high-water day are requested
+        (that day is re-read because ratings can be added to it later), and
+        tickers synced within the store's refresh interval are skipped. On
+        failure the stored ratings are left as they are.
+        
+        Args:
+            ticker: Stock ticker symbol
+            page_size: Number of results per page
+        """
+        store = self.ratings_store
+        if store.is_fresh(ticker):
+            return
+        
+        high_water, _ = store.get_cursor(ticker)
+        since = high_water or (datetime.now() - timedelta(days=self.HISTORY_DAYS)).date()
+        
+        try:
+            ratings = self._list_ratings(page_size, since, ticker=ticker)
+        except Exception as e:
+            logger.warning(f"Could not sync Polygon ratings for {ticker}, using stored ratings: {e}")
+            return
+        
+        store.add_ratings(ratings)
+        dates = [parse_rating_date(rating) for rating in ratings]
+        newest = max((d.date() for d in dates if d), default=since)
+        store.advance_cursor(ticker, max(newest, since))
+        logger.debug(f"Synced {len(ratings)} ratings for {ticker} since {since}")
+    
+    def get_ratings(self, ticker: str, since: Optional[datetime] = None, limit: int = 50) -> List[Any]:
+        """Get a ticker's analyst ratings, from the ratings store when configured.
+        
+        Args:
+            ticker: Stock ticker symbol
+            since: Only return ratings dated on or after this day
+            limit: Number of results per page when fetching from the API directly
+        
+        Returns:
+            List of analyst ratings, newest first
+        """
+        if self.ratings_store is None:
+            return self.fetch_analyst_ratings(ticker, limit=limit, since=since)
+        
+        self.sync_ratings(ticker)
+        return self.ratings_store.query(ticker, since=since)
+    
+    def _list_ratings(self, limit: int, since: Optional[datetime] = None, **filters) -> List[Any]:
+        """List Benzinga ratings newest first, optionally bounded by date.
+        
+        Args:
+            limit: Number of results per page
+            since: Only return ratings dated on or after this day
+            **filters: Extra list_benzinga_ratings filters (ticker, ticker_any_of, ...)
+        
+        Returns:
+            List of analyst ratings
+        """
+        since_day = None
+        if since is not None:
+            since_day = since.date() if isinstance(since, datetime) else since
+            filters['date_gte'] = since_day.strftime("%Y-%m-%d")
+        
+        ratings = []
+        # The SDK fetches a new page every `limit` results, so take a
+        # rate limiter token before each page
+        self.limiter.acquire()
+        for rating in self.client.list_benzinga_ratings(
+            limit=limit,
+            sort="date.desc",
+            **filters
+        ):
+            if since_day is not None:
+                rating_date = parse_rating_date(rating)
+                if rating_date is not None and rating_date.date() < since_day:
+                    break
+            ratings.append(rating)
+            if len(ratings) % limit == 0:
+                self.limiter.acquire()
+        
+        return ratings
+    
+    def calculate_price_target_consensus(self, ratings: List[Any],
+                                         as_of: Optional[datetime] = None) -> Dict[str, Any]:
         """Calculate consensus price targets and trends from analyst ratings.
         
         Args:
             ratings: List of analyst ratings from Polygon API
+            as_of: Calculate as of this past moment, ignoring later ratings (default: now)
         
         Returns:
             Dictionary with consensus data and trends
@@ -95,7 +248,7 @@ class PolygonClient:
             return None
         
         # Group ratings by timeframe
-        today = datetime.now()
+        today = as_of or datetime.now()
         recent_actions = []
         price_target_history = []
         all_ratings_data = []
@@ -124,6 +277,9 @@ class PolygonClient:
                 continue
             
             days_ago = (today - rating_date).days
+            if days_ago < 0:
+                # Published after the point in time being calculated
+                continue
             
             # Get analyst firm
             firm = getattr(rating, 'firm', None) or getattr(rating, 'analyst_firm', 'Unknown')
@@ -212,51 +368,121 @@ class PolygonClient:
             'price_target_history': price_target_history
         }
     
-    def get_price_targets_for_stock(self, ticker: str) -> Dict[str, Any]:
+    def get_price_targets_for_stock(self, ticker: str, as_of: Optional[datetime] = None) -> Dict[str, Any]:
         """Get comprehensive price target data for a stock.
         
         Args:
             ticker: Stock ticker symbol
+            as_of: Calculate as of this past moment from the ratings published
+                   by then (default: now)
         
         Returns:
             Dictionary with all price target data
         """
-        # Fetch ratings
-        ratings = self.fetch_analyst_ratings(ticker, limit=50)
+        # Fetch ratings (only the consensus window when they are stored locally)
+        if as_of is not None:
+            # The store only keeps HISTORY_DAYS, so past windows come from the API
+            since = as_of - timedelta(days=self.CONSENSUS_WINDOW_DAYS)
+            ratings = self.fetch_analyst_ratings(ticker, limit=50, since=since, until=as_of)
+        elif self.ratings_store is not None:
+            since = datetime.now() - timedelta(days=self.CONSENSUS_WINDOW_DAYS)
+            ratings = self.get_ratings(ticker, since=since)
+        else:
+            ratings = self.fetch_analyst_ratings(ticker, limit=50)
         
         # Calculate consensus and trends
-        consensus_data = self.calculate_price_target_consensus(ratings)
+        consensus_data = self.calculate_price_target_consensus(ratings, as_of=as_of)
         
         # Add ticker to the result
         consensus_data['ticker'] = ticker
-        consensus_data['last_updated'] = datetime.now().isoformat()
+        consensus_data['last_updated'] = (as_of or datetime.now()).isoformat()
         
         return consensus_data
     
-    def get_price_targets_batch(self, tickers: List[str]) -> Dict[str, Dict[str, Any]]:
-        """Get price targets for multiple stocks.
+    def _get_price_targets_or_error(self, ticker: str, as_of: Optional[datetime] = None) -> Dict[str, Any]:
+        """Get price target data for a stock, recording any error in the result."""
+        logger.debug(f"Processing Polygon data for {ticker}")
+        try:
+            return self.get_price_targets_for_stock(ticker, as_of)
+        except Exception as e:
+            logger.error(f"Error processing {ticker}: {e}")
+            return {
+                'ticker': ticker,
+                'current_consensus': None,
+                'error': str(e)
+            }
+    
+    def get_price_targets_batch(self, tickers: List[str],
+                                max_workers: Optional[int] = None,
+                                as_of: Optional[datetime] = None) -> Dict[str, Dict[str, Any]]:
+        """Get price targets for multiple stocks concurrently.
         
         Args:
             tickers: List of stock ticker symbols
+            max_workers: Maximum concurrent tickers (default: the client's max_workers)
+            as_of: Calculate as of this past moment (default: now)
         
         Returns:
             Dictionary mapping tickers to their price target data
         """
-        results = {}
-        
-        for ticker in tickers:
-            logger.debug(f"Processing Polygon data for {ticker}")
-            try:
-                results[ticker] = self.get_price_targets_for_stock(ticker)
-            except Exception as e:
-                logger.error(f"Error processing {ticker}: {e}")
-                results[ticker] = {
-                    'ticker': ticker,
-                    'current_consensus': None,
-                    'error': str(e)
-                }
+        workers = min(max_workers or self.max_workers, max(1, len(tickers)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(lambda ticker: self._get_price_targets_or_error(ticker, as_of), tickers)
+            return dict(zip(tickers, results))
+    
+    @staticmethod
+    def _rating_to_change(ticker: str, rating: Any, cutoff_date: datetime) -> Optional[Dict[str, Any]]:
+        """Turn a rating into a price target change record.
         
-        return results
+        Args:
+            ticker: Stock ticker symbol
+            rating: Rating object from the Polygon API
+            cutoff_date: Only accept ratings dated on or after this date
+        
+        Returns:
+            Change record, or None if the rating is too old or has no target change
+        """
+        # Check if we have required fields
+        if not getattr(rating, 'price_target', None):
+            return None
+        
+        rating_date = parse_rating_date(rating)
+        if not rating_date or rating_date < cutoff_date:
+            return None
+        
+        # Get previous price target
+        previous_target = getattr(rating, 'previous_price_target', None)
+        if not previous_target:
+            # If no previous target, skip (can't calculate change)
+            return None
+        
+        # Calculate percentage change
+        change_pct = ((rating.price_target - previous_target) / previous_target) * 100
+        
+        # Determine change type
+        if change_pct > 0.1:
+            change_type = 'Raised'
+        elif change_pct < -0.1:
+            change_type = 'Lowered'
+        else:
+            change_type = 'Reiterated'
+        
+        # Get analyst details
+        firm = getattr(rating, 'firm', None) or getattr(rating, 'analyst_firm', 'Unknown')
+        rating_value = getattr(rating, 'rating', None) or getattr(rating, 'rating_current', '')
+        action = getattr(rating, 'rating_action', None) or getattr(rating, 'action', 'Updates')
+        
+        return {
+            'ticker': ticker,
+            'date': rating_date,
+            'analyst': firm,
+            'old_target': previous_target,
+            'new_target': rating.price_target,
+            'change_pct': change_pct,
+            'change_type': change_type,
+            'rating': rating_value,
+            'action': action
+        }
     
     def get_daily_price_target_changes(self, ticker: str, cutoff_date: datetime) -> List[Dict[str, Any]]:
         """Get price target changes from the last 24 hours.
@@ -273,61 +499,13 @@ class PolygonClient:
         changes = []
         
         try:
-            # Fetch recent analyst ratings
-            ratings = self.fetch_analyst_ratings(ticker, limit=20)
+            # Fetch only the ratings on or after the cutoff day
+            ratings = self.get_ratings(ticker, since=cutoff_date, limit=20)
             
             for rating in ratings:
-                # Check if we have required fields
-                if not hasattr(rating, 'price_target') or not rating.price_target:
-                    continue
-                
-                # Parse date
-                rating_date = None
-                if hasattr(rating, 'date'):
-                    try:
-                        if isinstance(rating.date, str):
-                            rating_date = datetime.strptime(rating.date[:10], "%Y-%m-%d")
-                        else:
-                            rating_date = rating.date
-                    except:
-                        continue
-                
-                if not rating_date or rating_date < cutoff_date:
-                    continue
-                
-                # Get previous price target
-                previous_target = getattr(rating, 'previous_price_target', None)
-                if not previous_target:
-                    # If no previous target, skip (can't calculate change)
-                    continue
-                
-                # Calculate percentage change
-                change_pct = ((rating.price_target - previous_target) / previous_target) * 100
-                
-                # Determine change type
-                if change_pct > 0.1:
-                    change_type = 'Raised'
-                elif change_pct < -0.1:
-                    change_type = 'Lowered'
-                else:
-                    change_type = 'Reiterated'
-                
-                # Get analyst details
-                firm = getattr(rating, 'firm', None) or getattr(rating, 'analyst_firm', 'Unknown')
-                rating_value = getattr(rating, 'rating', None) or getattr(rating, 'rating_current', '')
-                action = getattr(rating, 'rating_action', None) or getattr(rating, 'action', 'Updates')
-                
-                changes.append({
-                    'ticker': ticker,
-                    'date': rating_date,
-                    'analyst': firm,
-                    'old_target': previous_target,
-                    'new_target': rating.price_target,
-                    'change_pct': change_pct,
-                    'change_type': change_type,
-                    'rating': rating_value,
-                    'action': action
-                })
+                change = self._rating_to_change(ticker, rating, cutoff_date)
+                if change:
+                    changes.append(change)
             
             logger.debug(f"Found {len(changes)} price target changes for {ticker} in last 24 hours")
             
@@ -336,6 +514,82 @@ class PolygonClient:
         
         return changes
     
+    def get_daily_price_target_changes_batch(self, tickers: List[str], cutoff_date: datetime,
+                                             max_workers: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Get recent price target changes for multiple stocks concurrently.
+        
+        Args:
+            tickers: List of stock ticker symbols
+            cutoff_date: Only include changes after this date
+            max_workers: Maximum concurrent tickers (default: the client's max_workers)
+        
+        Returns:
+            Dictionary mapping tickers to their lists of price target changes
+        """
+        workers = min(max_workers or self.max_workers, max(1, len(tickers)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            changes = executor.map(lambda ticker: self.get_daily_price_target_changes(ticker, cutoff_date), tickers)
+            return dict(zip(tickers, changes))
+    
+    def scan_price_target_changes(self, tickers: List[str], cutoff_date: datetime,
+                                  chunk_size: int = 0, page_size: int = 1000) -> Dict[str, List[Dict[str, Any]]]:
+        """Get recent price target changes for many tickers with a few bulk queries.
+        
+        With chunk_size 0 the ratings for the whole market since the cutoff day
+        are listed once, without a ticker filter; otherwise tickers are queried
+        chunk_size at a time with ticker.any_of. Either way the results are
+        intersected with the requested tickers in memory, so the number of
+        requests depends on the day's rating volume rather than the ticker count.
+        
+        Args:
+            tickers: List of stock ticker symbols
+            cutoff_date: Only include changes after this date
+            chunk_size: Tickers per ticker.any_of query (0 for a market-wide scan)
+            page_size: Number of results per page
+        
+        Returns:
+            Dictionary mapping every requested ticker to its list of changes
+        
+        Raises:
+            BadResponse, AuthError: If a bulk query fails (callers can fall back
+                                    to get_daily_price_target_changes_batch)
+        """
+        wanted = {ticker.upper() for ticker in tickers}
+        results = {ticker: [] for ticker in tickers}
+        by_upper = {ticker.upper(): ticker for ticker in tickers}
+        
+        if chunk_size and chunk_size > 0:
+            chunks = [sorted(wanted)[i:i + chunk_size] for i in range(0, len(wanted), chunk_size)]
+            workers = min(self.max_workers, max(1, len(chunks)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pages = executor.map(
+                    lambda chunk: self._list_ratings(page_size, cutoff_date, ticker_any_of=chunk),
+                    chunks
+                )
+                ratings = [rating for page in pages for rating in page]
+        else:
+            ratings = self._list_ratings(page_size, cutoff_date)
+        
+        if self.ratings_store is not None:
+            # Keep the watched tickers' new ratings; cursors only move on a full sync
+            self.ratings_store.add_ratings(
+                rating for rating in ratings if (getattr(rating, 'ticker', None) or '').upper() in wanted
+            )
+        
+        hits = 0
+        for rating in ratings:
+            ticker = (getattr(rating, 'ticker', None) or '').upper()
+            if ticker not in wanted:
+                continue
+            change = self._rating_to_change(by_upper[ticker], rating, cutoff_date)
+            if change:
+                results[by_upper[ticker]].append(change)
+                hits += 1
+        
+        logger.info(f"Scanned {len(ratings)} ratings; {hits} price target changes across "
+                    f"{sum(1 for changes in results.values() if changes)} watched tickers")
+        return results
+    
     def __enter__(self):
         """Context manager entry."""
         return self
@@ -17,6 +17,8 @@ from config import Config
 from polygon_client import PolygonClient
 from email_sender import EmailSender
 from api_client import FMPAPIClient
+from rate_limiter import configure_rate_limits
+from ratings_store import create_ratings_store
 
 
 # Configure logging
@@ -59,24 +61,58 @@ def load_watchlist(file_path: str = 'watchlist.txt') -> List[str]:
     return watchlist
 
 
-def get_current_price(api_client: FMPAPIClient, ticker: str) -> Optional[float]:
-    """Get current stock price.
+class QuoteResolver:
+    """Resolves current prices and company names from FMP profiles.
     
-    Args:
-        api_client: FMP API client
-        ticker: Stock ticker symbol
-        
-    Returns:
-        Current price or None if not available
+    Profiles are fetched in bulk for all tickers that need them and memoized
+    for the rest of the run, so each ticker costs at most one lookup.
     """
-    try:
-        profile = api_client.get_company_profile(ticker)
+    
+    def __init__(self, api_client: FMPAPIClient):
+        """Initialize the resolver.
+        
+        Args:
+            api_client: FMP API client
+        """
+        self.api_client = api_client
+        self._profiles: Dict[str, Optional[Dict[str, Any]]] = {}
+    
+    def prefetch(self, tickers: List[str]) -> None:
+        """Fetch profiles for all tickers not resolved yet with bulk requests.
+        
+        Args:
+            tickers: Stock ticker symbols
+        """
+        missing = [ticker for ticker in dict.fromkeys(tickers) if ticker not in self._profiles]
+        if not missing:
+            return
+        
+        try:
+            profiles = self.api_client.get_company_profiles_batch(missing)
+        except Exception as e:
+            logging.warning(f"Could not fetch profiles for {len(missing)} tickers: {e}")
+            profiles = {}
+        
+        for ticker in missing:
+            self._profiles[ticker] = profiles.get(ticker)
+    
+    def profile(self, ticker: str) -> Optional[Dict[str, Any]]:
+        """Get a ticker's profile, fetching it if it wasn't prefetched."""
+        if ticker not in self._profiles:
+            self.prefetch([ticker])
+        return self._profiles[ticker]
+    
+    def current_price(self, ticker: str) -> Optional[float]:
+        """Get the current stock price, or None if not available."""
+        profile = self.profile(ticker)
         if profile and 'price' in profile:
             return profile['price']
-    except Exception as e:
-        logging.warning(f"Could not fetch price for {ticker}: {e}")
+        return None
     
-    return None
+    def company_name(self, ticker: str) -> str:
+        """Get the company name, falling back to the ticker."""
+        profile = self.profile(ticker)
+        return profile.get('companyName', ticker) if profile else ticker
 
 
 def calculate_upside(current_price: float, target_price: float) -> float:
@@ -97,7 +133,9 @@ def calculate_upside(current_price: float, target_price: float) -> float:
 def collect_price_target_changes(
     polygon_client: PolygonClient,
     fmp_client: FMPAPIClient,
-    watchlist: List[str]
+    watchlist: List[str],
+    bulk_scan: bool = True,
+    scan_chunk_size: int = 0
 ) -> Dict[str, List[Dict[str, Any]]]:
     """Collect all price target changes from the last 24 hours.
     
@@ -105,6 +143,8 @@ def collect_price_target_changes(
         polygon_client: Polygon API client
         fmp_client: FMP API client for stock prices
         watchlist: List of tickers to monitor
+        bulk_scan: Find changes with a few cross-ticker queries instead of one per ticker
+        scan_chunk_size: Tickers per bulk query (0 scans all recent ratings at once)
         
     Returns:
         Dictionary with raises, cuts, and reiterations
@@ -119,20 +159,32 @@ def collect_price_target_changes(
     
     cutoff_date = datetime.now() - timedelta(days=1)
     
+    logger.info(f"Checking {len(watchlist)} tickers...")
+    changes_by_ticker = None
+    if bulk_scan:
+        # Only tickers that show up in the recent ratings need follow-ups
+        try:
+            changes_by_ticker = polygon_client.scan_price_target_changes(
+                watchlist, cutoff_date, chunk_size=scan_chunk_size
+            )
+        except Exception as e:
+            logger.warning(f"Bulk ratings scan failed, checking tickers individually: {e}")
+    
+    if changes_by_ticker is None:
+        # Fetch the daily changes for every ticker concurrently
+        changes_by_ticker = polygon_client.get_daily_price_target_changes_batch(watchlist, cutoff_date)
+    
+    # Look up prices and names for every ticker with changes in one pass
+    quotes = QuoteResolver(fmp_client)
+    quotes.prefetch([ticker for ticker in watchlist if changes_by_ticker.get(ticker)])
+    
     for ticker in watchlist:
-        logger.info(f"Checking {ticker}...")
-        
         try:
-            # Get daily price target changes
-            changes = polygon_client.get_daily_price_target_changes(ticker, cutoff_date)
+            changes = changes_by_ticker.get(ticker, [])
             
             if changes:
-                # Get current price for upside calculation
-                current_price = get_current_price(fmp_client, ticker)
-                
-                # Get company name
-                profile = fmp_client.get_company_profile(ticker)
-                company_name = profile.get('companyName', ticker) if profile else ticker
+                current_price = quotes.current_price(ticker)
+                company_name = quotes.company_name(ticker)
                 
                 for change in changes:
                     change['company_name'] = company_name
@@ -200,6 +252,7 @@ def main() -> None:
         # Load configuration
         config = Config()
         logger.info("Configuration loaded successfully")
+        configure_rate_limits(config)
         
         # Load watchlist
         watchlist = load_watchlist(args.watchlist)
@@ -207,13 +260,18 @@ def main() -> None:
         print(f"✓ Monitoring {len(watchlist)} stocks")
         
         # Initialize clients
-        with PolygonClient(config.polygon_api_key) as polygon_client, \
-             FMPAPIClient(config.fmp_api_key) as fmp_client:
+        ratings_store = create_ratings_store(config)
+        with PolygonClient(config.polygon_api_key, max_workers=config.polygon_max_workers,
+                           ratings_store=ratings_store,
+                           base_url=config.polygon_base_url) as polygon_client, \
+             FMPAPIClient(config.fmp_api_key, base_url=config.fmp_base_url) as fmp_client:
             
             # Collect price target changes
             print("✓ Checking for price target changes...")
             all_changes = collect_price_target_changes(
-                polygon_client, fmp_client, watchlist
+                polygon_client, fmp_client, watchlist,
+                bulk_scan=config.polygon_bulk_scan,
+                scan_chunk_size=config.polygon_scan_chunk_size
             )
             
             # Count total changes
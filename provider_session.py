@@ -0,0 +1,160 @@
+"""Shared HTTP session for data provider clients."""
+
+import json
+import logging
+import time
+from typing import Any, Optional, Callable
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from http_cache import ResponseCache, normalize_request_key
+from instrumentation import get_metrics
+from rate_limiter import TokenBucket, get_limiter
+
+
+logger = logging.getLogger(__name__)
+
+
+def is_cacheable_payload(payload: Any) -> bool:
+    """Check that a 200 response body is real data rather than an error message.
+    
+    Providers such as FMP report errors (invalid key, rate limit, unknown
+    endpoint) as {"Error Message": ...} or {"error": ...} bodies with a 200
+    status; caching those would repeat the error for the whole TTL.
+    
+    Args:
+        payload: Decoded JSON body, or the raw bytes if the body isn't JSON
+    
+    Returns:
+        True if the response may be cached
+    """
+    return not (isinstance(payload, dict) and ('Error Message' in payload or 'error' in payload))
+
+
+class ProviderSession(requests.Session):
+    """requests.Session with response caching and per-provider rate limiting.
+    
+    Requests are assigned an endpoint class either explicitly, through the
+    ``cache_class`` keyword argument, or by the session's ``classify`` callable
+    (which maps a URL to a class). Only successful responses to cacheable
+    classes are stored, and only when the ``cacheable`` predicate accepts the
+    decoded body; streaming requests always go to the network.
+    
+    Every request that reaches the network first takes a token from the
+    provider's shared rate limiter; cache hits don't. Both are recorded in
+    the run metrics.
+    """
+    
+    def __init__(self, provider: str, cache: Optional[ResponseCache] = None,
+                 classify: Optional[Callable[[str], Optional[str]]] = None,
+                 pool_maxsize: int = 10, limiter: Optional[TokenBucket] = None,
+                 cacheable: Callable[[Any], bool] = is_cacheable_payload):
+        """Initialize the session.
+        
+        Args:
+            provider: Provider name (e.g. 'fmp', 'perplexity')
+            cache: Optional response cache
+            classify: Optional callable mapping a URL to an endpoint class
+            pool_maxsize: Connection pool size per host
+            limiter: Rate limiter (default: the provider's shared limiter)
+            cacheable: Predicate deciding from the decoded body whether a 200
+                       response may be stored (default: reject error bodies)
+        """
+        super().__init__()
+        self.provider = provider
+        self.cache = cache
+        self.classify = classify
+        self.limiter = limiter or get_limiter(provider)
+        self.cacheable = cacheable
+        
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+    
+    def request(self, method, url, *args, cache_class: Optional[str] = None, **kwargs):
+        """Send a request, consulting the cache first when the endpoint class allows it."""
+        if cache_class is None and self.classify:
+            cache_class = self.classify(url)
+        
+        cacheable = (
+            self.cache is not None
+            and not kwargs.get('stream')
+            and method.upper() in ('GET', 'POST')
+            and self.cache.is_cacheable(cache_class)
+        )
+        if not cacheable:
+            return self._send_limited(method, url, *args, **kwargs)
+        
+        key = normalize_request_key(
+            method, url,
+            params=kwargs.get('params'),
+            body=kwargs.get('json', kwargs.get('data'))
+        )
+        
+        cached = self.cache.get(key, cache_class)
+        if cached is not None:
+            status, headers, body = cached
+            logger.debug(f"Cache hit ({self.provider}/{cache_class}): {method} {url.split('?')[0]}")
+            get_metrics().record_cache_hit(self.provider)
+            return self._build_response(method, url, status, headers, body)
+        
+        response = self._send_limited(method, url, *args, **kwargs)
+        
+        if response.status_code == 200:
+            try:
+                payload = json.loads(response.content)
+            except ValueError:
+                # Non-JSON bodies (e.g. CSV) are passed to the policies as they are
+                payload = response.content
+            
+            if not self.cacheable(payload):
+                logger.debug(f"Not caching error body ({self.provider}/{cache_class}): {method} {url.split('?')[0]}")
+                return response
+            
+            ttl = self.cache.ttl_for(cache_class, payload)
+            if ttl:
+                self.cache.set(
+                    key, response.status_code, dict(response.headers),
+                    response.content, ttl, endpoint_class=cache_class
+                )
+        
+        return response
+    
+    def _send_limited(self, method, url, *args, **kwargs):
+        """Wait for a rate limiter token, then send the request over the network."""
+        waited = self.limiter.acquire()
+        if waited > 0.5:
+            logger.debug(f"Waited {waited:.1f}s for {self.provider} rate limit")
+        
+        started = time.perf_counter()
+        try:
+            response = super().request(method, url, *args, **kwargs)
+        except requests.RequestException:
+            get_metrics().record_request(self.provider, None, time.perf_counter() - started,
+                                         rate_limit_wait=waited)
+            raise
+        
+        # Don't consume streamed bodies; count their declared length instead
+        if kwargs.get('stream'):
+            nbytes = int(response.headers.get('Content-Length') or 0)
+        else:
+            nbytes = len(response.content)
+        get_metrics().record_request(self.provider, response.status_code, time.perf_counter() - started,
+                                     nbytes, rate_limit_wait=waited)
+        return response
+    
+    @staticmethod
+    def _build_response(method: str, url: str, status: int, headers: dict, body: bytes) -> requests.Response:
+        """Rebuild a requests.Response from a cached entry."""
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        # Cached bodies are stored decoded, so drop any transfer encoding header
+        response.headers.pop('Content-Encoding', None)
+        response._content = body
+        response.url = url
+        response.encoding = 'utf-8'
+        response.request = requests.Request(method, url).prepare()
+        return response
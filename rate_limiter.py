@@ -0,0 +1,177 @@
+"""Token-bucket rate limiting shared per data provider."""
+
+import logging
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+# Default request rates per provider, overridable through Config
+DEFAULT_RATES = {
+    'fmp': '300/min',
+    'perplexity': '50/min',
+    'polygon': '10/s',
+}
+
+# Every accepted spelling of a rate's time unit; anything else (e.g. "ms") is rejected
+_UNIT_SECONDS = {
+    's': 1, 'sec': 1, 'secs': 1, 'second': 1, 'seconds': 1,
+    'm': 60, 'min': 60, 'mins': 60, 'minute': 60, 'minutes': 60,
+    'h': 3600, 'hr': 3600, 'hrs': 3600, 'hour': 3600, 'hours': 3600,
+}
+
+
+def parse_rate(rate: str) -> float:
+    """Parse a rate such as "300/min", "5/s" or "2.5" (per second).
+    
+    Args:
+        rate: Rate specification
+    
+    Returns:
+        Requests per second
+    
+    Raises:
+        ValueError: If the rate can't be parsed or is not positive
+    """
+    match = re.fullmatch(r'\s*([\d.]+)\s*(?:/\s*([a-z]+))?\s*', rate.lower())
+    if not match:
+        raise ValueError(f"Invalid rate: {rate!r}")
+    
+    count = float(match.group(1))
+    unit = match.group(2) or 's'
+    if unit not in _UNIT_SECONDS or count <= 0:
+        raise ValueError(f"Invalid rate: {rate!r}")
+    
+    return count / _UNIT_SECONDS[unit]
+
+
+class TokenBucket:
+    """Thread- and asyncio-safe token bucket.
+    
+    Each caller reserves a token under a short lock and then waits outside it,
+    so the time a request spends in flight counts toward the spacing instead
+    of being added on top of a fixed sleep.
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """Initialize the bucket.
+        
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum burst size (default: one second of tokens, at least 1)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _reserve(self, tokens: float = 1.0) -> float:
+        """Take tokens from the bucket, going into debt if needed.
+        
+        Returns:
+            Seconds the caller must wait before proceeding
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+    
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block the calling thread until tokens are available.
+        
+        Returns:
+            Seconds spent waiting
+        """
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens only if they are available right now.
+        
+        Returns:
+            True if the tokens were taken, False if the caller is over the rate
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+    
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """Wait without blocking the event loop until tokens are available.
+        
+        Returns:
+            Seconds spent waiting
+        """
+        # Only the async Perplexity batches need asyncio; synchronous entry points skip the import
+        import asyncio
+        
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> TokenBucket:
+    """Get the shared limiter for a provider, creating it with the default rate.
+    
+    Args:
+        provider: Provider name (e.g. 'fmp', 'perplexity', 'polygon')
+    
+    Returns:
+        TokenBucket shared by every client of that provider
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = TokenBucket(parse_rate(DEFAULT_RATES.get(provider, '10/s')))
+            _limiters[provider] = limiter
+        return limiter
+
+
+def configure_limiter(provider: str, rate: str) -> None:
+    """Set the request rate for a provider's shared limiter.
+    
+    Args:
+        provider: Provider name
+        rate: Rate specification (see parse_rate)
+    """
+    try:
+        rate_per_second = parse_rate(rate)
+    except ValueError as e:
+        logger.warning(f"{e}; keeping the current {provider} rate limit")
+        return
+    
+    limiter = get_limiter(provider)
+    with limiter._lock:
+        limiter.rate = rate_per_second
+        limiter.capacity = max(1.0, rate_per_second)
+        limiter._tokens = min(limiter._tokens, limiter.capacity)
+
+
+def configure_rate_limits(config) -> None:
+    """Apply provider rate limits from application configuration.
+    
+    Args:
+        config: Application Config instance
+    """
+    configure_limiter('fmp', config.fmp_rate_limit)
+    configure_limiter('perplexity', config.perplexity_rate_limit)
+    configure_limiter('polygon', config.polygon_rate_limit)
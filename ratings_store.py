@@ -0,0 +1,209 @@
+"""Local store of Benzinga analyst ratings with per-ticker incremental sync."""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from types import SimpleNamespace
+from typing import Any, Iterable, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class StoredRating(SimpleNamespace):
+    """A rating read back from the store, with the attributes of Polygon's BenzingaRating.
+    
+    Fields that weren't stored read as None. A plain object keeps local reads
+    from importing the Polygon SDK.
+    """
+    
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return None
+
+
+def _rating_id(rating: Any) -> str:
+    """Get a stable identifier for a rating (its Benzinga id when present)."""
+    benzinga_id = getattr(rating, 'benzinga_id', None)
+    if benzinga_id:
+        return str(benzinga_id)
+    key = '|'.join(str(getattr(rating, field, '') or '') for field in
+                   ('ticker', 'date', 'time', 'firm', 'analyst', 'price_target', 'rating_action'))
+    return 'h:' + hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _day(value) -> Optional[str]:
+    """Format a date, datetime or date string as YYYY-MM-DD."""
+    if value is None:
+        return None
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%Y-%m-%d")
+    return str(value)[:10] or None
+
+
+class RatingsStore:
+    """SQLite-backed copy of Benzinga analyst ratings.
+    
+    Ratings are kept per ticker and indexed on (ticker, date) so history
+    windows are answered locally. Each ticker has a cursor holding the newest
+    rating day seen (the high-water mark) and when it was last synced; syncs
+    only ask the API for ratings on or after the high-water day.
+    """
+    
+    def __init__(self, path: str, refresh_minutes: float = 60):
+        """Open (or create) the store database.
+        
+        Args:
+            path: SQLite database file path
+            refresh_minutes: Minutes after a sync during which a ticker is served
+                             from the store without asking the API again
+        """
+        self.path = path
+        self.refresh_seconds = refresh_minutes * 60
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS ratings (
+                id TEXT PRIMARY KEY,
+                ticker TEXT NOT NULL,
+                date TEXT NOT NULL,
+                time TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS ratings_ticker_date ON ratings (ticker, date);
+            CREATE TABLE IF NOT EXISTS sync_cursors (
+                ticker TEXT PRIMARY KEY,
+                high_water TEXT,
+                synced_at REAL
+            );
+        """)
+        self._conn.commit()
+    
+    def get_cursor(self, ticker: str) -> Tuple[Optional[date], Optional[float]]:
+        """Get a ticker's sync cursor.
+        
+        Args:
+            ticker: Stock ticker symbol
+        
+        Returns:
+            Tuple of (high-water day, last sync timestamp), both None if never synced
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT high_water, synced_at FROM sync_cursors WHERE ticker = ?", (ticker.upper(),)
+            ).fetchone()
+        if not row:
+            return None, None
+        high_water = datetime.strptime(row[0], "%Y-%m-%d").date() if row[0] else None
+        return high_water, row[1]
+    
+    def is_fresh(self, ticker: str) -> bool:
+        """Check whether a ticker was synced within the refresh interval."""
+        _, synced_at = self.get_cursor(ticker)
+        return synced_at is not None and time.time() - synced_at < self.refresh_seconds
+    
+    def add_ratings(self, ratings: Iterable[Any]) -> int:
+        """Insert or update ratings.
+        
+        Args:
+            ratings: Rating objects from the Polygon API (ratings without a ticker
+                     or date are skipped)
+        
+        Returns:
+            Number of ratings written
+        """
+        rows = []
+        for rating in ratings:
+            ticker = getattr(rating, 'ticker', None)
+            day = _day(getattr(rating, 'date', None))
+            if not ticker or not day:
+                continue
+            rows.append((
+                _rating_id(rating), ticker.upper(), day, getattr(rating, 'time', None),
+                json.dumps({key: value for key, value in vars(rating).items() if value is not None})
+            ))
+        if not rows:
+            return 0
+        
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO ratings VALUES (?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+        return len(rows)
+    
+    def advance_cursor(self, ticker: str, high_water: Optional[date]) -> None:
+        """Record a completed sync for a ticker.
+        
+        Args:
+            ticker: Stock ticker symbol
+            high_water: Newest rating day now in the store (never moves backwards)
+        """
+        day = _day(high_water)
+        with self._lock:
+            self._conn.execute("""
+                INSERT INTO sync_cursors VALUES (?, ?, ?)
+                ON CONFLICT (ticker) DO UPDATE SET
+                    high_water = MAX(COALESCE(high_water, ''), COALESCE(excluded.high_water, '')),
+                    synced_at = excluded.synced_at
+            """, (ticker.upper(), day, time.time()))
+            self._conn.commit()
+    
+    def query(self, ticker: str, since: Optional[datetime] = None,
+              limit: Optional[int] = None) -> List[StoredRating]:
+        """Get a ticker's stored ratings, newest first.
+        
+        Args:
+            ticker: Stock ticker symbol
+            since: Only return ratings dated on or after this day
+            limit: Maximum number of ratings to return
+        
+        Returns:
+            List of ratings
+        """
+        sql = "SELECT data FROM ratings WHERE ticker = ?"
+        params: List[Any] = [ticker.upper()]
+        if since is not None:
+            sql += " AND date >= ?"
+            params.append(_day(since))
+        sql += " ORDER BY date DESC, time DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [StoredRating(**json.loads(data)) for (data,) in rows]
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def create_ratings_store(config) -> Optional[RatingsStore]:
+    """Create the analyst ratings store from application configuration.
+    
+    Args:
+        config: Application Config instance
+    
+    Returns:
+        RatingsStore, or None if disabled or the database can't be opened
+    """
+    if not config.ratings_store_enabled:
+        return None
+    
+    try:
+        return RatingsStore(config.ratings_store_path, refresh_minutes=config.ratings_store_refresh_minutes)
+    except sqlite3.Error as e:
+        logger.warning(f"Could not open ratings store at {config.ratings_store_path}: {e}")
+        return None
@@ -0,0 +1,285 @@
+"""Record/replay transport for FMP, Perplexity and Polygon HTTP traffic.
+
+In record mode every request made through requests (FMP, Perplexity) or
+urllib3 (the Polygon SDK) goes to the network and its response is appended
+to a cassette file. In replay mode responses come from the cassette instead,
+optionally with injected latency and 429 responses, so runs can be measured
+offline and reproducibly:
+    
+    with RecordReplay('cassettes/2025-06-30.jsonl', mode='replay', latency=0.2):
+        ...  # any client code
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+import urllib3
+from requests.structures import CaseInsensitiveDict
+
+from http_cache import SECRET_PARAMS, describe_request
+
+
+logger = logging.getLogger(__name__)
+
+# Dates in URLs and prompts move with the calendar; match recordings across days
+_DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+# Response headers not worth keeping in a cassette
+_DROPPED_HEADERS = {'set-cookie', 'content-encoding', 'transfer-encoding', 'content-length', 'connection'}
+
+
+def interaction_key(method: str, url: str, params: Optional[Dict[str, Any]] = None,
+                    body: Any = None) -> str:
+    """Build the key a request is recorded and looked up under.
+    
+    Like the HTTP cache key, API keys and parameter order are ignored; in
+    addition any YYYY-MM-DD date is masked so a cassette replays on later days.
+    
+    Args:
+        method: HTTP method
+        url: Request URL
+        params: Query parameters
+        body: JSON payload
+    
+    Returns:
+        Hex digest identifying the request
+    """
+    described = _DATE_PATTERN.sub('DATE', describe_request(method, url, params, body))
+    return hashlib.sha256(described.encode('utf-8')).hexdigest()
+
+
+def _redact_url(url: str) -> str:
+    """Remove API key query parameters from a URL kept for readability."""
+    for name in SECRET_PARAMS:
+        url = re.sub(rf'([?&]){name}=[^&]*&?', r'\1', url)
+    return url.rstrip('?&')
+
+
+def _encode_body(body: bytes) -> Dict[str, str]:
+    """Store a body as text when it is UTF-8, base64 otherwise."""
+    try:
+        return {'body': body.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'body_base64': base64.b64encode(body).decode('ascii')}
+
+
+def _decode_body(record: Dict[str, Any]) -> bytes:
+    """Get a recorded body as bytes."""
+    if 'body_base64' in record:
+        return base64.b64decode(record['body_base64'])
+    return record.get('body', '').encode('utf-8')
+
+
+class Cassette:
+    """Recorded interactions, stored as one JSON object per line.
+    
+    Requests recorded more than once are replayed in recorded order, and the
+    last response repeats once they run out.
+    """
+    
+    def __init__(self, path: str):
+        """Load a cassette file if it exists.
+        
+        Args:
+            path: Cassette file path
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._interactions: Dict[str, List[Dict[str, Any]]] = {}
+        self._positions: Dict[str, int] = {}
+        
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._interactions.setdefault(record['key'], []).append(record)
+    
+    def __len__(self) -> int:
+        """Number of recorded interactions."""
+        return sum(len(records) for records in self._interactions.values())
+    
+    def next(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the next recorded response for a request key, or None if never recorded."""
+        with self._lock:
+            records = self._interactions.get(key)
+            if not records:
+                return None
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            return records[min(position, len(records) - 1)]
+    
+    def append(self, record: Dict[str, Any]) -> None:
+        """Add an interaction and write it to the cassette file."""
+        with self._lock:
+            self._interactions.setdefault(record['key'], []).append(record)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+
+class RecordReplay:
+    """Patches requests and urllib3 to record to or replay from a cassette.
+    
+    Use as a context manager or call install()/uninstall(). Only one instance
+    should be installed at a time.
+    """
+    
+    def __init__(self, cassette_path: str, mode: str = 'replay', latency: float = 0.0,
+                 jitter: float = 0.0, rate_limit_ratio: float = 0.0, seed: Optional[int] = None):
+        """Set up the transport.
+        
+        Args:
+            cassette_path: Cassette file to record to or replay from
+            mode: 'record' or 'replay'
+            latency: Seconds added to every replayed response
+            jitter: Maximum random deviation from latency, in seconds
+            rate_limit_ratio: Fraction of replayed requests answered with a 429
+            seed: Random seed for jitter and injected 429s
+        """
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown record/replay mode: {mode!r}")
+        self.mode = mode
+        self.cassette = Cassette(cassette_path)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_ratio = rate_limit_ratio
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._originals = None
+        self.stats = {'recorded': 0, 'replayed': 0, 'misses': 0, 'injected_429': 0}
+        self._stats_lock = threading.Lock()
+    
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+    
+    def install(self) -> 'RecordReplay':
+        """Patch requests.Session.request and urllib3.PoolManager.request."""
+        if self._originals is not None:
+            return self
+        self._originals = (requests.Session.request, urllib3.PoolManager.request)
+        transport = self
+        session_request, pool_request = self._originals
+        
+        def patched_session_request(session, method, url, *args, **kwargs):
+            return transport._session_request(session_request, session, method, url, *args, **kwargs)
+        
+        def patched_pool_request(pool, method, url, *args, **kwargs):
+            return transport._pool_request(pool_request, pool, method, url, *args, **kwargs)
+        
+        requests.Session.request = patched_session_request
+        urllib3.PoolManager.request = patched_pool_request
+        logger.info(f"Record/replay installed ({self.mode}, {len(self.cassette)} recorded interactions)")
+        return self
+    
+    def uninstall(self) -> None:
+        """Restore the original transports."""
+        if self._originals is None:
+            return
+        requests.Session.request, urllib3.PoolManager.request = self._originals
+        self._originals = None
+    
+    def __enter__(self):
+        return self.install()
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.uninstall()
+    
+    def _replay_delay(self) -> Optional[int]:
+        """Sleep for the injected latency and decide whether to inject a 429.
+        
+        Returns:
+            429 when the response should be replaced by a rate limit error, else None
+        """
+        with self._random_lock:
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter) if self.jitter else self.latency
+            rate_limited = self.rate_limit_ratio > 0 and self._random.random() < self.rate_limit_ratio
+        if delay > 0:
+            time.sleep(delay)
+        if rate_limited:
+            self._count('injected_429')
+            return 429
+        return None
+    
+    def _session_request(self, send, session, method, url, *args, **kwargs):
+        """Record or replay a requests call."""
+        body = kwargs.get('json', kwargs.get('data'))
+        key = interaction_key(method, url, kwargs.get('params'), body)
+        
+        if self.mode == 'record':
+            response = send(session, method, url, *args, **kwargs)
+            # Reading the body here also makes streamed responses replayable
+            self.cassette.append({
+                'key': key, 'method': method.upper(), 'url': _redact_url(response.url or url),
+                'status': response.status_code,
+                'headers': {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS},
+                **_encode_body(response.content),
+            })
+            self._count('recorded')
+            return response
+        
+        injected = self._replay_delay()
+        if injected:
+            return self._build_response(method, url, injected, {'Retry-After': '1'},
+                                        b'{"error": "Too Many Requests (injected)"}')
+        
+        record = self.cassette.next(key)
+        if record is None:
+            self._count('misses')
+            raise requests.ConnectionError(f"No recorded response for {method.upper()} {_redact_url(url)}")
+        self._count('replayed')
+        return self._build_response(method, url, record['status'], record['headers'], _decode_body(record))
+    
+    def _pool_request(self, send, pool, method, url, *args, **kwargs):
+        """Record or replay a urllib3 call (used by the Polygon SDK)."""
+        key = interaction_key(method, url, kwargs.get('fields'))
+        
+        if self.mode == 'record':
+            response = send(pool, method, url, *args, **kwargs)
+            self.cassette.append({
+                'key': key, 'method': method.upper(), 'url': _redact_url(url),
+                'status': response.status,
+                'headers': {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS},
+                **_encode_body(response.data or b''),
+            })
+            self._count('recorded')
+            return response
+        
+        injected = self._replay_delay()
+        if injected:
+            return urllib3.HTTPResponse(body=b'{"status":"ERROR","error":"Too Many Requests (injected)"}',
+                                        status=injected, headers={'Retry-After': '1'}, preload_content=True)
+        
+        record = self.cassette.next(key)
+        if record is None:
+            self._count('misses')
+            raise urllib3.exceptions.NewConnectionError(None, f"No recorded response for {method.upper()} {_redact_url(url)}")
+        self._count('replayed')
+        return urllib3.HTTPResponse(body=_decode_body(record), status=record['status'],
+                                    headers=record['headers'], preload_content=True)
+    
+    @staticmethod
+    def _build_response(method: str, url: str, status: int, headers: Dict[str, str],
+                        body: bytes) -> requests.Response:
+        """Build a requests.Response whose body is already read (so streaming reads work too)."""
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body
+        response._content_consumed = True
+        response.url = url
+        response.encoding = 'utf-8'
+        response.request = requests.Request(method, url).prepare()
+        return response
@@ -0,0 +1,252 @@
+"""Columnar screening of candidate stocks with NumPy threshold masks."""
+
+import ast
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from stock_record import gain_percentage, parse_number
+
+
+_GROWTH_YEAR = re.compile(r'(\d{4}):\s*([\d.-]+)(?:-[\d.]+)?%')
+_PROJECTION_RANGE = re.compile(r'^(\d+(?:\.\d+)?)\s*[-–]\s*(\d+(?:\.\d+)?)\s*%')
+_PROJECTION_TO = re.compile(r'^(\d+(?:\.\d+)?)\s+to\s+(\d+(?:\.\d+)?)\s*%', re.IGNORECASE)
+_PROJECTION_SINGLE = re.compile(r'^(\d+(?:\.\d+)?)\s*%')
+
+
+def parse_growth_rates(growth_rate: Optional[str]) -> List[float]:
+    """Parse yearly growth rates from text like "2025: 20%, 2026: 21%, 2027: 22%".
+    
+    Args:
+        growth_rate: Growth rate text from Perplexity
+    
+    Returns:
+        Parsed rates in the order they appear (years whose rate can't be parsed are skipped)
+    """
+    rates = []
+    for _, rate_str in _GROWTH_YEAR.findall(growth_rate or ''):
+        try:
+            rates.append(float(rate_str))
+        except ValueError:
+            continue
+    return rates
+
+
+def parse_projection_growth(projection: Optional[str]) -> Optional[float]:
+    """Parse the 2030 growth rate from text like "15%", "2-4%" or "2 to 4%".
+    
+    Args:
+        projection: Revenue projection text from Perplexity
+    
+    Returns:
+        Growth rate in percent (the upper bound of a range), or None if unparseable
+    """
+    if not projection:
+        return None
+    match = _PROJECTION_RANGE.search(projection) or _PROJECTION_TO.search(projection)
+    if match:
+        return float(match.group(2))
+    match = _PROJECTION_SINGLE.search(projection)
+    return float(match.group(1)) if match else None
+
+
+def _lowest_growth(stock: Any) -> Optional[float]:
+    rates = parse_growth_rates(stock.get('growth_rate'))
+    return min(rates) if rates else None
+
+
+# Column name -> (value of one stock, whether a stock with no value passes comparisons).
+# Missing Perplexity estimates get the benefit of the doubt; missing quote data doesn't.
+COLUMNS: Dict[str, tuple] = {
+    'gain': (gain_percentage, False),
+    'market_cap': (lambda stock: parse_number(stock.get('mktCap')), False),
+    # Lowest yearly growth, so "growth >= 10" means every available year grew 10%+
+    'growth': (_lowest_growth, True),
+    'projection_2030': (lambda stock: parse_projection_growth(stock.get('revenue_projection_2030')), True),
+}
+
+_COMPARISONS = {
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+
+
+class ScreeningTable:
+    """Candidates loaded into one float array per column.
+    
+    Columns are built the first time an expression uses them (missing or
+    unparseable values become NaN), and threshold expressions such as
+    ``"gain >= 10 and market_cap >= 300e6"`` are evaluated as boolean masks
+    over every candidate at once.
+    """
+    
+    def __init__(self, stocks: Optional[Sequence[Any]] = None,
+                 columns: Optional[Dict[str, Any]] = None):
+        """Initialize the table.
+        
+        Args:
+            stocks: Stock records or dictionaries the COLUMNS are read from
+            columns: Precomputed columns (e.g. from bulk quotes), by column name
+        """
+        self.stocks = stocks if stocks is not None else []
+        self._columns = {name: np.asarray(values, dtype=float) for name, values in (columns or {}).items()}
+        if stocks is None and self._columns:
+            self._size = len(next(iter(self._columns.values())))
+        else:
+            self._size = len(self.stocks)
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def column(self, name: str) -> np.ndarray:
+        """Get a column, reading it from the stocks on first use.
+        
+        Raises:
+            ValueError: If the column is unknown
+        """
+        values = self._columns.get(name)
+        if values is None:
+            if name not in COLUMNS:
+                raise ValueError(f"Unknown screening column: {name!r}")
+            extract = COLUMNS[name][0]
+            values = np.array([extract(stock) for stock in self.stocks], dtype=float)
+            self._columns[name] = values
+        return values
+    
+    def missing(self, name: str) -> np.ndarray:
+        """Get the indices of candidates without a value in a column."""
+        return np.flatnonzero(np.isnan(self.column(name)))
+    
+    def mask(self, expression: str, **params: float) -> np.ndarray:
+        """Evaluate a threshold expression over all candidates.
+        
+        Args:
+            expression: Comparisons of columns with numbers or named parameters,
+                        combined with and/or/not (e.g. "gain >= min_gain and growth >= 10")
+            **params: Values of the named parameters used in the expression
+        
+        Returns:
+            Boolean array, True for candidates that pass
+        
+        Raises:
+            ValueError: If the expression is invalid
+        """
+        return compile_expression(expression)(self, params)
+    
+    def select(self, expression: str, **params: float) -> np.ndarray:
+        """Get the indices (ascending) of candidates that pass an expression."""
+        return np.flatnonzero(self.mask(expression, **params))
+    
+    def filter(self, expression: str, **params: float) -> List[Any]:
+        """Get the stocks that pass an expression, in their original order."""
+        return [self.stocks[index] for index in self.select(expression, **params).tolist()]
+
+
+def screen(stocks: Sequence[Any], expression: str, **params: float) -> List[Any]:
+    """Filter stocks with a threshold expression (see ScreeningTable.mask).
+    
+    Args:
+        stocks: Stock records or dictionaries
+        expression: Threshold expression
+        **params: Values of the named parameters used in the expression
+    
+    Returns:
+        Stocks that pass, in their original order
+    """
+    return ScreeningTable(stocks).filter(expression, **params)
+
+
+@lru_cache(maxsize=128)
+def compile_expression(expression: str) -> Callable[[ScreeningTable, Dict[str, float]], np.ndarray]:
+    """Compile a threshold expression into a function producing a boolean mask.
+    
+    Args:
+        expression: Threshold expression (see ScreeningTable.mask)
+    
+    Returns:
+        Function of (table, params) returning the mask
+    
+    Raises:
+        ValueError: If the expression is not valid screening syntax
+    """
+    try:
+        tree = ast.parse(expression, mode='eval').body
+    except SyntaxError as e:
+        raise ValueError(f"Invalid screening expression {expression!r}: {e.msg}") from None
+    return _compile_node(tree, expression)
+
+
+def _compile_node(node: ast.AST, expression: str) -> Callable:
+    """Compile a boolean node of a screening expression."""
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile_node(value, expression) for value in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        
+        def boolean(table, params):
+            result = parts[0](table, params)
+            for part in parts[1:]:
+                result = combine(result, part(table, params))
+            return result
+        return boolean
+    
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        operand = _compile_node(node.operand, expression)
+        return lambda table, params: ~operand(table, params)
+    
+    if isinstance(node, ast.Compare):
+        # Chained comparisons ("10 <= gain < 50") hold when every link holds
+        for op in node.ops:
+            if type(op) not in _COMPARISONS:
+                raise ValueError(f"Unsupported comparison in screening expression {expression!r}")
+        terms = [_compile_term(term, expression) for term in [node.left] + node.comparators]
+        links = [(_COMPARISONS[type(op)], left, right) for op, left, right in zip(node.ops, terms, terms[1:])]
+        
+        def compare(table, params):
+            result = np.ones(len(table), dtype=bool)
+            for compare_op, left, right in links:
+                left_values, left_missing_passes = left(table, params)
+                right_values, right_missing_passes = right(table, params)
+                with np.errstate(invalid='ignore'):
+                    passed = compare_op(left_values, right_values)
+                missing = np.isnan(left_values) | np.isnan(right_values)
+                passed = np.where(missing, left_missing_passes and right_missing_passes, passed)
+                result &= passed
+            return result
+        return compare
+    
+    raise ValueError(f"Unsupported syntax in screening expression {expression!r}: {ast.unparse(node)}")
+
+
+def _compile_term(node: ast.AST, expression: str) -> Callable:
+    """Compile a comparison operand into a function returning (values, missing passes)."""
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+        value = float(node.value)
+        return lambda table, params: (value, True)
+    
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+        operand = _compile_term(node.operand, expression)
+        sign = -1.0 if isinstance(node.op, ast.USub) else 1.0
+        
+        def signed(table, params):
+            values, missing_passes = operand(table, params)
+            return sign * values, missing_passes
+        return signed
+    
+    if isinstance(node, ast.Name):
+        name = node.id
+        
+        def lookup(table, params):
+            if name in params:
+                return float(params[name]), True
+            if name in table._columns or name in COLUMNS:
+                return table.column(name), COLUMNS.get(name, (None, False))[1]
+            raise ValueError(f"Unknown column or parameter {name!r} in screening expression {expression!r}")
+        return lookup
+    
+    raise ValueError(f"Unsupported operand in screening expression {expression!r}: {ast.unparse(node)}")
@@ -0,0 +1,191 @@
+"""Compact per-stock record passed through the filter and enrichment stages."""
+
+import re
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional
+
+
+# Quote fields stored as floats however the provider formatted them ("+12.5%", "1,234")
+NUMERIC_FIELDS = frozenset({'price', 'change', 'changesPercentage', 'mktCap'})
+
+_NUMBER = re.compile(r'[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?')
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """Parse a number that may be formatted as text (e.g. "+12.5%" or "1,234.5").
+    
+    Args:
+        value: Number, numeric string or None
+    
+    Returns:
+        Float value, or None if the value isn't a number
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER.search(str(value).replace(',', ''))
+    return float(match.group()) if match else None
+
+
+def gain_percentage(stock: Any) -> Optional[float]:
+    """Get a stock's daily gain in percent from a StockRecord or a raw FMP dictionary.
+    
+    Args:
+        stock: StockRecord or dictionary with a changesPercentage entry
+    
+    Returns:
+        Gain in percent, or None if missing or unparseable
+    """
+    value = stock.get('changesPercentage')
+    if isinstance(value, float):
+        return value
+    return parse_number(value)
+
+
+class StockRecord(MutableMapping):
+    """A candidate stock with a fixed slot for every field the stages set.
+    
+    Behaves like the dictionaries it replaces (``record['mktCap']``,
+    ``record.get('ps_ratio')``, ``dict(record)``), so filters, enrichment
+    steps and EmailSender work unchanged, but stores fields in slots instead
+    of a per-stock hash table. Quote fields are normalized to floats when set,
+    so gains are parsed once at ingestion rather than on every sort. Keys
+    without a slot are kept in a small overflow dictionary.
+    """
+    
+    # FMP gainer quote
+    symbol: str
+    name: str
+    price: Optional[float]
+    change: Optional[float]
+    changesPercentage: Optional[float]
+    exchange: Optional[str]
+    # Company profile
+    mktCap: Optional[float]
+    industry: str
+    sector: str
+    # Perplexity filters and details
+    is_technical: Optional[bool]
+    growth_rate: Optional[str]
+    revenue_projection_2030: Optional[str]
+    description: Optional[str]
+    competitive_score: Optional[int]
+    competitive_reasoning: Optional[str]
+    market_growth_score: Optional[int]
+    market_growth_reasoning: Optional[str]
+    ps_ratio: Optional[float]
+    earnings_guidance: Optional[str]
+    analyst_price_targets: Optional[str]
+    investment_evaluation: Optional[str]
+    # FMP financial data
+    gross_margin: Optional[float]
+    net_income_margin: Optional[float]
+    rd_margin: Optional[float]
+    ebitda_margin: Optional[float]
+    long_term_debt: Optional[float]
+    cash_and_equivalents: Optional[float]
+    pt_consensus_current: Optional[float]
+    pt_consensus_7d: Optional[float]
+    pt_consensus_30d: Optional[float]
+    pt_consensus_180d: Optional[float]
+    pt_change_7d: Optional[float]
+    pt_change_30d: Optional[float]
+    pt_change_180d: Optional[float]
+    # Polygon analyst data
+    polygon_consensus: Optional[float]
+    polygon_consensus_7d: Optional[float]
+    polygon_consensus_30d: Optional[float]
+    polygon_consensus_90d: Optional[float]
+    polygon_trend_7d: Optional[float]
+    polygon_trend_30d: Optional[float]
+    polygon_analyst_count: Optional[int]
+    polygon_recent_actions: Optional[List[Dict[str, Any]]]
+    
+    # One slot per annotated field, plus the overflow dictionary
+    __slots__ = tuple(__annotations__) + ('_extra',)
+    
+    def __init__(self, data: Optional[Dict[str, Any]] = None, **fields):
+        """Create a record from a dictionary (e.g. an FMP gainer row) and/or keywords."""
+        self._extra = None
+        if data:
+            self.update(data)
+        if fields:
+            self.update(fields)
+    
+    def __getitem__(self, key: str) -> Any:
+        if key in FIELDS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+    
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in FIELDS:
+            if key in NUMERIC_FIELDS:
+                value = parse_number(value)
+            setattr(self, key, value)
+            return
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+    
+    def __delitem__(self, key: str) -> None:
+        if key in FIELDS:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return
+        if self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+    
+    def __iter__(self) -> Iterator[str]:
+        for key in FIELD_ORDER:
+            if hasattr(self, key):
+                yield key
+        if self._extra:
+            yield from self._extra
+    
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+    
+    def __contains__(self, key: object) -> bool:
+        if key in FIELDS:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in FIELDS:
+            return getattr(self, key, default)
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+    
+    def __repr__(self) -> str:
+        return f"StockRecord({dict(self)!r})"
+    
+    def __reduce__(self):
+        return (StockRecord, (dict(self),))
+    
+    def copy(self) -> 'StockRecord':
+        """Get a shallow copy."""
+        return StockRecord(self)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the record's fields as a plain dictionary (e.g. for JSON)."""
+        return dict(self)
+    
+    @classmethod
+    def from_rows(cls, rows: List[Dict[str, Any]]) -> List['StockRecord']:
+        """Convert provider rows or checkpointed dictionaries into records."""
+        return [row if isinstance(row, cls) else cls(row) for row in rows]
+
+
+# Slot fields in declaration order (iteration order), and as a set for lookups
+FIELD_ORDER = StockRecord.__slots__[:-1]
+FIELDS = frozenset(FIELD_ORDER)
@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for the FMP, Perplexity and Polygon APIs, serving synthetic data.
+
+Used to load-test the stock alert pipeline with hundreds of candidate
+gainers without spending API quota:
+
+    python stub_servers.py --gainers 600 --latency 0.2 --fmp-rate 300/min
+
+prints the FMP_BASE_URL, PERPLEXITY_BASE_URL and POLYGON_BASE_URL values to
+point the clients at the servers. Data is generated deterministically from
+--seed, so the same stocks pass the same filters on every run.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from rate_limiter import TokenBucket, parse_rate
+
+
+logger = logging.getLogger(__name__)
+
+INDUSTRIES = [
+    ('Technology', 'Software - Application'),
+    ('Technology', 'Semiconductors'),
+    ('Industrials', 'Aerospace & Defense'),
+    ('Industrials', 'Specialty Industrial Machinery'),
+    ('Healthcare', 'Biotechnology'),
+    ('Consumer Cyclical', 'Specialty Retail'),
+    ('Energy', 'Oil & Gas E&P'),
+    ('Financial Services', 'Asset Management'),
+]
+
+FIRMS = ['Morgan Stanley', 'Goldman Sachs', 'JP Morgan', 'Barclays', 'Citigroup',
+         'Wells Fargo', 'UBS', 'Piper Sandler', 'Needham', 'Jefferies']
+
+
+class SyntheticMarket:
+    """Deterministic fake market data for a universe of synthetic tickers."""
+    
+    def __init__(self, gainers: int = 500, seed: int = 0):
+        """Generate the universe.
+        
+        Args:
+            gainers: Number of stocks on the gainers list
+            seed: Seed that determines every generated value
+        """
+        self.seed = seed
+        self.stocks: Dict[str, Dict[str, Any]] = {}
+        rng = random.Random(seed)
+        for i in range(1, gainers + 1):
+            symbol = f"SYN{i}"
+            sector, industry = INDUSTRIES[rng.randrange(len(INDUSTRIES))]
+            price = round(rng.uniform(2, 400), 2)
+            self.stocks[symbol] = {
+                'symbol': symbol,
+                'name': f"Synthetic {i} Inc",
+                'price': price,
+                # Most of the list gained 10%+, a tail didn't
+                'changesPercentage': round(rng.uniform(4, 80), 2),
+                'mktCap': int(10 ** rng.uniform(7.5, 11)),
+                'sector': sector,
+                'industry': industry,
+            }
+    
+    def _rng(self, *parts: Any) -> random.Random:
+        """Get a random generator determined by the seed and the given values."""
+        digest = hashlib.sha256(repr((self.seed,) + parts).encode('utf-8')).hexdigest()
+        return random.Random(int(digest[:16], 16))
+    
+    def gainers(self) -> List[Dict[str, Any]]:
+        """Get the gainers list, biggest gain first."""
+        rows = [
+            {
+                'symbol': stock['symbol'],
+                'name': stock['name'],
+                'change': round(stock['price'] * stock['changesPercentage'] / (100 + stock['changesPercentage']), 2),
+                'price': stock['price'],
+                'changesPercentage': stock['changesPercentage'],
+            }
+            for stock in self.stocks.values()
+        ]
+        return sorted(rows, key=lambda row: row['changesPercentage'], reverse=True)
+    
+    def quotes(self, exchange: str) -> List[Dict[str, Any]]:
+        """Get the full quote list of an exchange (each ticker is listed on one of NASDAQ, NYSE, AMEX)."""
+        rows = []
+        for stock in self.stocks.values():
+            listed_on = self._rng('exchange', stock['symbol']).choice(['NASDAQ', 'NYSE', 'AMEX'])
+            if listed_on != exchange.upper():
+                continue
+            previous_close = round(stock['price'] / (1 + stock['changesPercentage'] / 100), 2)
+            rows.append({
+                'symbol': stock['symbol'],
+                'name': stock['name'],
+                'price': stock['price'],
+                'changesPercentage': stock['changesPercentage'],
+                'change': round(stock['price'] - previous_close, 2),
+                'previousClose': previous_close,
+                'marketCap': stock['mktCap'],
+                'exchange': listed_on,
+            })
+        return rows
+    
+    def profile(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Get a company profile, or None for unknown symbols."""
+        stock = self.stocks.get(symbol)
+        if stock is None:
+            return None
+        return {
+            'symbol': symbol,
+            'companyName': stock['name'],
+            'price': stock['price'],
+            'mktCap': stock['mktCap'],
+            'sector': stock['sector'],
+            'industry': stock['industry'],
+            'exchangeShortName': 'NASDAQ',
+            'description': f"{stock['name']} is a synthetic company used for load testing.",
+        }
+    
+    def statement(self, kind: str, symbol: str, limit: int = 1) -> List[Dict[str, Any]]:
+        """Get the latest annual ratios, income statements or balance sheets for a symbol, newest first."""
+        if symbol not in self.stocks:
+            return []
+        rows = []
+        for years_back in range(max(1, limit)):
+            rng = self._rng(kind, symbol, years_back)
+            revenue = self.stocks[symbol]['mktCap'] / rng.uniform(1, 15)
+            if kind == 'ratios':
+                row = {'grossProfitMargin': rng.uniform(0.1, 0.8), 'netProfitMargin': rng.uniform(-0.3, 0.3),
+                       'priceToSalesRatio': rng.uniform(0.5, 20)}
+            elif kind == 'income-statement':
+                row = {'revenue': revenue, 'researchAndDevelopmentExpenses': revenue * rng.uniform(0, 0.3),
+                       'ebitda': revenue * rng.uniform(-0.2, 0.4)}
+            else:
+                row = {'longTermDebt': revenue * rng.uniform(0, 1), 'cashAndCashEquivalents': revenue * rng.uniform(0, 0.5)}
+            period_end = datetime.now() - timedelta(days=60 + 365 * years_back)
+            row = {'symbol': symbol, 'date': period_end.strftime('%Y-%m-%d'), **row}
+            if kind != 'ratios':
+                row['fillingDate'] = (period_end + timedelta(days=45)).strftime('%Y-%m-%d')
+            rows.append(row)
+        return rows
+    
+    def eod_prices(self, day: str) -> bytes:
+        """Get the bulk end-of-day prices of every ticker for a date as CSV (empty on weekends)."""
+        lines = ['symbol,date,open,low,high,close,adjClose,volume']
+        if datetime.strptime(day, '%Y-%m-%d').weekday() < 5:
+            for symbol, stock in self.stocks.items():
+                rng = self._rng('eod', symbol, day)
+                close = round(stock['price'] * rng.uniform(0.6, 1.4), 2)
+                low, high = round(close * rng.uniform(0.9, 1), 2), round(close * rng.uniform(1, 1.1), 2)
+                lines.append(f"{symbol},{day},{close},{low},{high},{close},{close},{rng.randint(10_000, 5_000_000)}")
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+    
+    def ratings(self, symbol: str) -> List[Dict[str, Any]]:
+        """Get a year of analyst ratings for a symbol, newest first (Polygon Benzinga format)."""
+        stock = self.stocks.get(symbol)
+        if stock is None:
+            return []
+        rng = self._rng('ratings', symbol)
+        today = datetime.now()
+        target = stock['price'] * rng.uniform(0.9, 1.6)
+        rows = []
+        for n in range(rng.randint(0, 25)):
+            day = today - timedelta(days=rng.randint(0, 364))
+            previous = target
+            target = round(max(1.0, target * rng.uniform(0.8, 1.25)), 2)
+            rows.append({
+                'benzinga_id': f"{symbol}-{n}",
+                'ticker': symbol,
+                'company_name': stock['name'],
+                'date': day.strftime('%Y-%m-%d'),
+                'time': f"{rng.randint(6, 18):02d}:{rng.randint(0, 59):02d}:00",
+                'firm': rng.choice(FIRMS),
+                'analyst': f"Analyst {rng.randint(1, 50)}",
+                'rating': rng.choice(['Buy', 'Overweight', 'Neutral', 'Underweight']),
+                'rating_action': rng.choice(['maintains', 'upgrades', 'downgrades', 'initiates']),
+                'price_target': target,
+                'previous_price_target': round(previous, 2),
+                'price_target_action': 'raises' if target > previous else 'lowers',
+                'currency': 'USD',
+            })
+        rows.sort(key=lambda row: (row['date'], row['time']), reverse=True)
+        return rows
+    
+    def price_targets(self, symbol: str) -> List[Dict[str, Any]]:
+        """Get the FMP v4 price target history for a symbol."""
+        return [
+            {
+                'symbol': symbol,
+                'publishedDate': f"{row['date']}T{row['time']}.000Z",
+                'analystCompany': row['firm'],
+                'analystName': row['analyst'],
+                'priceTarget': row['price_target'],
+            }
+            for row in self.ratings(symbol)
+        ]
+    
+    def completion(self, prompt: str) -> str:
+        """Answer a Perplexity prompt in the format the client parses."""
+        rng = self._rng('completion', prompt)
+        
+        if prompt.startswith('Return a JSON object about'):
+            return json.dumps({
+                'description': 'A synthetic company that makes synthetic products for synthetic customers.',
+                'competitive_score': rng.randint(2, 9),
+                'competitive_reasoning': 'Moderate switching costs and a handful of capable competitors.',
+                'market_growth_score': rng.randint(2, 9),
+                'market_growth_reasoning': 'Its market is expected to grow steadily over the next five years.',
+                'ps_ratio': round(rng.uniform(0.5, 20), 2),
+                'earnings_guidance': 'It last reported earnings on July 30 and raised full-year guidance.',
+                'analyst_price_targets': 'Analysts raised targets modestly over the last six months.',
+            })
+        if prompt.startswith('For each company below'):
+            labels = re.findall(r'^([A-Z0-9.\-]+): ', prompt, re.MULTILINE)
+            return '\n'.join(f"{label}: {'yes' if self._rng('technical', label).random() < 0.7 else 'no'}"
+                             for label in labels)
+        if 'require significant technical' in prompt:
+            return 'yes' if rng.random() < 0.7 else 'no'
+        if 'expected revenue growth rate' in prompt:
+            return ', '.join(f"{year}: {rng.randint(-5, 60)}%" for year in (2025, 2026, 2027))
+        if 'will still be growing revenue in 2030' in prompt:
+            return f"{rng.randint(2, 40)}% Growth will slow as the market matures, but new products keep it ahead."
+        if 'price to sales ratio' in prompt:
+            return f"{rng.uniform(0.5, 20):.2f}"
+        if 'last reported earnings' in prompt:
+            return 'It last reported earnings on July 30 and kept its top and bottom line guidance unchanged.'
+        if 'analyst price target changes' in prompt:
+            return 'Two analysts raised their targets last week; the six-month trend is slightly higher.'
+        if prompt.startswith('Do three things'):
+            return (f"One, A synthetic company. Two, Competitive advantage score: {rng.randint(2, 9)}/10. "
+                    f"Moderate moat. Three, Market growth score: {rng.randint(2, 9)}/10. Growing market.")
+        if 'put/call ratio' in prompt:
+            return f"{rng.uniform(0.6, 1.2):.2f}"
+        # Investment evaluations, deep research and anything else get a few paragraphs of text
+        return '\n\n'.join(
+            f"## Section {n}\nSynthetic analysis paragraph {n} with enough text to resemble a long report. " * 3
+            for n in range(1, 6)
+        )
+
+
+class StubServer(ThreadingHTTPServer):
+    """HTTP server standing in for one provider, with tunable latency, errors and rate limit."""
+    
+    daemon_threads = True
+    
+    def __init__(self, provider: str, market: SyntheticMarket, host: str = '127.0.0.1',
+                 port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit: Optional[str] = None, seed: int = 0):
+        """Bind the server (port 0 picks a free port).
+        
+        Args:
+            provider: 'fmp', 'perplexity' or 'polygon'
+            market: Synthetic data to serve
+            host: Interface to listen on
+            port: Port to listen on
+            latency: Seconds added to every response
+            jitter: Maximum random deviation from latency, in seconds
+            error_rate: Fraction of requests answered with HTTP 500
+            rate_limit: Requests allowed (e.g. "300/min"); excess requests get HTTP 429
+            seed: Random seed for jitter and errors
+        """
+        super().__init__((host, port), _StubHandler)
+        self.provider = provider
+        self.market = market
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.limiter = TokenBucket(parse_rate(rate_limit)) if rate_limit else None
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'rate_limited': 0, 'errors': 0}
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        """Base URL the provider's client should use."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> 'StubServer':
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self.serve_forever, name=f"stub-{self.provider}", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+    
+    def admit(self) -> Optional[int]:
+        """Count a request, apply the latency and decide whether to fail it.
+        
+        Returns:
+            HTTP status to fail the request with (429 or 500), or None to serve it
+        """
+        with self._lock:
+            self.stats['requests'] += 1
+            delay = self.latency + (self._random.uniform(-self.jitter, self.jitter) if self.jitter else 0)
+            failed = self.error_rate > 0 and self._random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        if self.limiter is not None and not self.limiter.try_acquire():
+            with self._lock:
+                self.stats['rate_limited'] += 1
+            return 429
+        if failed:
+            with self._lock:
+                self.stats['errors'] += 1
+            return 500
+        return None
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Routes requests to the synthetic data of the server's provider."""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def log_message(self, format, *args):
+        logger.debug(f"{self.server.provider}: {format % args}")
+    
+    def do_GET(self):
+        self._handle()
+    
+    def do_POST(self):
+        self._handle()
+    
+    def _handle(self) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        
+        failure = self.server.admit()
+        if failure == 429:
+            self._send_json(429, {'Error Message': 'Limit Reach (stub server)'}, {'Retry-After': '1'})
+            return
+        if failure:
+            self._send_json(failure, {'Error Message': 'Internal error (stub server)'})
+            return
+        
+        url = urlparse(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        route = getattr(self, f"_route_{self.server.provider}")
+        status, payload = route(url.path, query, body)
+        if isinstance(payload, str):
+            self._send_stream(payload)
+        elif isinstance(payload, bytes):
+            self._send_body(status, payload, 'text/csv')
+        else:
+            self._send_json(status, payload)
+    
+    def _route_fmp(self, path: str, query: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        market = self.server.market
+        if path == '/api/v3/stock_market/gainers':
+            return 200, market.gainers()
+        match = re.fullmatch(r'/api/v3/quotes/([a-z]+)', path)
+        if match:
+            return 200, market.quotes(match.group(1))
+        match = re.fullmatch(r'/api/v3/profile/([^/]+)', path)
+        if match:
+            return 200, [profile for profile in (market.profile(symbol) for symbol in match.group(1).split(','))
+                         if profile]
+        match = re.fullmatch(r'/api/v3/(ratios|income-statement|balance-sheet-statement)/([^/]+)', path)
+        if match:
+            return 200, market.statement(match.group(1), match.group(2), int(query.get('limit', 1)))
+        if path == '/api/v4/batch-request-end-of-day-prices':
+            return 200, market.eod_prices(query.get('date', ''))
+        if path == '/api/v4/price-target':
+            return 200, market.price_targets(query.get('symbol', ''))
+        if path == '/api/v4/price-target-consensus':
+            targets = [row['priceTarget'] for row in market.price_targets(query.get('symbol', ''))[:5]]
+            if not targets:
+                return 200, []
+            consensus = round(sum(targets) / len(targets), 2)
+            return 200, [{'symbol': query['symbol'], 'targetConsensus': consensus,
+                          'targetHigh': max(targets), 'targetLow': min(targets)}]
+        return 404, {'Error Message': f"Unknown endpoint {path} (stub server)"}
+    
+    def _route_perplexity(self, path: str, query: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        if path != '/chat/completions':
+            return 404, {'error': f"Unknown endpoint {path}"}
+        request = json.loads(body or b'{}')
+        messages = request.get('messages') or [{}]
+        text = self.server.market.completion(messages[-1].get('content', ''))
+        if request.get('stream'):
+            return 200, text
+        return 200, {
+            'model': request.get('model'),
+            'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': text}}],
+        }
+    
+    def _route_polygon(self, path: str, query: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        if path != '/benzinga/v1/ratings':
+            return 404, {'status': 'NOT_FOUND', 'error': f"Unknown endpoint {path}"}
+        market = self.server.market
+        if 'ticker' in query:
+            tickers = [query['ticker']]
+        elif 'ticker.any_of' in query:
+            tickers = query['ticker.any_of'].split(',')
+        else:
+            tickers = list(market.stocks)
+        
+        rows = [row for ticker in tickers for row in market.ratings(ticker)]
+        if 'date.gte' in query:
+            rows = [row for row in rows if row['date'] >= query['date.gte']]
+        if 'date.lte' in query:
+            rows = [row for row in rows if row['date'] <= query['date.lte']]
+        rows.sort(key=lambda row: (row['date'], row['time']), reverse=query.get('order', 'desc') != 'asc')
+        
+        limit = int(query.get('limit', 10))
+        offset = int(query.get('offset', 0))
+        payload = {'status': 'OK', 'request_id': 'stub', 'results': rows[offset:offset + limit]}
+        if offset + limit < len(rows):
+            next_query = {**query, 'offset': offset + limit}
+            payload['next_url'] = f"{self.server.url}{path}?{urlencode(next_query)}"
+        return 200, payload
+    
+    def _send_json(self, status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send_body(status, json.dumps(payload).encode('utf-8'), 'application/json', headers)
+    
+    def _send_body(self, status: int, data: bytes, content_type: str,
+                   headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _send_stream(self, text: str) -> None:
+        """Send a completion as server-sent events, a few words per event."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        words = text.split(' ')
+        for start in range(0, len(words), 8):
+            chunk = ' '.join(words[start:start + 8]) + (' ' if start + 8 < len(words) else '')
+            event = {'choices': [{'index': 0, 'delta': {'content': chunk}}]}
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode('utf-8'))
+            self.wfile.flush()
+        done = {'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]}
+        self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode('utf-8'))
+        self.close_connection = True
+
+
+def start_stub_servers(gainers: int = 500, seed: int = 0, host: str = '127.0.0.1',
+                       ports: Optional[Dict[str, int]] = None, latency: float = 0.0,
+                       jitter: float = 0.0, error_rate: float = 0.0,
+                       rate_limits: Optional[Dict[str, str]] = None) -> Dict[str, StubServer]:
+    """Start stand-in servers for every provider, sharing one synthetic market.
+    
+    Args:
+        gainers: Number of stocks on the gainers list
+        seed: Seed for the synthetic data, latency jitter and errors
+        host: Interface to listen on
+        ports: Port per provider (default: free ports)
+        latency: Seconds added to every response
+        jitter: Maximum random deviation from latency, in seconds
+        error_rate: Fraction of requests answered with HTTP 500
+        rate_limits: Rate limit per provider (e.g. {'fmp': '300/min'}); others are unlimited
+    
+    Returns:
+        Dictionary mapping provider names to running servers
+    """
+    market = SyntheticMarket(gainers, seed)
+    ports = ports or {}
+    rate_limits = rate_limits or {}
+    return {
+        provider: StubServer(provider, market, host, ports.get(provider, 0), latency=latency,
+                             jitter=jitter, error_rate=error_rate,
+                             rate_limit=rate_limits.get(provider), seed=seed + n).start()
+        for n, provider in enumerate(('fmp', 'perplexity', 'polygon'))
+    }
+
+
+def stub_environment(servers: Dict[str, StubServer]) -> Dict[str, str]:
+    """Get the Config environment variables that point the clients at the servers."""
+    return {f"{provider.upper()}_BASE_URL": server.url for provider, server in servers.items()}
+
+
+def main() -> None:
+    """Run the stand-in servers until interrupted."""
+    parser = argparse.ArgumentParser(description='Serve synthetic FMP, Perplexity and Polygon APIs locally')
+    parser.add_argument('--gainers', type=int, default=500, help='Number of stocks on the gainers list')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic data')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on')
+    parser.add_argument('--fmp-port', type=int, default=8701)
+    parser.add_argument('--perplexity-port', type=int, default=8702)
+    parser.add_argument('--polygon-port', type=int, default=8703)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Maximum random deviation from --latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 500')
+    parser.add_argument('--fmp-rate', help='FMP rate limit (e.g. 300/min); unlimited by default')
+    parser.add_argument('--perplexity-rate', help='Perplexity rate limit (e.g. 50/min)')
+    parser.add_argument('--polygon-rate', help='Polygon rate limit (e.g. 10/s)')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    servers = start_stub_servers(
+        gainers=args.gainers, seed=args.seed, host=args.host,
+        ports={'fmp': args.fmp_port, 'perplexity': args.perplexity_port, 'polygon': args.polygon_port},
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        rate_limits={'fmp': args.fmp_rate, 'perplexity': args.perplexity_rate, 'polygon': args.polygon_rate},
+    )
+    print(f"Serving {args.gainers} synthetic gainers. Point the clients at the stub servers with:")
+    for name, value in stub_environment(servers).items():
+        print(f"  export {name}={value}")
+    
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for provider, server in servers.items():
+            print(f"{provider}: {server.stats}")
+            server.stop()
+
+
+if __name__ == '__main__':
+    main()
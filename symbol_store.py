@@ -0,0 +1,140 @@
+"""Persistent per-symbol attribute store for slow-changing classifications."""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Iterable, Optional
+
+
+logger = logging.getLogger(__name__)
+
+DAY = 24 * 60 * 60
+
+
+class SymbolAttributeStore:
+    """SQLite-backed store of per-symbol decisions such as ``is_technical``.
+    
+    Each (symbol, attribute) pair keeps its latest value together with when it
+    was decided and which source decided it. Values older than the store's
+    max age are treated as unknown so they get re-decided.
+    """
+    
+    def __init__(self, path: str, max_age_days: float = 180):
+        """Open (or create) the store database.
+        
+        Args:
+            path: SQLite database file path
+            max_age_days: Age after which a stored decision expires
+        """
+        self.path = path
+        self.max_age = max_age_days * DAY
+        self._lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS symbol_attributes (
+                symbol TEXT,
+                attribute TEXT,
+                value TEXT,
+                decided_at REAL,
+                source TEXT,
+                PRIMARY KEY (symbol, attribute)
+            )
+        """)
+        self._conn.commit()
+    
+    def get_many(self, symbols: Iterable[str], attribute: str) -> Dict[str, Any]:
+        """Look up unexpired values of an attribute for several symbols.
+        
+        Args:
+            symbols: Ticker symbols
+            attribute: Attribute name (e.g. 'is_technical')
+        
+        Returns:
+            Dictionary mapping symbols with a current decision to their value
+        """
+        symbols = [s.upper() for s in symbols if s]
+        if not symbols:
+            return {}
+        
+        cutoff = time.time() - self.max_age
+        placeholders = ','.join('?' * len(symbols))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT symbol, value FROM symbol_attributes "
+                f"WHERE attribute = ? AND decided_at > ? AND symbol IN ({placeholders})",
+                [attribute, cutoff, *symbols]
+            ).fetchall()
+        
+        return {symbol: json.loads(value) for symbol, value in rows}
+    
+    def set_many(self, values: Dict[str, Any], attribute: str, source: str) -> None:
+        """Record decisions for several symbols.
+        
+        Args:
+            values: Dictionary mapping symbols to values (None values are skipped)
+            attribute: Attribute name
+            source: What made the decision (e.g. 'perplexity:sonar-pro')
+        """
+        now = time.time()
+        rows = [
+            (symbol.upper(), attribute, json.dumps(value), now, source)
+            for symbol, value in values.items()
+            if symbol and value is not None
+        ]
+        if not rows:
+            return
+        
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO symbol_attributes VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+    
+    def delete(self, symbol: str, attribute: Optional[str] = None) -> None:
+        """Forget decisions for a symbol so they are re-decided on the next run.
+        
+        Args:
+            symbol: Ticker symbol
+            attribute: Attribute to forget (default: all attributes)
+        """
+        with self._lock:
+            if attribute:
+                self._conn.execute(
+                    "DELETE FROM symbol_attributes WHERE symbol = ? AND attribute = ?",
+                    (symbol.upper(), attribute)
+                )
+            else:
+                self._conn.execute("DELETE FROM symbol_attributes WHERE symbol = ?", (symbol.upper(),))
+            self._conn.commit()
+    
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def create_symbol_store(config) -> Optional[SymbolAttributeStore]:
+    """Create the symbol attribute store from application configuration.
+    
+    Args:
+        config: Application Config instance
+    
+    Returns:
+        SymbolAttributeStore, or None if disabled or the database can't be opened
+    """
+    if not config.symbol_store_enabled:
+        return None
+    
+    try:
+        return SymbolAttributeStore(config.symbol_store_path, max_age_days=config.symbol_store_max_age_days)
+    except sqlite3.Error as e:
+        logger.warning(f"Could not open symbol store at {config.symbol_store_path}: {e}")
+        return None
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Offline checks of the backfill trading calendar and end-of-day price handling."""
+
+from datetime import date
+
+from api_client import FMPAPIClient
+from backfill import market_holidays, trading_days
+from http_cache import past_prices
+
+
+def test_trading_calendar():
+    # Published NYSE holiday calendars
+    assert market_holidays(2021) == {
+        date(2021, 1, 1), date(2021, 1, 18), date(2021, 2, 15), date(2021, 4, 2), date(2021, 5, 31),
+        date(2021, 7, 5), date(2021, 9, 6), date(2021, 11, 25), date(2021, 12, 24),
+    }
+    assert market_holidays(2024) == {
+        date(2024, 1, 1), date(2024, 1, 15), date(2024, 2, 19), date(2024, 3, 29), date(2024, 5, 27),
+        date(2024, 6, 19), date(2024, 7, 4), date(2024, 9, 2), date(2024, 11, 28), date(2024, 12, 25),
+    }
+    # New Year's Day 2022 fell on a Saturday and wasn't observed
+    assert not any(day.month == 1 and day.day < 3 for day in market_holidays(2022))
+    assert date(2025, 1, 9) in market_holidays(2025)
+    
+    days = trading_days(date(2024, 6, 14), date(2024, 6, 24))
+    assert days == [date(2024, 6, 14), date(2024, 6, 17), date(2024, 6, 18),
+                    date(2024, 6, 20), date(2024, 6, 21), date(2024, 6, 24)], days
+    assert len(trading_days(date(2024, 1, 1), date(2024, 12, 31))) == 252
+    
+    print("✓ trading days skip weekends and NYSE holidays")
+
+
+def test_empty_prices_not_cached():
+    csv_rows = b"symbol,date,close\nAAPL,2024-06-14,212.49\n"
+    assert past_prices(csv_rows) > 0
+    assert past_prices([{'symbol': 'AAPL'}]) > 0
+    for empty in (b"symbol,date,close\n", b"", [], None, {'Error Message': 'Limit Reach'}):
+        assert past_prices(empty) == 0, empty
+    
+    print("✓ only end-of-day responses with rows are cached")
+
+
+def test_historical_gainers_keep_delisted_symbols():
+    client = FMPAPIClient('test-key')
+    prices = {
+        date(2024, 6, 14): [{'symbol': 'LIVE', 'close': '22'}, {'symbol': 'GONE', 'close': '15'},
+                            {'symbol': 'FLAT', 'close': '10'}],
+        date(2024, 6, 13): [{'symbol': 'LIVE', 'close': '20'}, {'symbol': 'GONE', 'close': '10'},
+                            {'symbol': 'FLAT', 'close': '10'}],
+    }
+    client.get_eod_prices = lambda day: prices.get(day, [])
+    client.get_company_profiles_batch = lambda symbols: {
+        'LIVE': {'companyName': 'Live Inc', 'mktCap': 1_000_000_000, 'price': 25.0, 'industry': 'Software'},
+    }
+    
+    stocks = client.get_historical_gainers(date(2024, 6, 14), min_gain=10.0)
+    assert [stock['symbol'] for stock in stocks] == ['GONE', 'LIVE'], stocks
+    gone, live = stocks
+    # No current profile: kept, with the market cap unknown rather than filtered out
+    assert gone['mktCap'] is None and gone['name'] == 'GONE'
+    assert live['mktCap'] == 1_000_000_000 / 25.0 * 22.0
+    
+    for missing in (date(2024, 6, 17), date(2024, 6, 13)):
+        try:
+            client.get_historical_gainers(missing)
+        except ValueError:
+            continue
+        raise AssertionError(f"{missing} has no prices to compare and should fail")
+    
+    print("✓ gainers without a profile keep an unknown market cap; missing prices fail")
+
+
+if __name__ == "__main__":
+    test_trading_calendar()
+    test_empty_prices_not_cached()
+    test_historical_gainers_keep_delisted_symbols()
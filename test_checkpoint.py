@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Offline checks of saving, loading and resuming from run checkpoints."""
+
+import os
+import tempfile
+from datetime import datetime
+
+from checkpoint import RunCheckpoint
+
+
+STAGES = ['gainers', 'profiles', 'technical', 'complete']
+
+
+def test_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = RunCheckpoint(tmp, run_date='2025-06-30')
+        assert checkpoint.directory == os.path.join(tmp, '2025-06-30')
+        assert checkpoint.last_completed(STAGES) is None
+        assert checkpoint.load('gainers') is None
+        
+        stocks = [
+            {'symbol': 'AAPL', 'price': 212.5, 'changesPercentage': 12.5, 'mktCap': 3.1e12, 'is_technical': True},
+            {'symbol': 'XYZ', 'price': 9.0, 'fetched': datetime(2025, 6, 30, 16, 0), 'growth_rate': None},
+        ]
+        checkpoint.save('gainers', stocks)
+        checkpoint.save('profiles', stocks[:1])
+        checkpoint.save('empty', [])
+        
+        loaded = checkpoint.load('gainers')
+        assert loaded[0] == {'symbol': 'AAPL', 'price': 212.5, 'changesPercentage': 12.5,
+                             'mktCap': 3.1e12, 'is_technical': True}, loaded[0]
+        # Values that aren't JSON types come back as strings
+        assert loaded[1] == {'symbol': 'XYZ', 'price': 9.0, 'fetched': '2025-06-30 16:00:00',
+                             'growth_rate': None}, loaded[1]
+        assert checkpoint.load('empty') == []
+        
+        # The latest stage in run order wins, whatever order the files were written in
+        assert checkpoint.last_completed(STAGES) == 'profiles'
+        checkpoint.save('complete', loaded)
+        checkpoint.save('technical', loaded)
+        assert checkpoint.last_completed(STAGES) == 'complete'
+        assert not any(name.endswith('.tmp') for name in os.listdir(checkpoint.directory))
+        
+        # Another run date doesn't see these checkpoints; clear removes them
+        assert RunCheckpoint(tmp, run_date='2025-07-01').last_completed(STAGES) is None
+        checkpoint.clear()
+        assert checkpoint.last_completed(STAGES) is None
+        assert checkpoint.load('gainers') is None
+    
+    print("✓ checkpoints round-trip and resume from the latest completed stage")
+
+
+def test_unwritable_directory_does_not_fail():
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = RunCheckpoint(tmp, run_date='2025-06-30')
+        os.makedirs(checkpoint.directory)
+        # A directory where the stage file should go makes the rename fail
+        os.makedirs(os.path.join(checkpoint.directory, 'gainers.jsonl'))
+        checkpoint.save('gainers', [{'symbol': 'AAPL'}])
+    
+    print("✓ a checkpoint that can't be written is logged, not raised")
+
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_unwritable_directory_does_not_fail()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Offline checks of the multi-company technical-nature classification."""
+
+from perplexity_client import (
+    PerplexityClient, classification_label, parse_classification_map, run_batches,
+)
+
+
+def test_classification_map():
+    assert classification_label('NVIDIA Corporation (NVDA)') == 'NVDA'
+    assert classification_label('Berkshire Hathaway (brk.b)') == 'BRK.B'
+    assert classification_label('Acme Widgets') == 'ACME WIDGETS'
+    
+    text = """1. **NVDA**: Yes [2]
+- AAPL - no, mostly consumer hardware
+* `BRK.B`: NO
+TSLA: maybe
+XYZ: yes
+NVDA: no"""
+    answers = parse_classification_map(text, ['NVDA', 'AAPL', 'BRK.B', 'TSLA'])
+    # Unclear answers and unknown labels are skipped; the first answer wins
+    assert answers == {'NVDA': True, 'AAPL': False, 'BRK.B': False}, answers
+    assert parse_classification_map(None, ['NVDA']) == {}
+    
+    print("✓ classification replies map labels to yes/no")
+
+
+def test_batched_check_re_asks_missing():
+    companies = [f"Company {n} (C{n})" for n in range(7)]
+    batches, singles = [], []
+    
+    def fake_classify(self, company_names):
+        batches.append(list(company_names))
+        # The reply skips every third company
+        return {name: n % 2 == 0 for n, name in enumerate(company_names) if n % 3 != 2}
+    
+    def fake_single(self, company_name):
+        singles.append(company_name)
+        return True
+    
+    originals = PerplexityClient.classify_technical_companies, PerplexityClient.is_technical_company
+    PerplexityClient.classify_technical_companies = fake_classify
+    PerplexityClient.is_technical_company = fake_single
+    try:
+        [(results, successful)] = run_batches('key', companies, ['get_technical_companies_batched'],
+                                              technical_batch_size=3)
+    finally:
+        PerplexityClient.classify_technical_companies, PerplexityClient.is_technical_company = originals
+    
+    assert sorted(map(len, batches)) == [1, 3, 3], batches
+    # Companies missing from a batched reply are asked about one at a time
+    assert sorted(singles) == sorted([companies[2], companies[5]]), singles
+    assert successful == 7 and set(results) == set(companies)
+    assert results[companies[0]] is True and results[companies[1]] is False
+    assert results[companies[2]] is True
+    
+    print("✓ batched technical checks re-ask the companies a reply left out")
+
+
+if __name__ == "__main__":
+    test_classification_map()
+    test_batched_check_re_asks_missing()
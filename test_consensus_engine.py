@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Offline check that ConsensusHistory matches the original per-cutoff scan."""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+from consensus_engine import ConsensusHistory
+
+
+def naive_consensus_at_date(data, cutoff_date):
+    """The scan fetch_consensus_price_targets used to run once per cutoff."""
+    analyst_targets = {}
+    
+    for item in data:
+        date_str = item.get('publishedDate', '')
+        if 'T' in date_str:
+            try:
+                date = datetime.fromisoformat(date_str.replace('Z', '+00:00').replace('.000+00:00', ''))
+                date = date.replace(tzinfo=None)
+                
+                if date <= cutoff_date:
+                    analyst = item.get('analystCompany', 'Unknown')
+                    target = item.get('priceTarget', 0)
+                    
+                    if analyst not in analyst_targets or date > analyst_targets[analyst]['date']:
+                        analyst_targets[analyst] = {'target': target, 'date': date}
+            except:
+                continue
+    
+    if analyst_targets:
+        targets = [v['target'] for v in analyst_targets.values()]
+        return sum(targets) / len(targets)
+    return None
+
+
+def generate_history(count, now):
+    """Generate FMP-shaped price target records, including same-timestamp duplicates."""
+    firms = [f"Firm {i}" for i in range(25)]
+    data = []
+    for _ in range(count):
+        published = now - timedelta(days=random.randint(0, 400), hours=random.randint(0, 23))
+        published = published.replace(minute=0, second=0, microsecond=0)
+        data.append({
+            'publishedDate': published.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+            'analystCompany': random.choice(firms),
+            'priceTarget': round(random.uniform(50, 250), 2)
+        })
+    # A few malformed dates that both implementations must skip
+    data.append({'publishedDate': '2024-01-01', 'analystCompany': 'Firm 0', 'priceTarget': 1})
+    data.append({'publishedDate': '', 'analystCompany': 'Firm 1', 'priceTarget': 1})
+    return data
+
+
+def test_matches_naive():
+    random.seed(7)
+    now = datetime(2025, 6, 30, 16, 0, 0)
+    
+    for count in (0, 1, 5, 50, 500):
+        data = generate_history(count, now)
+        cutoffs = [now - timedelta(days=days) for days in (0, 7, 30, 180, 365, 1000)]
+        cutoffs += [now - timedelta(hours=random.randint(0, 24 * 400)) for _ in range(20)]
+        
+        history = ConsensusHistory.from_fmp(data)
+        fast = history.consensus_at_many(cutoffs)
+        
+        for cutoff, value in zip(cutoffs, fast):
+            expected = naive_consensus_at_date(data, cutoff)
+            if expected is None or value is None:
+                assert expected is value, (count, cutoff, expected, value)
+            else:
+                assert abs(expected - value) < 1e-9, (count, cutoff, expected, value)
+    
+    print("✓ consensus_at_many matches the naive scan")
+
+
+def test_daily_series():
+    random.seed(11)
+    now = datetime(2025, 6, 30, 16, 0, 0)
+    data = generate_history(300, now)
+    history = ConsensusHistory.from_fmp(data)
+    
+    start = (now - timedelta(days=180)).date()
+    series = history.daily_series(start, now.date())
+    assert len(series) == 181
+    
+    for day, value in series[::15]:
+        expected = naive_consensus_at_date(data, datetime(day.year, day.month, day.day, 23, 59, 59, 999999))
+        assert (expected is None and value is None) or abs(expected - value) < 1e-9
+    
+    print("✓ daily_series matches the naive scan")
+
+
+def benchmark():
+    random.seed(3)
+    now = datetime(2025, 6, 30, 16, 0, 0)
+    data = generate_history(800, now)
+    cutoffs = [now - timedelta(days=days) for days in (0, 7, 30, 180)]
+    
+    started = time.perf_counter()
+    for _ in range(20):
+        [naive_consensus_at_date(data, cutoff) for cutoff in cutoffs]
+    naive_time = (time.perf_counter() - started) / 20
+    
+    started = time.perf_counter()
+    for _ in range(20):
+        ConsensusHistory.from_fmp(data).consensus_at_many(cutoffs)
+    fast_time = (time.perf_counter() - started) / 20
+    
+    print(f"800 targets, 4 cutoffs: naive {naive_time * 1000:.1f} ms, engine {fast_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    test_matches_naive()
+    test_daily_series()
+    benchmark()
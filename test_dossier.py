@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Offline checks of the company dossier parser and the dossier fallbacks."""
+
+from api_client import FMPAPIClient
+from perplexity_client import DOSSIER_FIELDS, parse_company_dossier
+
+
+def test_parse_company_dossier():
+    text = """Here is the dossier:
+```json
+{"description": "Makes **chips** for data centers [1].",
+ "competitive_score": "8/10",
+ "competitive_reasoning": "Owns the software stack",
+ "market_growth_score": 12,
+ "market_growth_reasoning": "N/A",
+ "ps_ratio": "about 25.4x",
+ "earnings_guidance": null,
+ "analyst_price_targets": {"low": 100}}
+```"""
+    dossier = parse_company_dossier(text)
+    assert set(dossier) == set(DOSSIER_FIELDS)
+    assert dossier['description'] == 'Makes chips for data centers.', dossier['description']
+    assert dossier['competitive_score'] == 8
+    assert dossier['competitive_reasoning'] == 'Owns the software stack'
+    # Out-of-range scores, placeholders, nulls and nested objects are dropped
+    assert dossier['market_growth_score'] is None
+    assert dossier['market_growth_reasoning'] is None
+    assert dossier['ps_ratio'] == 25.4
+    assert dossier['earnings_guidance'] is None
+    assert dossier['analyst_price_targets'] is None
+    
+    for text in (None, '', 'no json here', '[1, 2]', '{not json}'):
+        assert parse_company_dossier(text) is None, text
+    
+    print("✓ dossiers are parsed field by field")
+
+
+def test_dossier_fallbacks():
+    client = FMPAPIClient('test-key', use_dossier=True)
+    names = ['Full Inc (FULL)', 'No Scores Inc (NOSC)', 'Missing Inc (MISS)']
+    complete = {field: 'x' for field in DOSSIER_FIELDS}
+    complete.update(competitive_score=7, market_growth_score=6, ps_ratio=3.0)
+    no_scores = dict(complete, competitive_score=None, market_growth_reasoning=None)
+    calls = []
+    
+    def fake_jobs(api_key, jobs, progress_callback=None):
+        calls.append(jobs)
+        results = []
+        for batch_name, companies in jobs:
+            if batch_name == 'get_dossiers_batch':
+                results.append(({names[0]: complete, names[1]: no_scores, names[2]: None}, 2))
+            elif batch_name == 'get_descriptions_batch':
+                results.append(({name: (f"1. About {name}\n"
+                                        "2. Competitive advantage: 9/10 strong moat\n"
+                                        "3. Market growth: 4/10 slow market")
+                                 for name in companies}, len(companies)))
+            else:
+                results.append(({name: f"{batch_name} answer" for name in companies}, len(companies)))
+        return results
+    
+    client._run_perplexity_jobs = fake_jobs
+    stocks = [{'symbol': name[-5:-1]} for name in names]
+    extra = client._fetch_short_fields(stocks, names, 'key', ['get_growth_rates_batch'])
+    
+    assert len(calls) == 2
+    fallbacks = dict(calls[1])
+    # A dossier without its scores re-runs the description prompt, not the others
+    assert fallbacks['get_descriptions_batch'] == names[1:], fallbacks
+    assert fallbacks['get_ps_ratios_batch'] == names[2:], fallbacks
+    assert extra[0][0][names[0]] == 'get_growth_rates_batch answer'
+    
+    full, no_scores_stock, missing = stocks
+    assert full['competitive_score'] == 7 and full['description'] == 'x'
+    # Fields the dossier had are kept; only the missing ones come from the fallback
+    assert no_scores_stock['description'] == 'x'
+    assert no_scores_stock['competitive_score'] == 9
+    assert no_scores_stock['market_growth_score'] == 6
+    assert no_scores_stock['market_growth_reasoning'] == 'Market growth: 4/10 slow market'
+    assert missing['description'] == f"About {names[2]}"
+    assert missing['market_growth_score'] == 4
+    assert missing['ps_ratio'] == 'get_ps_ratios_batch answer'
+    
+    print("✓ missing dossier fields, scores included, fall back to the per-field prompts")
+
+
+if __name__ == "__main__":
+    test_parse_company_dossier()
+    test_dossier_fallbacks()
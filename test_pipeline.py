@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Offline checks of the stage pipeline and the shared Perplexity concurrency bound."""
+
+import threading
+import time
+
+from perplexity_client import PerplexityClient, run_batch_jobs
+from pipeline import Pipeline, Stage
+
+
+def test_join_waits_for_every_branch():
+    joined = []
+    
+    def keep_even(items):
+        time.sleep(0.001)
+        return [item for item in items if item['n'] % 2 == 0]
+    
+    def keep_small(items):
+        return [item for item in items if item['n'] < 30]
+    
+    def join(items):
+        joined.extend(items)
+        return items
+    
+    pipeline = Pipeline([
+        Stage('source', lambda _: [{'n': n} for n in range(50)]),
+        Stage('even', keep_even, after=['source'], batch_size=1, workers=4),
+        Stage('small', keep_small, after=['source'], batch_size=3, workers=2),
+        Stage('joined', join, after=['even', 'small'], batch_size=1, workers=2),
+    ])
+    outputs = pipeline.run()
+    
+    # An item reaches the join once, and only after both branches passed it on
+    assert sorted(item['n'] for item in outputs['joined']) == list(range(0, 30, 2)), outputs
+    assert len(joined) == 15
+    assert pipeline.stats['joined']['in'] == 15
+    
+    print("✓ a joining stage receives each item once, after all its dependencies")
+
+
+def test_stage_errors_propagate():
+    def fail(items):
+        raise RuntimeError("boom")
+    
+    pipeline = Pipeline([
+        Stage('source', lambda _: [1, 2, 3]),
+        Stage('fail', fail, after=['source'], batch_size=1),
+        Stage('sink', lambda items: items, after=['fail']),
+    ])
+    try:
+        pipeline.run()
+    except RuntimeError as e:
+        assert str(e) == "boom"
+    else:
+        raise AssertionError("the stage error should be raised")
+    
+    try:
+        Pipeline([Stage('a', lambda items: items, after=['b']), Stage('b', lambda items: items, after=['a'])])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a cycle should be rejected")
+    
+    print("✓ stage errors are raised after the run and cycles are rejected")
+
+
+def test_shared_perplexity_slots():
+    state = {'now': 0, 'peak': 0}
+    lock = threading.Lock()
+    
+    def fake_ps_ratio(self, company):
+        with lock:
+            state['now'] += 1
+            state['peak'] = max(state['peak'], state['now'])
+        time.sleep(0.02)
+        with lock:
+            state['now'] -= 1
+        return 1.0
+    
+    original = PerplexityClient.get_ps_ratio
+    PerplexityClient.get_ps_ratio = fake_ps_ratio
+    try:
+        slots = threading.BoundedSemaphore(3)
+        companies = [f"Company {n}" for n in range(12)]
+        # Three stages running their own batches at once, each allowed 3 requests
+        threads = [
+            threading.Thread(target=run_batch_jobs, args=('key', [('get_ps_ratios_batch', companies)]),
+                             kwargs={'max_concurrency': 3, 'request_slots': slots})
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        PerplexityClient.get_ps_ratio = original
+    
+    assert state['peak'] == 3, state
+    
+    print(f"✓ concurrent batches stay within the shared bound (peak {state['peak']} of 3)")
+
+
+if __name__ == "__main__":
+    test_join_waits_for_every_branch()
+    test_stage_errors_propagate()
+    test_shared_perplexity_slots()
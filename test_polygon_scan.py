@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Offline check of the query parameters scan_price_target_changes sends to Polygon."""
+
+import json
+from datetime import datetime
+
+from polygon_client import PolygonClient
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self.data = json.dumps(payload).encode('utf-8')
+
+
+def capture_queries(client, ratings_for):
+    """Replace the SDK's HTTP GET with one that records the query parameters."""
+    queries = []
+    
+    def fake_get(path, params=None, **kwargs):
+        queries.append(dict(params or {}))
+        return FakeResponse({'results': ratings_for(params or {})})
+    
+    client.client._get = fake_get
+    return queries
+
+
+def rating(ticker, day, target, previous):
+    return {
+        'ticker': ticker,
+        'date': day,
+        'price_target': target,
+        'previous_price_target': previous,
+        'firm': 'Firm',
+        'rating_action': 'raises',
+    }
+
+
+def test_chunked_query_parameters():
+    client = PolygonClient('test-key', max_workers=2)
+    tickers = ['msft', 'AAPL', 'NVDA', 'AMD', 'TSLA']
+    
+    def ratings_for(params):
+        requested = params.get('ticker.any_of', '').split(',')
+        return [rating(ticker, '2025-06-30', 110.0, 100.0) for ticker in requested if ticker]
+    
+    queries = capture_queries(client, ratings_for)
+    results = client.scan_price_target_changes(tickers, datetime(2025, 6, 30), chunk_size=2)
+    
+    assert len(queries) == 3, queries
+    sent = [query['ticker.any_of'] for query in queries]
+    # Each chunk must arrive as one comma-separated list, not its characters joined by commas
+    assert sorted(sent) == ['AAPL,AMD', 'MSFT,NVDA', 'TSLA'], sent
+    for query in queries:
+        assert query['date.gte'] == '2025-06-30', query
+        assert query['sort'] == 'date.desc', query
+        assert 'ticker' not in query, query
+    
+    assert set(results) == set(tickers)
+    assert all(len(changes) == 1 for changes in results.values()), results
+    
+    print("✓ chunked scan sends one ticker.any_of list per chunk")
+
+
+def test_market_wide_query_parameters():
+    client = PolygonClient('test-key')
+    queries = capture_queries(client, lambda params: [
+        rating('AAPL', '2025-06-30', 210.0, 200.0),
+        rating('XYZ', '2025-06-30', 5.0, 4.0),
+    ])
+    results = client.scan_price_target_changes(['AAPL', 'MSFT'], datetime(2025, 6, 30))
+    
+    assert len(queries) == 1, queries
+    assert 'ticker.any_of' not in queries[0], queries[0]
+    assert queries[0]['date.gte'] == '2025-06-30', queries[0]
+    assert len(results['AAPL']) == 1 and results['MSFT'] == [], results
+    
+    print("✓ market-wide scan sends no ticker filter and keeps only watched tickers")
+
+
+if __name__ == "__main__":
+    test_chunked_query_parameters()
+    test_market_wide_query_parameters()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Offline checks of rate parsing and the token bucket."""
+
+import asyncio
+import threading
+import time
+
+from rate_limiter import TokenBucket, parse_rate
+
+
+def test_parse_rate():
+    cases = {
+        '300/min': 5.0,
+        '300 / minute': 5.0,
+        '5/s': 5.0,
+        '5/sec': 5.0,
+        '10/seconds': 10.0,
+        '2.5': 2.5,
+        '7200/h': 2.0,
+        '3600/hours': 1.0,
+        '120/MINS': 2.0,
+    }
+    for rate, expected in cases.items():
+        assert abs(parse_rate(rate) - expected) < 1e-9, (rate, parse_rate(rate))
+    
+    # "ms" must not be read as minutes with a plural s
+    for rate in ('5/ms', '5/x', '5/minss', '0/s', '-1/s', '', 'fast'):
+        try:
+            parse_rate(rate)
+        except ValueError:
+            continue
+        raise AssertionError(f"{rate!r} should be rejected")
+    
+    print("✓ parse_rate accepts the known units and rejects the rest")
+
+
+def test_token_bucket_spacing():
+    bucket = TokenBucket(rate=50.0, capacity=1)
+    started = time.monotonic()
+    waits = [bucket.acquire() for _ in range(11)]
+    elapsed = time.monotonic() - started
+    
+    assert waits[0] == 0.0
+    # Ten tokens beyond the first burst at 50/s take about 0.2 seconds
+    assert 0.18 <= elapsed < 0.5, elapsed
+    
+    assert not bucket.try_acquire()
+    time.sleep(0.03)
+    assert bucket.try_acquire()
+    
+    print(f"✓ token bucket spaces 11 acquires over {elapsed:.2f}s at 50/s")
+
+
+def test_token_bucket_threads_and_asyncio():
+    bucket = TokenBucket(rate=100.0, capacity=5)
+    started = time.monotonic()
+    
+    threads = [threading.Thread(target=lambda: [bucket.acquire() for _ in range(5)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    threaded = time.monotonic() - started
+    # 20 tokens with a burst of 5 leave 15 to refill at 100/s
+    assert 0.13 <= threaded < 0.5, threaded
+    
+    async def acquire_many():
+        await asyncio.gather(*(bucket.acquire_async() for _ in range(10)))
+    
+    started = time.monotonic()
+    asyncio.run(acquire_many())
+    awaited = time.monotonic() - started
+    assert 0.08 <= awaited < 0.4, awaited
+    
+    print("✓ threads and coroutines share one rate")
+
+
+if __name__ == "__main__":
+    test_parse_rate()
+    test_token_bucket_spacing()
+    test_token_bucket_threads_and_asyncio()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Offline checks of the HTTP response cache and the provider session that fills it."""
+
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import requests
+from requests.adapters import BaseAdapter
+
+from http_cache import DAY, ResponseCache, normalize_request_key, until_next_filing
+from provider_session import ProviderSession
+from rate_limiter import TokenBucket
+
+
+class FakeAdapter(BaseAdapter):
+    """Transport adapter answering every request with a fixed JSON body."""
+    
+    def __init__(self, payload, status=200):
+        super().__init__()
+        self.body = json.dumps(payload).encode('utf-8')
+        self.status = status
+        self.sent = 0
+    
+    def send(self, request, **kwargs):
+        self.sent += 1
+        response = requests.Response()
+        response.status_code = self.status
+        response.headers['Content-Type'] = 'application/json'
+        response._content = self.body
+        response.url = request.url
+        response.request = request
+        return response
+    
+    def close(self):
+        pass
+
+
+def make_session(cache, payload, status=200):
+    session = ProviderSession('test', cache=cache, classify=lambda url: 'profile',
+                              limiter=TokenBucket(1000.0))
+    adapter = FakeAdapter(payload, status)
+    session.mount('http://provider.test/', adapter)
+    return session, adapter
+
+
+def test_error_bodies_not_cached():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, 'cache.db'))
+        url = 'http://provider.test/api/v3/profile/AAPL?apikey=secret'
+        
+        for payload in ({'Error Message': 'Invalid API KEY.'}, {'error': 'Limit Reach'}):
+            session, adapter = make_session(cache, payload)
+            session.get(url)
+            session.get(url)
+            assert adapter.sent == 2, (payload, adapter.sent)
+            assert cache.stats()['entries'] == 0, payload
+        
+        session, adapter = make_session(cache, [{'symbol': 'AAPL', 'mktCap': 1}])
+        first = session.get(url).json()
+        second = session.get(url).json()
+        assert adapter.sent == 1 and first == second
+        assert cache.stats()['entries'] == 1
+        cache.close()
+    
+    print("✓ 200 error bodies go to the network every time; data is cached")
+
+
+def test_ttl_policy():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, 'cache.db'), ttls={'profile': 0, 'gainers': 60})
+        assert cache.ttl_for(None) is None
+        assert cache.ttl_for('profile') is None and not cache.is_cacheable('profile')
+        assert cache.ttl_for('gainers') == 60.0
+        assert cache.ttl_for('unknown') is None
+        assert cache.is_cacheable('statement')
+        cache.close()
+    
+    # A statement filed a year ago is due again; one filed today stays fresh for a year
+    stale = [{'fillingDate': (datetime.now() - timedelta(days=400)).strftime('%Y-%m-%d'), 'period': 'FY'}]
+    fresh = [{'fillingDate': datetime.now().strftime('%Y-%m-%d'), 'period': 'FY'}]
+    quarterly = [{'fillingDate': datetime.now().strftime('%Y-%m-%d'), 'period': 'Q2'}]
+    assert until_next_filing(stale) == DAY
+    assert 364 * DAY < until_next_filing(fresh) <= 365 * DAY
+    assert 90 * DAY < until_next_filing(quarterly) <= 91 * DAY
+    assert until_next_filing([]) == DAY
+    
+    print("✓ TTLs resolve per endpoint class and by filing date")
+
+
+def test_expiry_and_lru_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(os.path.join(tmp, 'cache.db'), max_bytes=250)
+        keys = [normalize_request_key('GET', f'http://provider.test/quote/{n}') for n in range(3)]
+        
+        cache.set(keys[0], 200, {}, b'x' * 100, ttl=60, endpoint_class='profile')
+        time.sleep(0.01)
+        cache.set(keys[1], 200, {}, b'y' * 100, ttl=60, endpoint_class='profile')
+        time.sleep(0.01)
+        # Touch the first entry so the second becomes least recently used
+        assert cache.get(keys[0], 'profile') is not None
+        time.sleep(0.01)
+        cache.set(keys[2], 200, {}, b'z' * 100, ttl=60, endpoint_class='profile')
+        
+        assert cache.get(keys[1], 'profile') is None
+        assert cache.get(keys[0], 'profile')[2] == b'x' * 100
+        assert cache.get(keys[2], 'profile')[2] == b'z' * 100
+        assert cache.stats()['size_bytes'] == 200
+        
+        expired = normalize_request_key('GET', 'http://provider.test/quote/old')
+        cache.set(expired, 200, {}, b'old', ttl=-1)
+        assert cache.get(expired, 'profile') is None
+        
+        stats = cache.stats()
+        assert stats['by_class']['profile'] == {'hits': 3, 'misses': 2}, stats
+        cache.close()
+    
+    print("✓ expired entries miss and the least recently used entry is evicted first")
+
+
+def test_keys_ignore_secrets_and_order():
+    a = normalize_request_key('GET', 'http://provider.test/q?b=2&a=1&apikey=one')
+    b = normalize_request_key('GET', 'http://provider.test/q?a=1&apikey=two', params={'b': 2})
+    c = normalize_request_key('GET', 'http://provider.test/q?a=1&b=3')
+    assert a == b and a != c
+    
+    print("✓ cache keys ignore API keys and parameter order")
+
+
+def test_locked_database_is_a_miss():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cache.db')
+        cache = ResponseCache(path)
+        cache._conn.execute("PRAGMA busy_timeout = 50")
+        key = normalize_request_key('GET', 'http://provider.test/quote/AAPL')
+        
+        # Another process holding the write lock: the store is skipped, not raised
+        holder = sqlite3.connect(path)
+        holder.execute("BEGIN EXCLUSIVE")
+        cache.set(key, 200, {}, b'body', ttl=60, endpoint_class='profile')
+        holder.rollback()
+        holder.close()
+        assert cache.get(key, 'profile') is None
+        
+        cache.set(key, 200, {}, b'body', ttl=60, endpoint_class='profile')
+        assert cache.get(key, 'profile')[2] == b'body'
+        
+        # An unusable connection reads as a miss
+        cache._conn.close()
+        assert cache.get(key, 'profile') is None
+    
+    print("✓ a locked or unusable cache database degrades to misses")
+
+
+if __name__ == "__main__":
+    test_error_bodies_not_cached()
+    test_ttl_policy()
+    test_expiry_and_lru_eviction()
+    test_keys_ignore_secrets_and_order()
+    test_locked_database_is_a_miss()
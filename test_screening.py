@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Offline checks of the screening expressions and the filters built on them."""
+
+import math
+import random
+import re
+
+from api_client import FMPAPIClient
+from screening import ScreeningTable, compile_expression, screen
+
+
+def baseline_growth_filter(stocks, min_growth):
+    """The per-stock loop filter_by_growth_rate ran before the screening engine."""
+    kept = []
+    for stock in stocks:
+        growth_rate = stock.get('growth_rate', '')
+        if not growth_rate:
+            kept.append(stock)
+            continue
+        matches = re.findall(r'(\d{4}):\s*([\d.-]+)(?:-[\d.]+)?%', growth_rate)
+        if not matches:
+            kept.append(stock)
+            continue
+        below_minimum = False
+        growth_values = []
+        for year, rate_str in matches:
+            try:
+                rate = float(rate_str)
+            except ValueError:
+                continue
+            growth_values.append(rate)
+            if rate < min_growth:
+                below_minimum = True
+        if not below_minimum and growth_values:
+            kept.append(stock)
+        elif not below_minimum:
+            # Years matched but none could be parsed: included
+            kept.append(stock)
+    return kept
+
+
+def baseline_projection_filter(stocks, min_growth):
+    """The per-stock loop filter_by_2030_projection ran before the screening engine."""
+    kept = []
+    for stock in stocks:
+        projection = stock.get('revenue_projection_2030', '')
+        if not projection:
+            kept.append(stock)
+            continue
+        growth_rate = None
+        range_match = re.search(r'^(\d+(?:\.\d+)?)\s*[-–]\s*(\d+(?:\.\d+)?)\s*%', projection)
+        to_match = re.search(r'^(\d+(?:\.\d+)?)\s+to\s+(\d+(?:\.\d+)?)\s*%', projection, re.IGNORECASE)
+        single_match = re.search(r'^(\d+(?:\.\d+)?)\s*%', projection)
+        if range_match:
+            growth_rate = float(range_match.group(2))
+        elif to_match:
+            growth_rate = float(to_match.group(2))
+        elif single_match:
+            growth_rate = float(single_match.group(1))
+        if growth_rate is None or growth_rate >= min_growth:
+            kept.append(stock)
+    return kept
+
+
+def random_growth(rng):
+    choice = rng.random()
+    if choice < 0.1:
+        return rng.choice([None, '', 'n/a', 'Growth of about 15% a year'])
+    years = []
+    for year in range(2025, 2025 + rng.randint(1, 3)):
+        rate = rng.choice([f"{rng.uniform(-5, 30):.1f}", f"{rng.randint(0, 30)}",
+                           f"{rng.randint(5, 15)}-{rng.randint(15, 25)}", "1.2.3"])
+        years.append(f"{year}: {rate}%")
+    return ', '.join(years)
+
+
+def random_projection(rng):
+    return rng.choice([
+        None, '', 'unknown', 'about 12%',
+        f"{rng.randint(1, 20)}%", f"{rng.uniform(1, 20):.1f}% CAGR",
+        f"{rng.randint(1, 9)}-{rng.randint(5, 20)}%", f"{rng.randint(1, 9)}–{rng.randint(5, 20)}%",
+        f"{rng.randint(1, 9)} to {rng.randint(5, 20)}% annually",
+    ])
+
+
+def test_filters_match_baseline():
+    rng = random.Random(5)
+    stocks = [
+        {'symbol': f"S{n}", 'growth_rate': random_growth(rng), 'revenue_projection_2030': random_projection(rng)}
+        for n in range(3000)
+    ]
+    # Years that all fail to parse give no evidence either way, so the stock stays
+    stocks.append({'symbol': 'UNPARSED', 'growth_rate': '2025: 10-12%, 2026: 1.2.3%'})
+    client = FMPAPIClient('test-key')
+    
+    for min_growth in (0.0, 10.0, 20.0):
+        expected = [stock['symbol'] for stock in baseline_growth_filter(stocks, min_growth)]
+        actual = [stock['symbol'] for stock in client.filter_by_growth_rate(stocks, min_growth=min_growth)]
+        assert actual == expected, (min_growth, set(actual) ^ set(expected))
+        
+        expected = [stock['symbol'] for stock in baseline_projection_filter(stocks, min_growth)]
+        actual = [stock['symbol'] for stock in client.filter_by_2030_projection(stocks, min_growth=min_growth)]
+        assert actual == expected, (min_growth, set(actual) ^ set(expected))
+    
+    assert 'UNPARSED' in [stock['symbol'] for stock in client.filter_by_growth_rate(stocks, min_growth=10.0)]
+    
+    print("✓ growth and 2030 projection filters keep the baseline's decisions")
+
+
+def test_expression_semantics():
+    stocks = [
+        {'symbol': 'A', 'changesPercentage': 12.0, 'mktCap': 5e8, 'growth_rate': '2025: 20%, 2026: 8%'},
+        {'symbol': 'B', 'changesPercentage': 25.0, 'mktCap': 2e9, 'growth_rate': None},
+        {'symbol': 'C', 'changesPercentage': None, 'mktCap': 1e10, 'growth_rate': '2025: 30%'},
+        {'symbol': 'D', 'changesPercentage': '-3%', 'mktCap': None, 'revenue_projection_2030': '2 to 4%'},
+    ]
+    table = ScreeningTable(stocks)
+    
+    def symbols(expression, **params):
+        return [stock['symbol'] for stock in table.filter(expression, **params)]
+    
+    assert symbols('gain >= 10') == ['A', 'B']
+    assert symbols('gain >= min_gain and market_cap >= 1e9', min_gain=10) == ['B']
+    assert symbols('gain >= 20 or market_cap >= 5e9') == ['B', 'C']
+    assert symbols('10 <= gain < 20') == ['A']
+    assert symbols('gain < -1') == ['D']
+    assert symbols('-gain > 1') == ['D']
+    # growth is the lowest year; missing estimates pass, missing quote data doesn't
+    assert symbols('growth >= 10') == ['B', 'C', 'D']
+    assert symbols('gain < 10') == ['D']
+    assert symbols('market_cap < 1e9') == ['A']
+    assert symbols('projection_2030 >= 10') == ['A', 'B', 'C']
+    # not inverts the mask, so a missing value that failed now passes
+    assert symbols('not gain >= 10') == ['C', 'D']
+    
+    assert math.isnan(table.column('gain')[2])
+    assert table.missing('market_cap').tolist() == [3]
+    assert ScreeningTable([]).filter('gain >= 10') == []
+    assert screen(stocks, 'market_cap >= 1e9 and growth >= 10') == stocks[1:3]
+    
+    # Precomputed columns without stocks, as the full-market scan uses them
+    quotes = ScreeningTable(columns={'gain': [5.0, 15.0, float('nan')], 'market_cap': [1e9, 1e9, 1e9]})
+    assert len(quotes) == 3 and quotes.select('gain >= 10 and market_cap >= 3e8').tolist() == [1]
+    
+    assert compile_expression('gain >= 10') is compile_expression('gain >= 10')
+    for bad in ('gain >', 'foo > 1', 'gain + 1 > 2', 'gain in (1, 2)', 'gain >= True',
+                '__import__("os").system("true")', 'gain >= limit'):
+        try:
+            table.mask(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad!r} should be rejected")
+    
+    print("✓ expressions combine, chain and treat missing values per column")
+
+
+if __name__ == "__main__":
+    test_filters_match_baseline()
+    test_expression_semantics()
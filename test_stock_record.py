@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Offline checks that StockRecord behaves like the stock dictionaries it replaced."""
+
+import copy
+import json
+import pickle
+import tempfile
+
+from checkpoint import RunCheckpoint
+from stock_record import StockRecord, gain_percentage, parse_number
+
+
+def fmp_row():
+    return {
+        'symbol': 'NVDA',
+        'name': 'NVIDIA Corporation',
+        'price': '1,234.5',
+        'change': '+137.2',
+        'changesPercentage': '+12.5%',
+        'exchange': 'NASDAQ',
+        'note': 'overflow key',
+    }
+
+
+def test_parse_number():
+    assert parse_number('+12.5%') == 12.5
+    assert parse_number('1,234.5') == 1234.5
+    assert parse_number(-3) == -3.0
+    assert parse_number('1.5e9') == 1.5e9
+    for value in (None, True, '', 'N/A'):
+        assert parse_number(value) is None, value
+    assert gain_percentage({'changesPercentage': '10.2%'}) == 10.2
+    assert gain_percentage({}) is None
+    
+    print("✓ formatted numbers parse to floats")
+
+
+def test_dict_compatibility():
+    row = fmp_row()
+    record = StockRecord(row)
+    
+    # Quote fields are normalized once, everything else is kept as given
+    assert record['price'] == 1234.5 and record['changesPercentage'] == 12.5
+    assert record['symbol'] == 'NVDA' and record['note'] == 'overflow key'
+    assert gain_percentage(record) == 12.5
+    
+    assert list(record) == ['symbol', 'name', 'price', 'change', 'changesPercentage', 'exchange', 'note']
+    assert len(record) == 7
+    assert 'mktCap' not in record and 'symbol' in record and 'note' in record
+    assert record.get('mktCap') is None and record.get('ps_ratio', 'N/A') == 'N/A'
+    try:
+        record['mktCap']
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("unset slot should raise KeyError")
+    
+    record['mktCap'] = '3.1e12'
+    record['ps_ratio'] = 25.4
+    record['custom'] = [1, 2]
+    assert record['mktCap'] == 3.1e12
+    record.update({'industry': 'Semiconductors'}, sector='Technology')
+    record.setdefault('description', 'Chips')
+    assert record['industry'] == 'Semiconductors' and record['description'] == 'Chips'
+    
+    del record['note']
+    del record['ps_ratio']
+    assert 'note' not in record and 'ps_ratio' not in record
+    assert record.pop('custom') == [1, 2]
+    
+    plain = dict(record)
+    assert plain == record and record == plain
+    assert json.loads(json.dumps(record.to_dict())) == plain
+    
+    duplicate = record.copy()
+    duplicate['price'] = 1.0
+    assert record['price'] == 1234.5
+    
+    print("✓ StockRecord reads, writes and compares like a dict")
+
+
+def test_pickling_and_checkpoints():
+    record = StockRecord(fmp_row(), mktCap=3.1e12, polygon_recent_actions=[{'action': 'raises'}])
+    
+    restored = pickle.loads(pickle.dumps(record))
+    assert isinstance(restored, StockRecord) and restored == record
+    assert restored['note'] == 'overflow key'
+    assert copy.deepcopy(record) == record
+    assert not hasattr(record, '__dict__')
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = RunCheckpoint(tmp, run_date='2025-06-30')
+        checkpoint.save('gainers', [record])
+        [loaded] = StockRecord.from_rows(checkpoint.load('gainers'))
+        assert loaded == record
+    
+    print("✓ StockRecord survives pickling (process pools) and checkpoints")
+
+
+if __name__ == "__main__":
+    test_parse_number()
+    test_dict_compatibility()
+    test_pickling_and_checkpoints()
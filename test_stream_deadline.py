@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Offline check that a stalled Perplexity stream is cut off at its deadline."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from perplexity_client import PerplexityClient
+
+
+release = threading.Event()
+
+
+class StallingHandler(BaseHTTPRequestHandler):
+    """Sends two content events as HTTP chunks, then stalls without ending the stream."""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for chunk in ('Partial ', 'report'):
+            event = {'choices': [{'index': 0, 'delta': {'content': chunk}}]}
+            data = f"data: {json.dumps(event)}\n\n".encode('utf-8')
+            self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+            self.wfile.flush()
+        release.wait(30)
+
+
+def start_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StallingHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_deadline_cuts_stalled_stream():
+    server = start_server()
+    client = PerplexityClient('test-key', base_url=f"http://127.0.0.1:{server.server_address[1]}")
+    try:
+        started = time.monotonic()
+        # The read timeout alone would wait 60 seconds for the next chunk
+        text, complete = client._stream_completion({'model': 'sonar', 'messages': []}, deadline=1.0)
+        elapsed = time.monotonic() - started
+        assert text == 'Partial report' and not complete, (text, complete)
+        assert elapsed < 3, elapsed
+        print(f"✓ stalled stream returned its partial text after {elapsed:.1f}s (deadline 1s)")
+        
+        started = time.monotonic()
+        research = client.get_deep_research('Research ACME', stream=True, deadline=1.0)
+        elapsed = time.monotonic() - started
+        assert research.startswith('Partial report'), research
+        assert research.endswith('[Research truncated: response did not finish in time]'), research
+        assert elapsed < 3, elapsed
+        print("✓ truncated deep research is marked as truncated")
+    finally:
+        release.set()
+        server.shutdown()
+        server.server_close()
+        client.session.close()
+
+
+if __name__ == "__main__":
+    test_deadline_cuts_stalled_stream()